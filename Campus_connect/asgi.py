@@ -5,6 +5,11 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+
+Run with e.g. ``uvicorn Campus_connect.asgi:application --workers 2`` so the
+async chat views (see CHAT_ASYNC_VIEWS) can serve many concurrent chats
+per process, and ``announcements/stream/`` can hold thousands of idle SSE
+connections (set PUSH_REDIS_URL when running more than one worker).
 """
 
 import os
@@ -12,5 +17,6 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'Campus_connect.settings')
+os.environ.setdefault('CHAT_ASYNC_VIEWS', '1')
 
 application = get_asgi_application()
@@ -21,6 +21,62 @@ load_dotenv()  # loads the .env file
 
 X_FRAME_OPTIONS = 'SAMEORIGIN'
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+# Background threads that parse/index uploaded resources (campusconnect/ingest.py)
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", 2))
+# OCR of scanned PDFs: processes in the page pool (default: all cores) and render DPI
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", 0)) or None
+OCR_DPI = int(os.getenv("OCR_DPI", 200))
+# Route the chat APIs to their async views. On by default under ASGI (set in
+# asgi.py); WSGI keeps the sync views, which stream without buffering there.
+CHAT_ASYNC_VIEWS = os.getenv("CHAT_ASYNC_VIEWS", "0") == "1"
+# LLM client (campusconnect/llm.py). LLM_BACKEND may be swapped for
+# 'campusconnect.llm.FakeBackend', or LLM_BASE_URL pointed at
+# `manage.py fake_llm_server`, for tests and benchmarks.
+LLM_BACKEND = os.getenv("LLM_BACKEND", "campusconnect.llm.GroqBackend")
+LLM_BASE_URL = os.getenv("LLM_BASE_URL") or None
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", 30))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 2))
+LLM_RETRY_BACKOFF = float(os.getenv("LLM_RETRY_BACKOFF", 0.5))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", 20))
+# Admission control for the chat views (campusconnect/admission.py): per-user
+# token bucket, a cap on concurrent LLM calls and a bounded wait queue.
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 8))
+LLM_QUEUE_SIZE = int(os.getenv("LLM_QUEUE_SIZE", 32))
+LLM_QUEUE_TIMEOUT = float(os.getenv("LLM_QUEUE_TIMEOUT", 10))
+LLM_USER_RATE_PER_MIN = float(os.getenv("LLM_USER_RATE_PER_MIN", 10))
+LLM_USER_BURST = int(os.getenv("LLM_USER_BURST", 5))
+# Server-side chat sessions (campusconnect/chat_sessions.py): token budget for
+# the history sent with each prompt, turns kept verbatim before older ones are
+# summarized, and the summary call itself.
+CHAT_CONTEXT_TOKENS = int(os.getenv("CHAT_CONTEXT_TOKENS", 1500))
+CHAT_KEEP_TURNS = int(os.getenv("CHAT_KEEP_TURNS", 6))
+CHAT_SUMMARY_TOKENS = int(os.getenv("CHAT_SUMMARY_TOKENS", 300))
+CHAT_SUMMARY_MODEL = os.getenv("CHAT_SUMMARY_MODEL", "llama-3.1-8b-instant")
+# Uploaded images (campusconnect/images.py): encoder quality of the resized
+# WebP/JPEG variants, and processes used by `manage.py backfill_image_variants`.
+IMAGE_WEBP_QUALITY = int(os.getenv("IMAGE_WEBP_QUALITY", 80))
+IMAGE_JPEG_QUALITY = int(os.getenv("IMAGE_JPEG_QUALITY", 82))
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", 0)) or None
+# Live announcement push (campusconnect/push.py, ASGI only): open SSE
+# connections per process, heartbeat interval, events buffered per slow
+# client, and Redis pub/sub for fan-out across worker processes.
+PUSH_MAX_CONNECTIONS = int(os.getenv("PUSH_MAX_CONNECTIONS", 10000))
+PUSH_HEARTBEAT = float(os.getenv("PUSH_HEARTBEAT", 15))
+PUSH_QUEUE_SIZE = int(os.getenv("PUSH_QUEUE_SIZE", 64))
+PUSH_REDIS_URL = os.getenv("PUSH_REDIS_URL") or os.getenv("REDIS_URL") or None
+
+# Goal assignment (campusconnect/assignments.py): rows per INSERT into the
+# goal/student table when a goal is assigned to a whole audience.
+GOAL_ASSIGN_BATCH_SIZE = int(os.getenv("GOAL_ASSIGN_BATCH_SIZE", 1000))
+
+# Overdue sweeper (`manage.py sweep_overdue`): seconds between runs of its
+# --loop scheduler, and days after which an undated pending permission expires.
+SWEEP_INTERVAL = int(os.getenv("SWEEP_INTERVAL", 15 * 60))
+PERMISSION_STALE_DAYS = int(os.getenv("PERMISSION_STALE_DAYS", 14))
+
+# Grade exports (campusconnect/exports.py): rows fetched per database round
+# trip while a submissions CSV/XLSX is streamed.
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", 2000))
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
 
@@ -68,6 +124,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'campusconnect.context_processors.unread_counts',
             ],
         },
     },
@@ -83,10 +140,55 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Seconds a writer waits for SQLite's write lock before "database is
+        # locked"; a class submitting a quiz at the deadline queues for it.
+        'OPTIONS': {'timeout': float(os.getenv("SQLITE_TIMEOUT", 20))},
     }
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# 'answers' holds RAG answers shared between students (campusconnect/answer_cache.py).
+# LocMemCache culls least-recently-used entries once MAX_ENTRIES is reached;
+# point it at Redis/Memcached to share it between worker processes.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'answers': {
+        'BACKEND':  'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'rag-answers',
+        'TIMEOUT':  int(os.getenv("ANSWER_CACHE_TTL", 60 * 60 * 24)),
+        'OPTIONS':  {'MAX_ENTRIES': int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", 5000)), 'CULL_FREQUENCY': 10},
+    },
+    # Rendered announcement-feed pages (campusconnect/feed_cache.py)
+    'fragments': {
+        'BACKEND':  'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'feed-fragments',
+        'TIMEOUT':  int(os.getenv("FEED_CACHE_TTL", 60 * 10)),
+        'OPTIONS':  {'MAX_ENTRIES': int(os.getenv("FEED_CACHE_MAX_ENTRIES", 2000)), 'CULL_FREQUENCY': 10},
+    },
+    # Quiz questions and answer keys per goal (campusconnect/quiz_cache.py)
+    'quizzes': {
+        'BACKEND':  'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'quiz-questions',
+        'TIMEOUT':  int(os.getenv("QUIZ_CACHE_TTL", 60 * 60 * 24)),
+        'OPTIONS':  {'MAX_ENTRIES': int(os.getenv("QUIZ_CACHE_MAX_ENTRIES", 2000)), 'CULL_FREQUENCY': 10},
+    },
+}
+# Several worker processes need shared fragment and quiz caches, or a
+# version bump only reaches the process that handled the write
+if os.getenv("REDIS_URL"):
+    for alias in ('fragments', 'quizzes'):
+        CACHES[alias].update({
+            'BACKEND':  'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv("REDIS_URL"),
+            'OPTIONS':  {},
+        })
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -4,6 +4,13 @@ from django.conf import settings
 from django.conf.urls.static import static
 from campusconnect import views
 
+# Under ASGI (uvicorn) the LLM-bound chat endpoints use the async views so a
+# slow Groq round-trip does not pin a worker thread.
+if settings.CHAT_ASYNC_VIEWS:
+    chatbot_api, rag_chatbot_api = views.async_chatbot_api, views.async_rag_chatbot_api
+else:
+    chatbot_api, rag_chatbot_api = views.chatbot_api, views.rag_chatbot_api
+
 urlpatterns = [
     path('admin/',                              admin.site.urls),
     path('',                                    views.home,               name='home'),
@@ -13,6 +20,9 @@ urlpatterns = [
     path('dashboard/',                          views.dashboard,          name='dashboard'),
     path('study/',                              views.study,              name='study'),
     path('announcements/',                      views.announcements,      name='announcements'),
+    path('announcements/feed/',                 views.announcements_feed, name='announcements_feed'),
+    path('announcements/feed/cache/',           views.feed_cache_stats,   name='feed_cache_stats'),
+    path('announcements/stream/',               views.announcements_stream, name='announcements_stream'),
     path('announcements/post/',                 views.post_announcement,  name='post_announcement'),
     path('announcements/edit/<int:pk>/',        views.edit_announcement,  name='edit_announcement'),
     path('announcements/delete/<int:pk>/',      views.delete_announcement,name='delete_announcement'),
@@ -23,10 +33,12 @@ urlpatterns = [
     path('study/goals/create/',                 views.create_goal,       name='create_goal'),
     path('study/goals/<int:goal_id>/',          views.goal_detail,       name='goal_detail'),
     path('study/goals/<int:goal_id>/submissions/', views.goal_submissions, name='goal_submissions'),
+    path('study/goals/<int:goal_id>/submissions/export/', views.export_submissions, name='export_submissions'),
     path('study/goals/submission/<int:sub_id>/review/', views.review_submission, name='review_submission'),
     path('study/goals/<int:goal_id>/delete/',   views.delete_goal,       name='delete_goal'),
     path('study/chatbot/', views.chatbot, name='chatbot'),
-    path('study/chatbot/api/', views.chatbot_api, name='chatbot_api'),
+    path('study/chatbot/api/', chatbot_api, name='chatbot_api'),
+    path('study/chatbot/metrics/', views.llm_metrics, name='llm_metrics'),
     path('library/', views.library, name='library'),
     path('library/mark-returned/<int:record_id>/', views.mark_returned, name='mark_returned'),
     path('library/penalty/<int:record_id>/', views.penalty_api, name='penalty_api'),
@@ -38,11 +50,12 @@ urlpatterns = [
     path('study/goals/submission/<int:sub_id>/review/', views.review_submission, name='review_submission'),
     path('study/goals/<int:goal_id>/delete/',   views.delete_goal,        name='delete_goal'),
     path('study/chatbot/',                      views.chatbot,            name='chatbot'),
-    path('study/chatbot/api/',                  views.chatbot_api,        name='chatbot_api'),
+    path('study/chatbot/api/',                  chatbot_api,              name='chatbot_api'),
     path('resources/',                          include('resources.urls')),
     path('study/self-study/', views.self_study, name='self_study'),
 path('study/self-study/<int:resource_id>/', views.self_study_workspace, name='self_study_workspace'),
-path('study/rag-chat/<int:resource_id>/', views.rag_chatbot_api, name='rag_chatbot_api'),
+path('study/self-study/<int:resource_id>/status/', views.resource_index_status, name='resource_index_status'),
+path('study/rag-chat/<int:resource_id>/', rag_chatbot_api, name='rag_chatbot_api'),
 # ── Complaint Portal ──────────────────────────────────────
 path('study/complaints/',                           views.complaint_portal,        name='complaint_portal'),
 path('study/complaints/student/',                   views.complaint_student,       name='complaint_student'),
@@ -1,5 +1,7 @@
 from django.contrib import admin
+from django.db import transaction
 from .models import UserProfile, Announcement
+from . import feed_cache, push, unread
 from django.utils.html import format_html 
 
 @admin.register(UserProfile)
@@ -16,10 +18,38 @@ class AnnouncementAdmin(admin.ModelAdmin):
     search_fields = ('title', 'body', 'author__username')
     ordering      = ('-created_at',)
 
+    # Admin writes skip the views, so do what they do: unread counts, live push, feed cache
+    def save_model(self, request, obj, form, change):
+        old = Announcement.objects.filter(pk=obj.pk).first() if change else None
+        super().save_model(request, obj, form, change)
+        if old is None:
+            unread.bump('announcements', unread.announcement_readers(obj))
+        elif obj.audience != old.audience:
+            old_readers = unread.announcement_readers(old)
+            new_readers = unread.announcement_readers(obj)
+            unread.forget('announcements', old_readers.exclude(pk__in=new_readers), obj.created_at)
+            unread.bump('announcements', new_readers.exclude(pk__in=old_readers))
+        transaction.on_commit(feed_cache.bump)
+        push.publish_announcement(obj, 'updated' if old else 'created',
+                                  old_audience=old.audience if old else None)
+
+    def delete_model(self, request, obj):
+        pk = obj.pk
+        unread.forget('announcements', unread.announcement_readers(obj), obj.created_at)
+        super().delete_model(request, obj)
+        transaction.on_commit(feed_cache.bump)
+        push.publish_announcement(obj, 'deleted', pk=pk)
+
+    def delete_queryset(self, request, queryset):
+        with transaction.atomic():
+            for obj in queryset:
+                self.delete_model(request, obj)
+
 
 
 
 from .models import Goal, QuizQuestion, GoalSubmission, QuizAnswer
+from . import analytics, goal_stats
 
 
 # ── Inline: Quiz Questions inside Goal ───────────────────────────────────────
@@ -73,12 +103,17 @@ class GoalAdmin(admin.ModelAdmin):
         }),
     )
 
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        goal_stats.recount(form.instance)   # edits here bypass the counters
+        analytics.rebuild(form.instance)    # and the due date decides what was late
+
     def student_count(self, obj):
-        return obj.assigned_to.count()
+        return obj.assigned_count
     student_count.short_description = 'Students'
 
     def submission_count(self, obj):
-        return obj.submissions.count()
+        return obj.submission_count
     submission_count.short_description = 'Submissions'
 
 
@@ -117,6 +152,27 @@ class GoalSubmissionAdmin(admin.ModelAdmin):
         }),
     )
 
+    # Submissions edited here bypass the goal counters
+    def save_model(self, request, obj, form, change):
+        old_goal = form.initial.get('goal')
+        super().save_model(request, obj, form, change)
+        goals = Goal.objects.filter(pk__in=[obj.goal_id, old_goal])
+        goal_stats.recount(*goals)
+        for goal in goals:
+            analytics.rebuild(goal)
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        goal_stats.recount(obj.goal)
+        analytics.rebuild(obj.goal)
+
+    def delete_queryset(self, request, queryset):
+        goals = list(Goal.objects.filter(submissions__in=queryset).distinct())
+        super().delete_queryset(request, queryset)
+        goal_stats.recount(*goals)
+        for goal in goals:
+            analytics.rebuild(goal)
+
 
 # ── Quiz Answer Admin ─────────────────────────────────────────────────────────
 @admin.register(QuizAnswer)
@@ -159,6 +215,7 @@ class LibraryRecordAdmin(admin.ModelAdmin):
     # ── Filters on the right sidebar ──────────────────────
     list_filter = (
         'is_returned',
+        'is_overdue',
         'start_date',
         'due_date',
         'issued_by',
@@ -272,6 +329,7 @@ class LibraryRecordAdmin(admin.ModelAdmin):
         updated = queryset.filter(is_returned=False).update(
             is_returned=True,
             returned_date=today,
+            is_overdue=False,
         )
         self.message_user(request, f'{updated} book(s) marked as returned.')
 
@@ -560,6 +618,7 @@ class PermissionAdmin(admin.ModelAdmin):
             'pending':  ('⏳', '#888',    'rgba(255,255,255,0.06)'),
             'accepted': ('✅', '#00e676', 'rgba(0,230,118,0.1)'),
             'rejected': ('❌', '#ff4d9e', 'rgba(255,77,158,0.1)'),
+            'expired':  ('⌛', '#888',    'rgba(255,255,255,0.03)'),
         }
         icon, color, bg = styles.get(obj.status, ('', '#888', 'transparent'))
         return format_html(
@@ -567,4 +626,60 @@ class PermissionAdmin(admin.ModelAdmin):
             'border-radius:20px;font-size:0.75rem;font-weight:700;">'
             '{} {}</span>',
             bg, color, icon, obj.get_status_display()
-        )
\ No newline at end of file
+        )
+
+
+
+#chat sessions
+
+
+
+from .models import ChatSession, ChatTurn
+
+
+class ChatTurnInline(admin.TabularInline):
+    model = ChatTurn
+    extra = 0
+    readonly_fields = ('seq', 'role', 'content', 'tokens', 'created_at')
+    can_delete = False
+
+
+@admin.register(ChatSession)
+class ChatSessionAdmin(admin.ModelAdmin):
+    list_display    = ('user', 'kind', 'resource', 'turn_count', 'summarized_through', 'updated_at')
+    list_filter     = ('kind',)
+    search_fields   = ('user__username', 'summary')
+    readonly_fields = ('id', 'summarized_through', 'turn_count', 'created_at', 'updated_at')
+    inlines         = [ChatTurnInline]
+
+
+
+#unread badges
+
+
+
+from .models import UnreadCounter
+
+
+@admin.register(UnreadCounter)
+class UnreadCounterAdmin(admin.ModelAdmin):
+    list_display  = ('user', 'announcements', 'goals', 'complaints', 'permissions')
+    search_fields = ('user__username',)
+
+
+# ── Goal analytics ──
+from .models import GoalAnalytics
+
+
+@admin.register(GoalAnalytics)
+class GoalAnalyticsAdmin(admin.ModelAdmin):
+    list_display    = ('goal', 'submitted', 'late', 'scored', 'updated_at')
+    search_fields   = ('goal__title',)
+    readonly_fields = ('goal', 'submitted', 'late', 'scored', 'score_sum', 'histogram', 'questions', 'updated_at')
+    actions         = ['rebuild']
+
+    @admin.action(description='Recompute from submissions')
+    def rebuild(self, request, queryset):
+        for stats in queryset.select_related('goal'):
+            analytics.rebuild(stats.goal)
+        self.message_user(request, f'{queryset.count()} goal(s) recomputed.')
@@ -0,0 +1,278 @@
+"""
+Admission control in front of the LLM-bound chat views.
+
+Three layers, cheapest first:
+  1. a token bucket per user (LLM_USER_RATE_PER_MIN, LLM_USER_BURST),
+  2. a global cap on concurrent LLM calls (LLM_MAX_CONCURRENCY),
+  3. a bounded wait queue for that cap (LLM_QUEUE_SIZE, LLM_QUEUE_TIMEOUT).
+
+Anything that does not fit is shed immediately with ``Overloaded``, which
+the views turn into a 429 with a Retry-After header, instead of piling
+blocked threads onto an upstream that is already rate limiting us.
+"""
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from django.conf import settings
+
+
+class Overloaded(Exception):
+
+    def __init__(self, reason, retry_after):
+        super().__init__(reason)
+        self.reason      = reason        # 'rate_limited' | 'queue_full' | 'timeout'
+        self.retry_after = max(1, math.ceil(retry_after))
+
+
+class AdmissionController:
+
+    def __init__(self, max_concurrency, queue_size, queue_timeout, rate_per_min, burst):
+        self.max_concurrency = max_concurrency
+        self.queue_size      = queue_size
+        self.queue_timeout   = queue_timeout
+        self.rate            = rate_per_min / 60.0     # tokens per second
+        self.burst           = burst
+
+        self._cond     = threading.Condition()
+        self._async_waiters = deque()                  # (loop, future) of aacquire() calls queued for a slot
+        self._buckets  = {}                            # user key -> (tokens, last refill)
+        self.in_flight = 0
+        self.waiting   = 0
+        self.max_waiting = 0
+        self.admitted  = 0
+        self.rejected  = {'rate_limited': 0, 'queue_full': 0, 'timeout': 0}
+        self.waits     = deque(maxlen=500)
+        self.service_time = 1.0                        # EWMA of seconds a slot is held
+
+    # ── Per-user token bucket ─────────────────────────────────────
+    def check_rate(self, key):
+        now = time.monotonic()
+        with self._cond:
+            tokens, last = self._buckets.get(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            if tokens < 1:
+                self.rejected['rate_limited'] += 1
+                self._buckets[key] = (tokens, now)
+                raise Overloaded('rate_limited', (1 - tokens) / self.rate)
+            self._buckets[key] = (tokens - 1, now)
+            if len(self._buckets) > 10000:
+                self._prune(now)
+
+    def _prune(self, now):
+        full = [k for k, (t, last) in self._buckets.items()
+                if t + (now - last) * self.rate >= self.burst]
+        for k in full:
+            del self._buckets[k]
+
+    # ── Global concurrency slots ──────────────────────────────────
+    def _take_slot(self, started):
+        self.in_flight += 1
+        self.admitted  += 1
+        self.waits.append(time.monotonic() - started)
+        return _Slot(self, time.monotonic())
+
+    def _enqueue(self):
+        if self.waiting >= self.queue_size:
+            self.rejected['queue_full'] += 1
+            raise Overloaded('queue_full', self.service_time)
+        self.waiting += 1
+        self.max_waiting = max(self.max_waiting, self.waiting)
+
+    def _timed_out(self):
+        self.rejected['timeout'] += 1
+        return Overloaded('timeout', self.service_time)
+
+    def acquire(self):
+        started = time.monotonic()
+        with self._cond:
+            if self.in_flight < self.max_concurrency:
+                return self._take_slot(started)
+            self._enqueue()
+            try:
+                deadline = started + self.queue_timeout
+                while self.in_flight >= self.max_concurrency:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise self._timed_out()
+                    self._cond.wait(remaining)
+                return self._take_slot(started)
+            finally:
+                self.waiting -= 1
+
+    async def aacquire(self):
+        # Event-loop friendly: waits on a future of its own loop, which
+        # _release() resolves, instead of blocking the loop on the condition
+        started = time.monotonic()
+        loop    = asyncio.get_running_loop()
+        with self._cond:
+            if self.in_flight < self.max_concurrency:
+                return self._take_slot(started)
+            self._enqueue()
+        try:
+            deadline = started + self.queue_timeout
+            while True:
+                waiter = (loop, loop.create_future())
+                with self._cond:
+                    if self.in_flight < self.max_concurrency:
+                        return self._take_slot(started)
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise self._timed_out()
+                    self._async_waiters.append(waiter)
+                try:
+                    await asyncio.wait_for(waiter[1], remaining)
+                except BaseException as e:
+                    with self._cond:
+                        if waiter in self._async_waiters:
+                            self._async_waiters.remove(waiter)
+                        else:
+                            self._wake_async()   # woken as we gave up: pass it on
+                    if not isinstance(e, asyncio.TimeoutError):
+                        raise
+        finally:
+            with self._cond:
+                self.waiting -= 1
+
+    def _wake_async(self):
+        """Wakes the oldest aacquire() waiter; call with the condition held."""
+        while self._async_waiters:
+            loop, future = self._async_waiters.popleft()
+            try:
+                loop.call_soon_threadsafe(_resolve, future)
+                return
+            except RuntimeError:   # its loop has closed
+                continue
+
+    def _release(self, held):
+        with self._cond:
+            self.in_flight -= 1
+            self.service_time = 0.8 * self.service_time + 0.2 * held
+            self._cond.notify()
+            self._wake_async()
+
+    def snapshot(self):
+        with self._cond:
+            waits = sorted(self.waits)
+
+            def pct(p):
+                return round(waits[min(len(waits) - 1, int(len(waits) * p))] * 1000, 1) if waits else None
+
+            return {
+                'in_flight':       self.in_flight,
+                'max_concurrency': self.max_concurrency,
+                'queue_depth':     self.waiting,
+                'max_queue_depth': self.max_waiting,
+                'queue_size':      self.queue_size,
+                'admitted':        self.admitted,
+                'rejected':        dict(self.rejected),
+                'wait_ms':         {'p50': pct(0.5), 'p95': pct(0.95), 'max': pct(1.0)},
+            }
+
+
+def _resolve(future):
+    if not future.done():
+        future.set_result(None)
+
+
+class _Slot:
+    """A held concurrency slot; release() is idempotent."""
+
+    def __init__(self, controller, since):
+        self.controller = controller
+        self.since      = since
+        self.released   = False
+
+    def release(self):
+        if not self.released:
+            self.released = True
+            self.controller._release(time.monotonic() - self.since)
+
+
+_controller = None
+_controller_lock = threading.Lock()
+
+
+def get_controller():
+    global _controller
+    with _controller_lock:
+        if _controller is None:
+            _controller = AdmissionController(
+                max_concurrency=getattr(settings, 'LLM_MAX_CONCURRENCY', 8),
+                queue_size=getattr(settings, 'LLM_QUEUE_SIZE', 32),
+                queue_timeout=getattr(settings, 'LLM_QUEUE_TIMEOUT', 10),
+                rate_per_min=getattr(settings, 'LLM_USER_RATE_PER_MIN', 10),
+                burst=getattr(settings, 'LLM_USER_BURST', 5),
+            )
+        return _controller
+
+
+@contextmanager
+def use_controller(controller):
+    """Temporarily swaps the process-wide controller (tests / benchmarks)."""
+    global _controller
+    with _controller_lock:
+        previous, _controller = _controller, controller
+    try:
+        yield controller
+    finally:
+        with _controller_lock:
+            _controller = previous
+
+
+def client_key(user, request):
+    if user is not None and user.is_authenticated:
+        return f'user:{user.pk}'
+    return f"ip:{request.META.get('REMOTE_ADDR', '')}"
+
+
+def admit(key):
+    """Rate-checks `key` and waits for a slot. Returns the slot; raises Overloaded."""
+    controller = get_controller()
+    controller.check_rate(key)
+    return controller.acquire()
+
+
+async def aadmit(key):
+    controller = get_controller()
+    controller.check_rate(key)
+    return await controller.aacquire()
+
+
+class ReleasingStream:
+    """Streaming body that frees the slot when the stream ends or the
+    response is closed (Django calls close() even if it never iterated)."""
+
+    def __init__(self, events, slot):
+        self.events = events
+        self.slot   = slot
+
+    def __iter__(self):
+        try:
+            yield from self.events
+        finally:
+            self.slot.release()
+
+    def close(self):
+        self.slot.release()
+
+
+class AsyncReleasingStream:
+    """Async twin of ReleasingStream (no __iter__, so Django streams it async)."""
+
+    def __init__(self, events, slot):
+        self.events = events
+        self.slot   = slot
+
+    async def __aiter__(self):
+        try:
+            async for event in self.events:
+                yield event
+        finally:
+            self.slot.release()
+
+    def close(self):
+        self.slot.release()
@@ -0,0 +1,129 @@
+"""
+Per-goal analytics for the submissions page.
+
+GoalAnalytics keeps running totals for a goal: submissions, late ones,
+quiz percentages summed and bucketed into a 10-bar histogram, and per
+MCQ how many answered and how many got it right. grading.submit() adds each
+submission through ``record`` inside its own transaction, from the answers
+it has just graded in memory, so the cost does not grow with the class.
+The first ``record`` for a goal, and ``rebuild`` after admin edits, compute
+the row from scratch with SQL aggregates. ``summary`` turns the row into
+what the page shows without reading submissions or answers, and never
+writes: a goal with no row yet is summarized from the aggregates.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Count, ExpressionWrapper, F, FloatField, Q, Sum
+from django.db.models.functions import Floor
+from django.utils import timezone
+
+from . import quiz_cache
+from .models import GoalAnalytics, GoalSubmission, QuizAnswer
+
+BUCKETS = 10
+
+
+def _bucket(percent):
+    return min(int(percent * BUCKETS / 100), BUCKETS - 1)
+
+
+def record(goal, sub, graded):
+    """Adds one new submission; call inside the transaction that created it."""
+    stats = GoalAnalytics.objects.select_for_update().filter(goal_id=goal.pk).first()
+    if stats is None:
+        # First submission, or rows from before analytics: the aggregates count this one too
+        try:
+            with transaction.atomic():
+                GoalAnalytics.objects.create(goal_id=goal.pk, **_aggregate(goal))
+            return
+        except IntegrityError:
+            # A concurrent first submission created the row first (without this one)
+            stats = GoalAnalytics.objects.select_for_update().get(goal_id=goal.pk)
+    stats.submitted += 1
+    stats.late      += timezone.localdate(sub.submitted_at) > goal.due_date
+    if sub.quiz_total:
+        percent = sub.quiz_score * 100 / sub.quiz_total
+        stats.scored    += 1
+        stats.score_sum += percent
+        stats.histogram[_bucket(percent)] += 1
+    for question_id, _, is_correct in graded:
+        if is_correct is not None:
+            counts = stats.questions.setdefault(str(question_id), [0, 0])
+            counts[0] += 1
+            counts[1] += is_correct
+    stats.save()
+
+
+def _aggregate(goal):
+    """GoalAnalytics field values computed from the goal's submissions and answers."""
+    submissions = GoalSubmission.objects.filter(goal_id=goal.pk)
+    percent = ExpressionWrapper(F('quiz_score') * 100.0 / F('quiz_total'), output_field=FloatField())
+    scored  = Q(quiz_total__gt=0, quiz_score__isnull=False)
+    totals  = submissions.aggregate(
+        submitted=Count('pk'),
+        late=Count('pk', filter=Q(submitted_at__date__gt=goal.due_date)),
+        scored=Count('pk', filter=scored),
+        score_sum=Sum(percent, filter=scored),
+    )
+
+    histogram = [0] * BUCKETS
+    buckets = (submissions.filter(scored).annotate(bucket=Floor(percent * BUCKETS / 100))
+               .order_by().values_list('bucket').annotate(n=Count('pk')))
+    for bucket, n in buckets:
+        histogram[min(int(bucket), BUCKETS - 1)] += n
+
+    answers = (QuizAnswer.objects.filter(submission__goal_id=goal.pk, is_correct__isnull=False)
+               .order_by().values_list('question_id')
+               .annotate(answered=Count('pk'), correct=Count('pk', filter=Q(is_correct=True))))
+
+    return {
+        'submitted': totals['submitted'],
+        'late':      totals['late'],
+        'scored':    totals['scored'],
+        'score_sum': totals['score_sum'] or 0,
+        'histogram': histogram,
+        'questions': {str(question_id): [answered, correct] for question_id, answered, correct in answers},
+    }
+
+
+def rebuild(goal):
+    """Recomputes and stores a goal's analytics (admin edits, repairs)."""
+    stats, _ = GoalAnalytics.objects.update_or_create(goal_id=goal.pk, defaults=_aggregate(goal))
+    return stats
+
+
+def summary(goal):
+    """Template-ready analytics: completion, average, late count, histogram and question difficulty."""
+    stats = GoalAnalytics.objects.filter(goal_id=goal.pk).first()
+    if stats is None:
+        # Nothing submitted yet, or the goal predates analytics: computed, not
+        # stored; the row is only written on the submission path (and by the admin).
+        fields = _aggregate(goal) if goal.submission_count else {'histogram': [0] * BUCKETS}
+        stats  = GoalAnalytics(goal=goal, **fields)
+    tallest = max(stats.histogram, default=0) or 1
+    histogram = [
+        {'label': f'{i * 100 // BUCKETS}%', 'count': n, 'height': round(n * 100 / tallest)}
+        for i, n in enumerate(stats.histogram)
+    ]
+
+    questions = []
+    if goal.goal_type == 'quiz':
+        for q in quiz_cache.questions(goal.pk):
+            if q['qtype'] != 'mcq':
+                continue
+            answered, correct = stats.questions.get(str(q['id']), [0, 0])
+            questions.append({
+                'order':    q['order'],
+                'question': q['question'],
+                'answered': answered,
+                'correct':  correct,
+                'percent':  round(correct * 100 / answered) if answered else None,
+            })
+
+    return {
+        'submitted':  stats.submitted,
+        'late':       stats.late,
+        'completion': round(stats.submitted * 100 / goal.assigned_count) if goal.assigned_count else None,
+        'average':    round(stats.score_sum / stats.scored, 1) if stats.scored else None,
+        'histogram':  histogram if stats.scored else [],
+        'questions':  questions,
+    }
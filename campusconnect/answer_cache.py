@@ -0,0 +1,86 @@
+"""
+Shared cache of RAG answers.
+
+Students of one class ask the bot about the same Resource in nearly the
+same words. An answer is cached under (resource, file version, normalized
+question, retrieved chunk ids) in the ``answers`` cache (TTL + LRU
+culling, see settings.CACHES), so a repeat skips the LLM call entirely.
+"""
+import hashlib
+import re
+
+from asgiref.sync import sync_to_async
+from django.core.cache import caches
+
+CACHE_ALIAS = 'answers'
+HITS_KEY    = 'answer-cache:hits'
+MISSES_KEY  = 'answer-cache:misses'
+
+# Words that change the wording but not the question: articles, copulas and
+# politeness. Question words and verbs stay ("define X" and "explain X" differ)
+FILLER_WORDS = {
+    'a', 'an', 'the',
+    'is', 'are', 'was', 'were', 'be', 's',
+    'please', 'pls', 'kindly',
+}
+
+
+def _cache():
+    return caches[CACHE_ALIAS]
+
+
+def normalize_question(question):
+    words = re.findall(r'\w+', question.lower())
+    kept  = [w for w in words if w not in FILLER_WORDS]
+    return ' '.join(kept or words)
+
+
+def make_key(resource_id, content_hash, question, chunk_ids):
+    raw = f'{resource_id}|{content_hash}|{normalize_question(question)}|{",".join(map(str, chunk_ids))}'
+    return 'answer:' + hashlib.sha1(raw.encode()).hexdigest()
+
+
+def _count(key):
+    cache = _cache()
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:   # evicted between add and incr
+        cache.set(key, 1, timeout=None)
+
+
+def get(key):
+    """Cached answer or None. A None key (uncacheable question) is a no-op."""
+    if key is None:
+        return None
+    answer = _cache().get(key)
+    _count(HITS_KEY if answer is not None else MISSES_KEY)
+    return answer
+
+
+def set(key, answer):
+    if key is not None and answer:
+        _cache().set(key, answer)
+
+
+async def aget(key):
+    if key is None:
+        return None
+    return await sync_to_async(get)(key)
+
+
+async def aset(key, answer):
+    if key is not None and answer:
+        await _cache().aset(key, answer)
+
+
+def stats():
+    cache  = _cache()
+    hits   = cache.get(HITS_KEY, 0)
+    misses = cache.get(MISSES_KEY, 0)
+    total  = hits + misses
+    return {
+        'hits':     hits,
+        'misses':   misses,
+        'hit_rate': round(hits / total, 4) if total else 0.0,
+    }
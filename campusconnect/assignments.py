@@ -0,0 +1,54 @@
+"""
+Bulk goal assignment.
+
+A goal can go out to every student in an audience (year, stream, branch),
+which on a large campus is thousands of rows in the goal/student table.
+``assigned_to.set()`` diffs against the current rows with one huge IN list
+and inserts everything in a single statement. Here the students still
+missing are resolved with one query, inserted with ``bulk_create`` in
+batches of GOAL_ASSIGN_BATCH_SIZE, and their goal badges bumped per batch,
+all in one transaction. ``Goal.assigned_count`` is kept alongside, so
+listings never COUNT the M2M table.
+"""
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import F
+
+from . import unread
+from .models import COMPUTING_BRANCHES, NON_COMPUTING_BRANCHES, Goal
+
+Assignment = Goal.assigned_to.through
+
+
+def audience_students(year='all', stream='all', branch='all'):
+    """Students in a year / stream / branch; 'all' (or blank) leaves that part open."""
+    students = User.objects.filter(profile__role='student')
+    if year and year != 'all':
+        students = students.filter(profile__year=year)
+    if stream and stream != 'all':
+        students = students.filter(profile__branch__in=COMPUTING_BRANCHES if stream == 'computing' else NON_COMPUTING_BRANCHES)
+    if branch and branch != 'all':
+        students = students.filter(profile__branch=branch)
+    return students
+
+
+def assign(goal, students, batch_size=None):
+    """Assigns a User queryset to `goal`, skipping students already on it.
+
+    Returns how many were added; goal.assigned_count is updated in place.
+    """
+    batch_size = batch_size or settings.GOAL_ASSIGN_BATCH_SIZE
+    pending = list(
+        students.exclude(goals_assigned=goal).order_by('pk').values_list('pk', flat=True).distinct()
+    )
+    with transaction.atomic():
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start:start + batch_size]
+            Assignment.objects.bulk_create([Assignment(goal_id=goal.pk, user_id=pk) for pk in batch])
+            unread.bump('goals', batch)
+        if pending:
+            Goal.objects.filter(pk=goal.pk).update(assigned_count=F('assigned_count') + len(pending))
+    goal.assigned_count += len(pending)
+    return len(pending)
+
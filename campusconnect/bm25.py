@@ -0,0 +1,89 @@
+"""
+BM25 retrieval over the chunks of one document.
+
+The index is an inverted index (term -> postings of (chunk id, term
+frequency)) plus the length of every chunk, so a query only touches the
+postings of its own terms instead of re-tokenizing every chunk.
+"""
+import heapq
+import math
+import re
+from collections import Counter, defaultdict
+
+TOKEN_RE = re.compile(r'\b\w+\b')
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower())
+
+
+class BM25Index:
+
+    def __init__(self, postings, doc_lengths, k1=1.5, b=0.75):
+        self.postings    = postings        # {term: [[chunk_id, tf], ...]}
+        self.doc_lengths = doc_lengths     # [len(tokens) per chunk]
+        self.k1          = k1
+        self.b           = b
+        self.num_docs    = len(doc_lengths)
+        self.avg_len     = (sum(doc_lengths) / self.num_docs) if self.num_docs else 0.0
+
+    @classmethod
+    def build(cls, chunks, k1=1.5, b=0.75):
+        postings    = defaultdict(list)
+        doc_lengths = []
+        for doc_id, chunk in enumerate(chunks):
+            tokens = tokenize(chunk)
+            doc_lengths.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                postings[term].append([doc_id, tf])
+        return cls(dict(postings), doc_lengths, k1=k1, b=b)
+
+    # ── Serialization ─────────────────────────────────────────────
+    def to_dict(self):
+        return {
+            'k1':          self.k1,
+            'b':           self.b,
+            'doc_lengths': self.doc_lengths,
+            'postings':    self.postings,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['postings'], data['doc_lengths'], k1=data.get('k1', 1.5), b=data.get('b', 0.75))
+
+    # ── Scoring ───────────────────────────────────────────────────
+    def idf(self, term):
+        df = len(self.postings.get(term, ()))
+        return math.log(1 + (self.num_docs - df + 0.5) / (df + 0.5))
+
+    def score(self, query):
+        """Returns {chunk_id: score} for chunks sharing a term with the query."""
+        scores = defaultdict(float)
+        if not self.num_docs:
+            return scores
+        k1, b, avg_len = self.k1, self.b, self.avg_len or 1.0
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = self.idf(term)
+            for doc_id, tf in postings:
+                norm = k1 * (1 - b + b * self.doc_lengths[doc_id] / avg_len)
+                scores[doc_id] += idf * tf * (k1 + 1) / (tf + norm)
+        return scores
+
+    def top_k(self, query, k=4):
+        """Returns [(chunk_id, score), ...] best first."""
+        scores = self.score(query)
+        return heapq.nlargest(k, scores.items(), key=lambda item: (item[1], -item[0]))
+
+    def search_ids(self, query, top_k=4):
+        """Ids of the best chunks, or of the first ones if nothing matches."""
+        top = [i for i, s in self.top_k(query, top_k) if s > 0]
+        return top if top else list(range(min(top_k, self.num_docs)))
+
+    def search(self, query, chunks, top_k=4):
+        """Same contract as simple_tfidf_search: best chunks, or the first ones if nothing matches."""
+        if not chunks:
+            return []
+        return [chunks[i] for i in self.search_ids(query, top_k)]
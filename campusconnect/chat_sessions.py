@@ -0,0 +1,180 @@
+"""
+Server-side chat sessions for the chat assistants.
+
+The browser sends ``session_id`` instead of re-uploading the whole
+conversation. Each prompt gets the running summary plus the newest turns
+that fit in ``CHAT_CONTEXT_TOKENS``; once ``COMPACT_BATCH`` turns have
+piled up beyond the ``CHAT_KEEP_TURNS`` most recent ones, they are folded
+into the summary by a short LLM call in a background thread, so the summary
+grows incrementally and the request path never waits for it.
+"""
+import logging
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+
+from . import llm
+from .models import ChatSession, ChatTurn
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_PROMPT = (
+    "You maintain a running summary of a conversation between a student and "
+    "an AI study assistant. Merge the new turns into the existing summary. "
+    "Keep facts, names, code and open questions the assistant may need later; "
+    "drop greetings and repetition. Reply with the updated summary only."
+)
+
+COMPACT_BATCH = 4     # turns (two exchanges) folded per summary call
+
+
+def estimate_tokens(text):
+    # ~4 characters per token for English; good enough for budgeting
+    return max(1, len(text) // 4)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+# ── Sessions ─────────────────────────────────────────────────────
+def get_session(user, session_id, kind, resource=None):
+    """The user's session `session_id`, or a new one if missing / not theirs.
+
+    A new session is not saved until record_exchange stores its first turn,
+    so requests that never get an answer (429s, LLM errors) leave no row.
+    """
+    if session_id:
+        try:
+            session = ChatSession.objects.filter(
+                pk=uuid.UUID(str(session_id)), user=user, kind=kind, resource=resource,
+            ).first()
+        except ValueError:
+            session = None
+        if session is not None:
+            return session
+    return ChatSession(user=user, kind=kind, resource=resource)
+
+
+def context_messages(session):
+    """Summary + newest unsummarized turns within the token budget, oldest first."""
+    if session._state.adding:
+        return []
+    budget   = _setting('CHAT_CONTEXT_TOKENS', 1500)
+    messages = []
+    if session.summary:
+        messages.append({
+            "role": "system",
+            "content": f"Summary of the earlier conversation:\n{session.summary}",
+        })
+        budget -= estimate_tokens(session.summary)
+
+    recent = (session.turns
+              .filter(seq__gt=session.summarized_through)
+              .order_by('-seq')
+              .values_list('role', 'content', 'tokens'))
+    kept = []
+    for role, content, tokens in recent:
+        if tokens > budget:
+            break
+        budget -= tokens
+        kept.append({"role": role, "content": content})
+    return messages + kept[::-1]
+
+
+def record_exchange(session, question, reply):
+    """Stores one user/assistant exchange and schedules compaction if due."""
+    with transaction.atomic():
+        if session._state.adding:
+            session.save()
+        # Claim the two seqs with the UPDATE first: it takes the row (on SQLite,
+        # database) write lock before anything is read, so two tabs on one
+        # session can't hand out the same seq, and SQLite waits for the lock
+        # instead of failing a read-to-write upgrade with "database is locked".
+        ChatSession.objects.filter(pk=session.pk).update(turn_count=F('turn_count') + 2)
+        current = ChatSession.objects.values('turn_count', 'summarized_through').get(pk=session.pk)
+        seq = current['turn_count'] - 2
+        ChatTurn.objects.bulk_create([
+            ChatTurn(session_id=session.pk, seq=seq + 1, role='user',
+                     content=question, tokens=estimate_tokens(question)),
+            ChatTurn(session_id=session.pk, seq=seq + 2, role='assistant',
+                     content=reply, tokens=estimate_tokens(reply)),
+        ])
+        session.turn_count = seq + 2
+
+        if session.turn_count - current['summarized_through'] >= _setting('CHAT_KEEP_TURNS', 6) + COMPACT_BATCH:
+            transaction.on_commit(lambda: _submit(session.pk))
+
+
+# ── Compaction ───────────────────────────────────────────────────
+_executor  = None
+_in_flight = set()
+_lock      = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='chat-summary')
+        return _executor
+
+
+def _submit(session_id):
+    with _lock:
+        if session_id in _in_flight:
+            return
+        _in_flight.add(session_id)
+    _get_executor().submit(_run, session_id)
+
+
+def _run(session_id):
+    close_old_connections()
+    try:
+        compact_session(session_id)
+    except Exception:
+        # The token budget still bounds the prompt; retried after the next turn
+        logger.exception('Summarizing chat session %s failed', session_id)
+    finally:
+        with _lock:
+            _in_flight.discard(session_id)
+        close_old_connections()
+
+
+def compact_session(session_id):
+    """Folds every unsummarized turn except the last CHAT_KEEP_TURNS into the summary."""
+    session = ChatSession.objects.filter(pk=session_id).first()
+    if session is None:
+        return None
+
+    upto  = session.turn_count - _setting('CHAT_KEEP_TURNS', 6)
+    turns = list(session.turns
+                 .filter(seq__gt=session.summarized_through, seq__lte=upto)
+                 .values_list('role', 'content'))
+    if not turns:
+        return session
+
+    transcript = "\n\n".join(f"{role.upper()}: {content}" for role, content in turns)
+    summary = llm.chat_completion(
+        model=_setting('CHAT_SUMMARY_MODEL', 'llama-3.1-8b-instant'),
+        messages=[
+            {"role": "system", "content": SUMMARY_PROMPT},
+            {"role": "user", "content": (
+                f"Existing summary:\n{session.summary or '(none yet)'}\n\n"
+                f"New turns:\n{transcript}"
+            )},
+        ],
+        max_tokens=_setting('CHAT_SUMMARY_TOKENS', 300),
+        temperature=0.2,
+    ).strip()
+
+    # Only move forward: a concurrent compaction may have gone further already
+    ChatSession.objects.filter(pk=session_id, summarized_through__lt=upto).update(
+        summary=summary, summarized_through=upto,
+    )
+    session.summary, session.summarized_through = summary, upto
+    return session
@@ -0,0 +1,10 @@
+from django.utils.functional import SimpleLazyObject
+
+from . import unread
+
+
+def unread_counts(request):
+    """`unread` for nav badges; only queried if the template uses it."""
+    if not request.user.is_authenticated:
+        return {}
+    return {'unread': SimpleLazyObject(lambda: unread.counts(request.user))}
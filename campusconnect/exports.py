@@ -0,0 +1,174 @@
+"""
+Streaming grade exports for a goal's submissions.
+
+One row per submission: the student, when and how it was submitted, the
+score, then one column per quiz question with the student's answer. Rows
+come from two cursors read side by side with ``.iterator()`` (submissions
+and answers, both in submission order), so only EXPORT_CHUNK_SIZE rows of
+each are held at a time and memory stays flat however large the class or
+the quiz. ``csv_stream`` and ``xlsx_stream`` turn the rows into chunks for
+a StreamingHttpResponse.
+
+The XLSX writer is a minimal single-sheet workbook written with the
+standard library (zipfile, inline strings), so no spreadsheet package is
+needed and nothing is built up in memory before the download starts.
+"""
+import csv
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.utils import timezone
+
+from . import quiz_cache
+from .models import GoalSubmission, QuizAnswer
+
+SUBMISSION_COLUMNS = ['Roll no', 'Username', 'Name', 'Submitted at', 'Late', 'Status', 'Score', 'Total', 'Percent']
+
+
+def question_header(q):
+    header = f"Q{q['order']}"
+    return f"{header} [{q['correct']}]" if q['qtype'] == 'mcq' and q['correct'] else header
+
+
+def rows(goal):
+    """Yields the header, then one list of cells per submission."""
+    questions = quiz_cache.questions(goal.pk) if goal.goal_type == 'quiz' else []
+    column    = {q['id']: i for i, q in enumerate(questions)}
+    chunk     = settings.EXPORT_CHUNK_SIZE
+    yield SUBMISSION_COLUMNS + [question_header(q) for q in questions]
+
+    submissions = (GoalSubmission.objects.filter(goal_id=goal.pk).order_by('pk')
+                   .values_list('pk', 'student__profile__roll_no', 'student__username', 'student__first_name',
+                                'student__last_name', 'submitted_at', 'status', 'quiz_score', 'quiz_total')
+                   .iterator(chunk_size=chunk))
+    answers = (QuizAnswer.objects.filter(submission__goal_id=goal.pk).order_by('submission_id')
+               .values_list('submission_id', 'question_id', 'answer')
+               .iterator(chunk_size=chunk)) if questions else iter(())
+    pending = next(answers, None)
+
+    for pk, roll_no, username, first, last, submitted_at, status, score, total in submissions:
+        cells = [''] * len(questions)
+        while pending is not None and pending[0] <= pk:
+            if pending[0] == pk and pending[1] in column:
+                cells[column[pending[1]]] = pending[2]
+            pending = next(answers, None)
+        local = timezone.localtime(submitted_at)
+        yield [
+            roll_no or '',
+            username,
+            f'{first} {last}'.strip(),
+            local.strftime('%Y-%m-%d %H:%M'),
+            'yes' if local.date() > goal.due_date else 'no',
+            status,
+            score if total else '',
+            total or '',
+            round(score * 100 / total, 1) if total and score is not None else '',
+        ] + cells
+
+
+# ── CSV ──
+
+class _Echo:
+    """File-like object for csv.writer that hands each line back instead of storing it."""
+    def write(self, value):
+        return value
+
+
+def _safe(value):
+    # Spreadsheets run cells starting with these as formulas; answers are typed by students
+    if isinstance(value, str) and value[:1] in ('=', '+', '-', '@'):
+        return "'" + value
+    return value
+
+
+def csv_stream(rows):
+    writer = csv.writer(_Echo())
+    yield '\ufeff'   # BOM so Excel reads the file as UTF-8
+    for row in rows:
+        yield writer.writerow([_safe(value) for value in row])
+
+
+# ── XLSX ──
+
+class _Drain:
+    """Unseekable file for ZipFile: collects what it writes until ``take`` empties it."""
+    def __init__(self):
+        self.parts = []
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self):
+        data, self.parts = b''.join(self.parts), []
+        return data
+
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Target="xl/workbook.xml" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+    '</Relationships>'
+)
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="Submissions" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Target="worksheets/sheet1.xml" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet"/>'
+    '</Relationships>'
+)
+_SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+_SHEET_END = '</sheetData></worksheet>'
+
+_INVALID_XML = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+def _cell(value):
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return f'<c><v>{value}</v></c>'
+    text = escape(_INVALID_XML.sub('', str(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def xlsx_stream(rows):
+    out = _Drain()
+    with zipfile.ZipFile(out, 'w', zipfile.ZIP_DEFLATED) as book:
+        book.writestr('[Content_Types].xml', _CONTENT_TYPES)
+        book.writestr('_rels/.rels', _ROOT_RELS)
+        book.writestr('xl/workbook.xml', _WORKBOOK)
+        book.writestr('xl/_rels/workbook.xml.rels', _WORKBOOK_RELS)
+        with book.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write(_SHEET_START.encode())
+            for row in rows:
+                sheet.write(('<row>' + ''.join(map(_cell, row)) + '</row>').encode())
+                if out.parts:   # the compressor hands over output in blocks
+                    yield out.take()
+            sheet.write(_SHEET_END.encode())
+    yield out.take()
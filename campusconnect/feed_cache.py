@@ -0,0 +1,83 @@
+"""
+Rendered-fragment cache for the announcements feed.
+
+Students of one year and branch see the same feed, so a page of rendered
+cards is cached per audience segment (year, stream, branch, priority,
+cursor) in the ``fragments`` cache. Every key embeds the current feed
+version; posting, editing or deleting an announcement bumps the version,
+which orphans all cached pages at once (they age out via TTL / culling).
+
+Only the student view is cached: faculty cards carry per-user CSRF tokens
+in their edit/delete forms. With several worker processes, point the
+``fragments`` alias at a shared cache (REDIS_URL), otherwise a bump only
+reaches the process that handled the write.
+"""
+import hashlib
+import time
+
+from django.core.cache import caches
+
+CACHE_ALIAS = 'fragments'
+VERSION_KEY = 'feed:version'
+HITS_KEY    = 'feed-cache:hits'
+MISSES_KEY  = 'feed-cache:misses'
+
+
+def _cache():
+    return caches[CACHE_ALIAS]
+
+
+def version():
+    cache = _cache()
+    current = cache.get(VERSION_KEY)
+    if current is None:
+        # Clock-based seed: an evicted version never restarts below an old one
+        cache.add(VERSION_KEY, int(time.time() * 1000), timeout=None)
+        current = cache.get(VERSION_KEY)
+    return current
+
+
+def bump():
+    """Invalidates every cached feed page."""
+    cache = _cache()
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:   # not set yet, or evicted
+        cache.set(VERSION_KEY, int(time.time() * 1000), timeout=None)
+
+
+def make_key(filters, cursor=None):
+    segment = '|'.join([filters['year'], filters['stream'], filters['branch'], filters['priority'], cursor or ''])
+    return f'feed:{version()}:' + hashlib.sha1(segment.encode()).hexdigest()
+
+
+def _count(key):
+    cache = _cache()
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:   # evicted between add and incr
+        cache.set(key, 1, timeout=None)
+
+
+def get(key):
+    page = _cache().get(key)
+    _count(HITS_KEY if page is not None else MISSES_KEY)
+    return page
+
+
+def set(key, page):
+    _cache().set(key, page)
+
+
+def stats():
+    cache  = _cache()
+    hits   = cache.get(HITS_KEY, 0)
+    misses = cache.get(MISSES_KEY, 0)
+    total  = hits + misses
+    return {
+        'version':  cache.get(VERSION_KEY),
+        'hits':     hits,
+        'misses':   misses,
+        'hit_rate': round(hits / total, 4) if total else 0.0,
+    }
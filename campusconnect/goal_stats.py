@@ -0,0 +1,52 @@
+"""
+Counters behind the teacher goals dashboard.
+
+Goal.assigned_count, submission_count and reviewed_count are stored on the
+goal and moved by the code that changes them, inside the same transaction:
+assignments.assign() for students, the goal_detail and review_submission
+views for submissions. ``dashboard`` reads them together with the average
+quiz score in a single query, so the page costs the same for 2 goals or 200.
+Edits made through the admin call ``recount``.
+"""
+from django.db.models import Avg, Count, ExpressionWrapper, F, FloatField, Subquery
+from django.db.models.functions import Coalesce, NullIf
+
+from .models import Goal, GoalSubmission
+
+REVIEWED = ['reviewed', 'approved', 'rejected']
+
+
+def submitted(goal_id):
+    Goal.objects.filter(pk=goal_id).update(submission_count=F('submission_count') + 1)
+
+
+def status_changed(goal_id, old, new):
+    """Keeps reviewed_count right when a submission moves in or out of 'submitted'."""
+    delta = (new in REVIEWED) - (old in REVIEWED)
+    if delta:
+        Goal.objects.filter(pk=goal_id).update(reviewed_count=F('reviewed_count') + delta)
+
+
+def _count(rows):
+    return Coalesce(Subquery(rows.order_by().values('goal_id').annotate(n=Count('pk')).values('n')), 0)
+
+
+def recount(*goals):
+    """Re-derives the stored counters from the rows (one UPDATE per goal)."""
+    Assignment = Goal.assigned_to.through
+    for goal in goals:
+        submissions = GoalSubmission.objects.filter(goal_id=goal.pk)
+        Goal.objects.filter(pk=goal.pk).update(
+            assigned_count=_count(Assignment.objects.filter(goal_id=goal.pk)),
+            submission_count=_count(submissions),
+            reviewed_count=_count(submissions.filter(status__in=REVIEWED)),
+        )
+
+
+def dashboard(teacher):
+    """A teacher's goals with the counters and `avg_score` (mean quiz percentage, or None)."""
+    percent = ExpressionWrapper(
+        F('submissions__quiz_score') * 100.0 / NullIf(F('submissions__quiz_total'), 0),
+        output_field=FloatField(),
+    )
+    return Goal.objects.filter(assigned_by=teacher).annotate(avg_score=Avg(percent))
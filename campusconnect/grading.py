@@ -0,0 +1,65 @@
+"""
+Goal submissions and quiz grading.
+
+The answer key of a quiz, (question id, type, correct letter) per question,
+comes from the per-goal question cache (quiz_cache.py). A submission is
+scored in memory against it, then the GoalSubmission, its score and every
+QuizAnswer are written in one transaction: one INSERT for the submission,
+a bulk_create for the answers, and the counter/analytics/badge updates.
+That is a handful of queries whatever the number of questions, where one
+INSERT per answer used to hold the SQLite write lock for the whole loop
+while the class submitted at the deadline.
+"""
+from django.db import IntegrityError, transaction
+
+from . import analytics, goal_stats, quiz_cache, unread
+from .models import GoalSubmission, QuizAnswer
+
+
+def grade(key, form):
+    """Scores the goal_detail form's answer_<question id> fields; only MCQs are auto-marked.
+
+    Returns (score, total, [(question id, answer, is_correct), ...]).
+    """
+    score, graded = 0, []
+    for question_id, qtype, correct in key:
+        answer     = form.get(f'answer_{question_id}', '').strip()
+        is_correct = None
+        if qtype == 'mcq':
+            is_correct = answer.upper() == correct.upper()
+            score += is_correct
+        graded.append((question_id, answer, is_correct))
+    return score, len(key), graded
+
+
+def submit(goal, student, note='', file=None, form=None):
+    """Records a student's submission (graded if the goal is a quiz).
+
+    Returns the GoalSubmission, or None if the student had already submitted.
+    """
+    score = total = None
+    graded = []
+    if goal.goal_type == 'quiz':
+        score, total, graded = grade(quiz_cache.answer_key(goal.pk), form or {})
+
+    try:
+        with transaction.atomic():
+            sub = GoalSubmission.objects.create(
+                goal=goal, student=student, note=note, file=file,
+                quiz_score=score, quiz_total=total,
+            )
+            QuizAnswer.objects.bulk_create([
+                QuizAnswer(submission=sub, question_id=question_id, answer=answer, is_correct=is_correct)
+                for question_id, answer, is_correct in graded
+            ])
+            goal_stats.submitted(goal.pk)
+            analytics.record(goal, sub, graded)
+            unread.bump('goals', goal.assigned_by_id)
+    except IntegrityError:
+        # A double-click or second tab lost the race on (goal, student); any
+        # other integrity failure is a real error and must not look like one
+        if GoalSubmission.objects.filter(goal_id=goal.pk, student_id=student.pk).exists():
+            return None
+        raise
+    return sub
+
@@ -0,0 +1,139 @@
+"""
+Resized, metadata-free variants of uploaded images.
+
+Announcement images and avatars used to be served exactly as uploaded, so
+every feed load pulled full-size phone photos. When one of those fields
+changes, ``refresh_variants`` renders the image at each VARIANTS width as
+WebP and JPEG and records on the row:
+
+    <field>_width / <field>_height   size of the original, after EXIF rotation
+    <field>_variants                 {'source': name the variants were made from,
+                                      'sizes': [{'name', 'width', 'height', 'webp', 'jpeg'}, ...]}
+
+Re-encoding keeps no EXIF, GPS or comment blocks. Templates render the
+variants with ``{% picture %}`` (templatetags/responsive_images.py); rows
+uploaded before this existed are filled in by
+``manage.py backfill_image_variants``.
+"""
+import hashlib
+import io
+import logging
+import os
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Largest first: each variant is resized from the previous one
+VARIANTS    = [('full', 1600), ('card', 800), ('thumb', 192)]
+VARIANT_DIR = 'variants'
+ROTATED     = {5, 6, 7, 8}    # EXIF orientations that swap width and height
+
+
+def render(data):
+    """Encodes the variants of an image given as bytes.
+
+    Returns (width, height, [(name, width, height, webp_bytes, jpeg_bytes)]).
+    Pure Pillow, so it can run in a pool worker. Variants never upscale; one
+    that would come out the same size as a larger one is skipped.
+    """
+    with Image.open(io.BytesIO(data)) as im:
+        width, height = im.size
+        if im.getexif().get(0x0112) in ROTATED:
+            width, height = height, width
+        # Let the JPEG decoder downscale (DCT scaling) to no less than the largest variant
+        im.draft('RGB', (VARIANTS[0][1], VARIANTS[0][1]))
+        im = ImageOps.exif_transpose(im)
+        has_alpha = im.mode in ('RGBA', 'LA') or (im.mode == 'P' and 'transparency' in im.info)
+        im = im.convert('RGBA' if has_alpha else 'RGB')
+
+    rendered, seen = [], set()
+    for name, target in VARIANTS:
+        w = min(target, im.width)
+        if w in seen:
+            continue
+        seen.add(w)
+        h = max(1, round(im.height * w / im.width))
+        if (w, h) != im.size:
+            im = im.resize((w, h), Image.Resampling.LANCZOS, reducing_gap=3.0)
+
+        webp = io.BytesIO()
+        im.save(webp, 'WEBP', quality=settings.IMAGE_WEBP_QUALITY, method=4)
+        flat = im
+        if has_alpha:   # JPEG has no alpha channel: flatten onto white
+            flat = Image.new('RGB', im.size, 'white')
+            flat.paste(im, mask=im.getchannel('A'))
+        jpeg = io.BytesIO()
+        flat.save(jpeg, 'JPEG', quality=settings.IMAGE_JPEG_QUALITY, optimize=True, progressive=True)
+        rendered.append((name, w, h, webp.getvalue(), jpeg.getvalue()))
+    return width, height, rendered
+
+
+def needs_variants(instance, field_name):
+    """True if the image in `field_name` changed since its variants were made."""
+    source = (getattr(instance, f'{field_name}_variants') or {}).get('source', '')
+    return source != (getattr(instance, field_name).name or '')
+
+
+def refresh_variants(instance, field_name):
+    """Renders and stores variants for a saved row whose image changed (see module docstring)."""
+    if not needs_variants(instance, field_name):
+        return False
+    field    = getattr(instance, field_name)
+    rendered = None
+    if field.name:
+        try:
+            with field.open('rb') as fp:
+                rendered = render(fp.read())
+        except (OSError, ValueError, Image.DecompressionBombError):
+            logger.warning('Could not render variants of %s', field.name, exc_info=True)
+    save_variants(instance, field_name, rendered)
+    return True
+
+
+def save_variants(instance, field_name, rendered):
+    """Writes the output of render() next to the original and records it on the row.
+
+    `rendered` is None for a cleared or unreadable image; the source name is
+    still recorded so it isn't retried on every save, and templates fall back
+    to the original file. Variants of the previous image are deleted.
+    """
+    field   = getattr(instance, field_name)
+    storage = field.storage
+    old     = getattr(instance, f'{field_name}_variants') or {}
+    width = height = None
+    sizes = []
+    if rendered is not None:
+        width, height, encoded = rendered
+        folder, base = os.path.split(field.name)
+        stem   = os.path.splitext(base)[0]
+        digest = hashlib.sha1(field.name.encode()).hexdigest()[:8]
+        for name, w, h, webp, jpeg in encoded:
+            prefix = os.path.join(folder, VARIANT_DIR, f'{stem}-{digest}-{name}')
+            sizes.append({
+                'name':   name,
+                'width':  w,
+                'height': h,
+                'webp':   storage.save(f'{prefix}.webp', ContentFile(webp)),
+                'jpeg':   storage.save(f'{prefix}.jpg', ContentFile(jpeg)),
+            })
+
+    updates = {
+        f'{field_name}_width':    width,
+        f'{field_name}_height':   height,
+        f'{field_name}_variants': {'source': field.name or '', 'sizes': sizes},
+    }
+    for attr, value in updates.items():
+        setattr(instance, attr, value)
+    # Queryset update: no save() recursion and no auto_now bump
+    type(instance)._default_manager.filter(pk=instance.pk).update(**updates)
+    delete_variants(storage, old)
+
+
+def delete_variants(storage, variants):
+    for size in (variants or {}).get('sizes', []):
+        for fmt in ('webp', 'jpeg'):
+            if size.get(fmt):
+                storage.delete(size[fmt])
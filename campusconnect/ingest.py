@@ -0,0 +1,86 @@
+"""
+Background ingestion of uploaded resources.
+
+Text extraction, OCR fallback, chunking and BM25 indexing run in a small
+in-process thread pool right after upload, so the chat request path only
+ever reads the finished ``ResourceText`` row. No external broker: the
+job state lives on ``ResourceText.status``.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from resources.models import Resource, ResourceText
+
+logger = logging.getLogger(__name__)
+
+_executor  = None
+_in_flight = set()
+_lock      = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'INGEST_WORKERS', 2),
+                thread_name_prefix='ingest',
+            )
+        return _executor
+
+
+def enqueue_resource(resource):
+    """Marks the resource as queued and schedules ingestion after commit."""
+    from .rag import is_pdf
+    if not is_pdf(resource):
+        return
+
+    ResourceText.objects.update_or_create(
+        resource=resource, defaults={'status': 'pending', 'error': ''},
+    )
+    transaction.on_commit(lambda: _submit(resource.pk))
+
+
+def _submit(resource_id):
+    with _lock:
+        if resource_id in _in_flight:
+            return
+        _in_flight.add(resource_id)
+    _get_executor().submit(_run, resource_id)
+
+
+def _run(resource_id):
+    close_old_connections()
+    try:
+        ingest_resource(resource_id)
+    finally:
+        with _lock:
+            _in_flight.discard(resource_id)
+        close_old_connections()
+
+
+def ingest_resource(resource_id):
+    """Runs the full pipeline for one resource, synchronously."""
+    from .rag import build_resource_store
+
+    resource = Resource.objects.filter(pk=resource_id).first()
+    if resource is None:
+        return None
+
+    ResourceText.objects.update_or_create(
+        resource=resource, defaults={'status': 'indexing', 'error': ''},
+    )
+    try:
+        store = build_resource_store(resource)
+    except Exception as e:
+        logger.exception('Ingestion failed for resource %s', resource_id)
+        ResourceText.objects.filter(resource=resource).update(status='failed', error=str(e), updated_at=timezone.now())
+        return None
+
+    logger.info('Indexed resource %s: %d chunks, %s', resource_id, len(store.chunks), store.timings)
+    return store
@@ -0,0 +1,348 @@
+"""
+Process-wide LLM client manager for the chat views.
+
+One backend instance (and so one pooled HTTP client) is shared by every
+request instead of building ``Groq(...)`` per call. Calls go through
+``chat_completion`` / ``stream_chat`` (and their async twins), which add
+timeouts, retries with exponential backoff and latency/error metrics.
+
+The backend is pluggable via ``settings.LLM_BACKEND``: ``GroqBackend``
+talks to Groq (or any OpenAI-compatible server at ``LLM_BASE_URL``, e.g.
+``manage.py fake_llm_server``), ``FakeBackend`` answers in-process for
+tests and benchmarks.
+"""
+import asyncio
+import random
+import threading
+import time
+import weakref
+from collections import deque
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class LLMError(Exception):
+    pass
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# BACKENDS
+# ─────────────────────────────────────────────────────────────────────────────
+
+class LLMBackend:
+    """Interface every backend implements. kwargs are OpenAI-style
+    completion arguments (model, messages, max_tokens, temperature)."""
+
+    name = 'base'
+    retryable_errors = ()
+
+    def complete(self, **kwargs):
+        raise NotImplementedError
+
+    def stream(self, **kwargs):
+        """Yields the text deltas of a completion."""
+        raise NotImplementedError
+
+    async def acomplete(self, **kwargs):
+        raise NotImplementedError
+
+    async def astream(self, **kwargs):
+        raise NotImplementedError
+        yield
+
+
+class GroqBackend(LLMBackend):
+    name = 'groq'
+
+    def __init__(self):
+        import groq
+        self.retryable_errors = (
+            groq.APIConnectionError, groq.APITimeoutError,
+            groq.RateLimitError, groq.InternalServerError,
+        )
+        self._lock = threading.Lock()
+        self._client = None
+        self._async_clients = weakref.WeakKeyDictionary()   # event loop -> AsyncGroq
+
+    def _client_kwargs(self):
+        api_key  = settings.GROQ_API_KEY
+        base_url = getattr(settings, 'LLM_BASE_URL', None)
+        if not api_key and not base_url:
+            raise LLMError('GROQ_API_KEY not set in .env / settings.py')
+        return {
+            'api_key':     api_key or 'local',
+            'base_url':    base_url,
+            'timeout':     getattr(settings, 'LLM_TIMEOUT', 30),
+            'max_retries': 0,   # retried (and counted) by the manager instead
+        }
+
+    def _limits(self):
+        import httpx
+        size = getattr(settings, 'LLM_MAX_CONNECTIONS', 20)
+        return httpx.Limits(max_connections=size, max_keepalive_connections=size)
+
+    @property
+    def client(self):
+        with self._lock:
+            if self._client is None:
+                import httpx
+                from groq import Groq
+                self._client = Groq(http_client=httpx.Client(limits=self._limits()), **self._client_kwargs())
+            return self._client
+
+    @property
+    def async_client(self):
+        # httpx async pools are bound to the event loop that opened them
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            import httpx
+            from groq import AsyncGroq
+            client = AsyncGroq(http_client=httpx.AsyncClient(limits=self._limits()), **self._client_kwargs())
+            self._async_clients[loop] = client
+        return client
+
+    def complete(self, **kwargs):
+        response = self.client.chat.completions.create(**kwargs)
+        return response.choices[0].message.content
+
+    def stream(self, **kwargs):
+        for chunk in self.client.chat.completions.create(stream=True, **kwargs):
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta:
+                yield delta
+
+    async def acomplete(self, **kwargs):
+        response = await self.async_client.chat.completions.create(**kwargs)
+        return response.choices[0].message.content
+
+    async def astream(self, **kwargs):
+        async for chunk in await self.async_client.chat.completions.create(stream=True, **kwargs):
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta:
+                yield delta
+
+
+class FakeBackend(LLMBackend):
+    """Answers locally after `latency` seconds, streaming `tokens` words."""
+    name = 'fake'
+
+    def __init__(self, latency=None, tokens=20):
+        self.latency = getattr(settings, 'LLM_FAKE_LATENCY', 0.5) if latency is None else latency
+        self.tokens  = tokens
+
+    def _words(self, messages):
+        question = messages[-1]['content'] if messages else ''
+        return [f'Answer to "{question[:40]}"'] + [f' word{i}' for i in range(self.tokens - 1)]
+
+    def complete(self, messages=(), **kwargs):
+        time.sleep(self.latency)
+        return ''.join(self._words(messages))
+
+    def stream(self, messages=(), **kwargs):
+        words = self._words(messages)
+        for word in words:
+            time.sleep(self.latency / len(words))
+            yield word
+
+    async def acomplete(self, messages=(), **kwargs):
+        await asyncio.sleep(self.latency)
+        return ''.join(self._words(messages))
+
+    async def astream(self, messages=(), **kwargs):
+        words = self._words(messages)
+        for word in words:
+            await asyncio.sleep(self.latency / len(words))
+            yield word
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            path = getattr(settings, 'LLM_BACKEND', 'campusconnect.llm.GroqBackend')
+            _backend = import_string(path)()
+        return _backend
+
+
+@contextmanager
+def use_backend(backend):
+    """Temporarily swaps the process-wide backend (tests / benchmarks)."""
+    global _backend
+    with _backend_lock:
+        previous, _backend = _backend, backend
+    try:
+        yield backend
+    finally:
+        with _backend_lock:
+            _backend = previous
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# METRICS
+# ─────────────────────────────────────────────────────────────────────────────
+
+class LLMMetrics:
+    """Thread-safe call counters plus a window of recent latencies."""
+
+    def __init__(self, window=500):
+        self._lock = threading.Lock()
+        self.window = window
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.calls     = 0
+            self.errors    = 0
+            self.retries   = 0
+            self.latencies = deque(maxlen=self.window)
+            self.first_token = deque(maxlen=self.window)
+            self.last_error  = ''
+
+    def record(self, seconds, ok, error='', first_token=None):
+        with self._lock:
+            self.calls += 1
+            self.latencies.append(seconds)
+            if first_token is not None:
+                self.first_token.append(first_token)
+            if not ok:
+                self.errors += 1
+                self.last_error = error
+
+    def record_retry(self):
+        with self._lock:
+            self.retries += 1
+
+    @staticmethod
+    def _pct(values, pct):
+        if not values:
+            return None
+        ordered = sorted(values)
+        return round(ordered[min(len(ordered) - 1, int(len(ordered) * pct))] * 1000, 1)
+
+    def snapshot(self):
+        with self._lock:
+            lat, ftt = list(self.latencies), list(self.first_token)
+            return {
+                'backend':    get_backend().name,
+                'calls':      self.calls,
+                'errors':     self.errors,
+                'retries':    self.retries,
+                'error_rate': round(self.errors / self.calls, 4) if self.calls else 0.0,
+                'latency_ms': {'p50': self._pct(lat, 0.5), 'p95': self._pct(lat, 0.95), 'max': self._pct(lat, 1.0)},
+                'first_token_ms': {'p50': self._pct(ftt, 0.5), 'p95': self._pct(ftt, 0.95)},
+                'last_error': self.last_error,
+            }
+
+
+metrics = LLMMetrics()
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# CALLS (retries + backoff + metrics)
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _backoff(attempt):
+    base = getattr(settings, 'LLM_RETRY_BACKOFF', 0.5)
+    return min(8.0, base * (2 ** attempt)) * (0.5 + random.random() / 2)
+
+
+def _max_retries():
+    return getattr(settings, 'LLM_MAX_RETRIES', 2)
+
+
+def chat_completion(**kwargs):
+    backend = get_backend()
+    started = time.perf_counter()
+    for attempt in range(_max_retries() + 1):
+        try:
+            reply = backend.complete(**kwargs)
+        except backend.retryable_errors as e:
+            if attempt == _max_retries():
+                metrics.record(time.perf_counter() - started, False, str(e))
+                raise
+            metrics.record_retry()
+            time.sleep(_backoff(attempt))
+        except Exception as e:
+            metrics.record(time.perf_counter() - started, False, str(e))
+            raise
+        else:
+            metrics.record(time.perf_counter() - started, True)
+            return reply
+
+
+async def achat_completion(**kwargs):
+    backend = get_backend()
+    started = time.perf_counter()
+    for attempt in range(_max_retries() + 1):
+        try:
+            reply = await backend.acomplete(**kwargs)
+        except backend.retryable_errors as e:
+            if attempt == _max_retries():
+                metrics.record(time.perf_counter() - started, False, str(e))
+                raise
+            metrics.record_retry()
+            await asyncio.sleep(_backoff(attempt))
+        except Exception as e:
+            metrics.record(time.perf_counter() - started, False, str(e))
+            raise
+        else:
+            metrics.record(time.perf_counter() - started, True)
+            return reply
+
+
+def stream_chat(**kwargs):
+    """Yields text deltas. Retries only before the first token arrives."""
+    backend = get_backend()
+    started = time.perf_counter()
+    first   = None
+    attempt = 0
+    while True:
+        try:
+            for delta in backend.stream(**kwargs):
+                if first is None:
+                    first = time.perf_counter() - started
+                yield delta
+            break
+        except backend.retryable_errors as e:
+            if first is not None or attempt == _max_retries():
+                metrics.record(time.perf_counter() - started, False, str(e), first)
+                raise
+            metrics.record_retry()
+            time.sleep(_backoff(attempt))
+            attempt += 1
+        except Exception as e:
+            metrics.record(time.perf_counter() - started, False, str(e), first)
+            raise
+    metrics.record(time.perf_counter() - started, True, first_token=first)
+
+
+async def astream_chat(**kwargs):
+    backend = get_backend()
+    started = time.perf_counter()
+    first   = None
+    attempt = 0
+    while True:
+        try:
+            async for delta in backend.astream(**kwargs):
+                if first is None:
+                    first = time.perf_counter() - started
+                yield delta
+            break
+        except backend.retryable_errors as e:
+            if first is not None or attempt == _max_retries():
+                metrics.record(time.perf_counter() - started, False, str(e), first)
+                raise
+            metrics.record_retry()
+            await asyncio.sleep(_backoff(attempt))
+            attempt += 1
+        except Exception as e:
+            metrics.record(time.perf_counter() - started, False, str(e), first)
+            raise
+    metrics.record(time.perf_counter() - started, True, first_token=first)
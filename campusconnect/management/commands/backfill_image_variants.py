@@ -0,0 +1,68 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from campusconnect import feed_cache, images
+from campusconnect.models import Announcement, UserProfile
+
+TARGETS = [
+    (Announcement, 'image'),
+    (UserProfile,  'avatar'),
+]
+
+
+class Command(BaseCommand):
+    help = 'Renders resized WebP/JPEG variants for announcement images and avatars that have none yet.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=None, help='Encoder processes (default: IMAGE_WORKERS or all cores)')
+        parser.add_argument('--force', action='store_true', help='Re-render images that already have variants')
+
+    def handle(self, *args, **opts):
+        workers = opts['workers'] or settings.IMAGE_WORKERS or os.cpu_count()
+        t0 = time.perf_counter()
+        done = 0
+        # Decoding and encoding are CPU-bound: a process pool, not threads. Files
+        # are read and variants written here, so any storage backend works.
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for model, field_name in TARGETS:
+                qs = model.objects.exclude(Q(**{field_name: ''}) | Q(**{f'{field_name}__isnull': True}))
+                pending = [obj for obj in qs.iterator() if opts['force'] or images.needs_variants(obj, field_name)]
+                self.stdout.write(f'{model.__name__}.{field_name}: {len(pending)} to process')
+                # Bounded windows keep at most a few originals in memory per worker
+                window = workers * 4
+                for start in range(0, len(pending), window):
+                    done += self.render_batch(pool, pending[start:start + window], field_name)
+
+        if done:
+            feed_cache.bump()   # cached cards still point at the originals
+        self.stdout.write(self.style.SUCCESS(
+            f'Rendered variants for {done} images in {time.perf_counter() - t0:.1f}s with {workers} workers'
+        ))
+
+    def render_batch(self, pool, batch, field_name):
+        futures = {}
+        for obj in batch:
+            field = getattr(obj, field_name)
+            try:
+                with field.open('rb') as fp:
+                    futures[pool.submit(images.render, fp.read())] = obj
+            except OSError as exc:
+                self.stderr.write(f'{field.name}: {exc}')
+                images.save_variants(obj, field_name, None)
+
+        rendered = 0
+        for future in as_completed(futures):
+            obj = futures[future]
+            try:
+                result = future.result()
+                rendered += 1
+            except Exception as exc:   # unreadable / not an image: recorded, original kept
+                self.stderr.write(f'{getattr(obj, field_name).name}: {exc}')
+                result = None
+            images.save_variants(obj, field_name, result)
+        return rendered
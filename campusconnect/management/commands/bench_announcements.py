@@ -0,0 +1,110 @@
+import random
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+
+from campusconnect.models import Announcement, BRANCH_CHOICES, COMPUTING_BRANCHES
+
+
+VIEWERS = [
+    ('1', 'computing',     'cse'),
+    ('2', 'non-computing', 'ece'),
+    ('3', 'computing',     'aiml'),
+    ('4', 'non-computing', 'me'),
+]
+
+
+class Rollback(Exception):
+    pass
+
+
+def random_target(rng):
+    """Mostly targeted posts, some campus-wide, like a real feed."""
+    branch = rng.choice([code for code, _ in BRANCH_CHOICES])
+    stream = 'computing' if branch in COMPUTING_BRANCHES else 'non-computing'
+    return (
+        rng.choice(['all', '1', '2', '3', '4']),
+        rng.choice(['all', stream]),
+        rng.choice(['all', branch, branch, branch]),
+    )
+
+
+def legacy_feed(year, stream, branch):
+    # The OR-chains the announcements view used before the audience index
+    return (Announcement.objects
+            .filter(Q(target_year='all') | Q(target_year=year))
+            .filter(Q(target_stream='all') | Q(target_stream=stream))
+            .filter(Q(target_branch='all') | Q(target_branch=branch)))
+
+
+def indexed_feed(year, stream, branch):
+    return Announcement.objects.for_audience(year, stream, branch)
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks the audience index against the old Q-filter feed (rolled back afterwards).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=100000, help='Announcements to generate')
+        parser.add_argument('--page', type=int, default=20, help='Rows fetched per feed load')
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def timed(self, build, opts):
+        t0 = time.perf_counter()
+        for _ in range(opts['repeat']):
+            for viewer in VIEWERS:
+                qs = build(*viewer)
+                qs.count()
+                list(qs.values_list('pk', flat=True)[:opts['page']])
+        return (time.perf_counter() - t0) * 1000 / (opts['repeat'] * len(VIEWERS))
+
+    def plan(self, qs):
+        with connection.cursor() as cursor:
+            sql, params = qs.values_list('pk', flat=True)[:20].query.sql_with_params()
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}' if connection.vendor == 'sqlite' else f'EXPLAIN {sql}', params)
+            return ' / '.join(str(row[-1]) for row in cursor.fetchall())
+
+    def handle(self, *args, **opts):
+        try:
+            with transaction.atomic():
+                self.run(opts)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, opts):
+        rng    = random.Random(42)
+        author = User.objects.create_user(username='bench-announcements')
+
+        t0 = time.perf_counter()
+        rows = []
+        for i in range(opts['count']):
+            year, stream, branch = random_target(rng)
+            rows.append(Announcement(
+                title=f'Notice {i}', body='Body', author=author,
+                is_pinned=rng.random() < 0.01,
+                target_year=year, target_stream=stream, target_branch=branch,
+                audience=Announcement.audience_key(year, stream, branch),
+            ))
+        Announcement.objects.bulk_create(rows, batch_size=5000)
+        self.stdout.write(f"Inserted {opts['count']} announcements in {time.perf_counter() - t0:.1f}s")
+
+        for viewer in VIEWERS:
+            legacy  = set(legacy_feed(*viewer).values_list('pk', flat=True))
+            indexed = set(indexed_feed(*viewer).values_list('pk', flat=True))
+            assert legacy == indexed, f'feeds differ for {viewer}'
+
+        matched = indexed_feed(*VIEWERS[0]).count()
+        self.stdout.write(f'Viewer {VIEWERS[0]} sees {matched} ({matched * 100 / opts["count"]:.1f}%)')
+
+        legacy_ms  = self.timed(legacy_feed, opts)
+        indexed_ms = self.timed(indexed_feed, opts)
+        self.stdout.write(f"{'query':>10} | {'ms/feed':>8}")
+        self.stdout.write('-' * 22)
+        self.stdout.write(f"{'legacy':>10} | {legacy_ms:>8.1f}")
+        self.stdout.write(f"{'audience':>10} | {indexed_ms:>8.1f}   ({legacy_ms / indexed_ms:.1f}x)")
+        self.stdout.write(f'legacy plan:   {self.plan(legacy_feed(*VIEWERS[0]))}')
+        self.stdout.write(f'audience plan: {self.plan(indexed_feed(*VIEWERS[0]))}')
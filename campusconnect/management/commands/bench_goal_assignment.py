@@ -0,0 +1,86 @@
+import random
+import time
+import tracemalloc
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from campusconnect import assignments, unread
+from campusconnect.models import BRANCH_CHOICES, Goal, UnreadCounter, UserProfile
+from campusconnect.management.commands.bench_announcements import Rollback
+
+
+def legacy_assign(goal, students):
+    # What create_goal did before the assignment engine
+    with transaction.atomic():
+        goal.assigned_to.set(students)
+        unread.bump('goals', goal.assigned_to.all())
+    return goal.assigned_to.count()
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks assigning a goal to every student: assigned_to.set() vs assignments.assign() (rolled back).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=10000)
+        parser.add_argument('--batch-size', type=int, default=None)
+
+    def handle(self, *args, **opts):
+        try:
+            with transaction.atomic():
+                self.run(opts)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, opts):
+        rng     = random.Random(18)
+        n       = opts['students']
+        teacher = User.objects.create_user(username='bench-goals-teacher')
+        users   = User.objects.bulk_create(
+            [User(username=f'bench-goals-{i}') for i in range(n)], batch_size=2000,
+        )
+        UserProfile.objects.bulk_create([
+            UserProfile(user=user, role='student', year=rng.choice('1234'), branch=rng.choice(BRANCH_CHOICES)[0])
+            for user in users
+        ], batch_size=2000)
+        # Badge rows exist for students who have opened the site before
+        UnreadCounter.objects.bulk_create([UnreadCounter(user=user) for user in users], batch_size=2000)
+        self.stdout.write(f'{n} students\n')
+
+        def goal(label):
+            return Goal.objects.create(title=label, assigned_by=teacher, start_date='2026-01-01', due_date='2026-02-01')
+
+        def measure(assign):
+            with CaptureQueriesContext(connection) as queries:
+                tracemalloc.start()
+                t0 = time.perf_counter()
+                count = assign()
+                ms = (time.perf_counter() - t0) * 1000
+                peak = tracemalloc.get_traced_memory()[1] / 1024
+                tracemalloc.stop()
+            return count, len(queries), ms, peak
+
+        self.stdout.write(f"{'engine':>10} | {'audience':>15} | {'assigned':>8} | {'queries':>7} | {'ms':>8} | {'peak KB':>8}")
+        self.stdout.write('-' * 72)
+        for audience in [('all', 'all', 'all'), ('2', 'computing', 'all'), ('3', 'all', 'cse')]:
+            students = assignments.audience_students(*audience)
+            label    = '/'.join(audience)
+
+            legacy = goal('legacy')
+            count, queries, legacy_ms, peak = measure(lambda: legacy_assign(legacy, students))
+            self.stdout.write(f"{'set()':>10} | {label:>15} | {count:>8} | {queries:>7} | {legacy_ms:>8.1f} | {peak:>8.0f}")
+
+            bulk = goal('bulk')
+            added, queries, bulk_ms, peak = measure(lambda: assignments.assign(bulk, students, batch_size=opts['batch_size']))
+            self.stdout.write(
+                f"{'assign()':>10} | {label:>15} | {added:>8} | {queries:>7} | {bulk_ms:>8.1f} | {peak:>8.0f}"
+                f"   ({legacy_ms / bulk_ms:.1f}x)"
+            )
+            assert bulk.assigned_count == count == bulk.assigned_to.count()
+            assert set(bulk.assigned_to.values_list('pk', flat=True)) == set(legacy.assigned_to.values_list('pk', flat=True))
+
+            # Re-assigning the same audience adds no one
+            assert assignments.assign(bulk, students) == 0
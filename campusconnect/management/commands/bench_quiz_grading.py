@@ -0,0 +1,128 @@
+import datetime
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from campusconnect import analytics, assignments, goal_stats, grading, unread
+from campusconnect.models import Goal, GoalAnalytics, GoalSubmission, QuizAnswer, QuizQuestion, UserProfile
+
+PREFIX = 'bench-quiz-'
+
+
+def legacy_submit(goal, student, form):
+    # What goal_detail did before the grading engine
+    with transaction.atomic():
+        sub = GoalSubmission.objects.create(goal=goal, student=student, note='', file=None)
+        goal_stats.submitted(goal.pk)
+        unread.bump('goals', goal.assigned_by_id)
+    questions = goal.questions.all()
+    score = 0
+    for q in questions:
+        ans = form.get(f'answer_{q.id}', '').strip()
+        is_correct = None
+        if q.qtype == 'mcq':
+            is_correct = ans.upper() == q.correct.upper()
+            if is_correct:
+                score += 1
+        QuizAnswer.objects.create(submission=sub, question=q, answer=ans, is_correct=is_correct)
+    sub.quiz_score = score
+    sub.quiz_total = questions.count()
+    sub.save()
+    return sub
+
+
+def engine_submit(goal, student, form):
+    return grading.submit(goal, student, form=form)
+
+
+class Command(BaseCommand):
+    help = ('Benchmarks quiz grading with many students submitting at once against the configured '
+            'database (SQLite by default). Bench rows are deleted afterwards.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=500, help='Concurrent submissions per engine')
+        parser.add_argument('--questions', type=int, default=50)
+
+    def handle(self, *args, **opts):
+        User.objects.filter(username__startswith=PREFIX).delete()
+        try:
+            self.run(opts)
+        finally:
+            User.objects.filter(username__startswith=PREFIX).delete()
+
+    def run(self, opts):
+        rng      = random.Random(21)
+        teacher  = User.objects.create_user(username=f'{PREFIX}teacher')
+        students = User.objects.bulk_create([User(username=f'{PREFIX}{i}') for i in range(opts['students'])])
+        UserProfile.objects.bulk_create([UserProfile(user=s, role='student') for s in students])
+        students = list(User.objects.filter(username__startswith=PREFIX).exclude(pk=teacher.pk))
+
+        self.stdout.write(f"{opts['students']} students submitting a {opts['questions']}-question quiz at once\n")
+        self.stdout.write(f"{'engine':>8} | {'queries':>7} | {'graded':>6} | {'partial':>7} | {'locked':>6} | {'wall s':>6} | "
+                          f"{'p50 ms':>7} | {'p95 ms':>7} | {'max ms':>7}")
+        self.stdout.write('-' * 90)
+        for name, submit in [('legacy', legacy_submit), ('engine', engine_submit)]:
+            goal = Goal.objects.create(
+                title=f'Bench quiz ({name})', goal_type='quiz', assigned_by=teacher,
+                start_date=datetime.date(2026, 1, 1), due_date=datetime.date(2026, 12, 31),
+            )
+            QuizQuestion.objects.bulk_create([
+                QuizQuestion(goal=goal, qtype='mcq', question=f'Q{i}', option_a='a', option_b='b',
+                             option_c='c', option_d='d', correct=rng.choice('ABCD'), order=i)
+                for i in range(1, opts['questions'] + 1)
+            ])
+            assignments.assign(goal, User.objects.filter(pk__in=[s.pk for s in students]))
+            question_ids = list(goal.questions.values_list('pk', flat=True))
+            forms = [{f'answer_{q}': rng.choice('ABCD') for q in question_ids} for _ in students]
+
+            # Queries for one submission, measured on its own (the first student)
+            with CaptureQueriesContext(connection) as queries:
+                submit(goal, students[0], forms[0])
+            self.report(name, goal, len(queries), *self.storm(submit, goal, students[1:], forms[1:]))
+
+    def storm(self, submit, goal, students, forms):
+        """Every student submits at the same moment, one thread (and connection) each."""
+        barrier   = threading.Barrier(len(students))
+        latencies = []
+        locked    = []
+
+        def one(student, form):
+            try:
+                barrier.wait()
+                t0 = time.perf_counter()
+                try:
+                    submit(goal, student, form)
+                    latencies.append((time.perf_counter() - t0) * 1000)
+                except OperationalError:
+                    locked.append(student.pk)
+            finally:
+                connection.close()
+
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=len(students)) as pool:
+            list(pool.map(one, students, forms))
+        return time.perf_counter() - t0, sorted(latencies), len(locked)
+
+    def report(self, name, goal, queries, wall, latencies, locked):
+        goal.refresh_from_db()
+        submissions = GoalSubmission.objects.filter(goal=goal)
+        graded  = submissions.filter(quiz_total__isnull=False).count()
+        partial = submissions.count() - graded   # created, then failed while writing answers
+        p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0
+        self.stdout.write(
+            f'{name:>8} | {queries:>7} | {graded:>6} | {partial:>7} | {locked:>6} | {wall:>6.1f} | '
+            f'{statistics.median(latencies) if latencies else 0:>7.0f} | {p95:>7.0f} | {max(latencies, default=0):>7.0f}'
+        )
+        if name == 'engine':
+            assert partial == 0 and graded == goal.submission_count, 'engine left a submission ungraded or uncounted'
+            live  = GoalAnalytics.objects.get(goal=goal)
+            fresh = analytics.rebuild(goal)
+            assert (live.submitted, live.histogram, live.questions) == (graded, fresh.histogram, fresh.questions), \
+                'incremental analytics drifted from a full rebuild'
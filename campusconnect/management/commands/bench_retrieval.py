@@ -0,0 +1,66 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from campusconnect.bm25 import BM25Index
+from campusconnect.rag import simple_tfidf_search
+
+
+QUERIES = [
+    'what is polymorphism in java',
+    'explain binary search tree insertion',
+    'difference between process and thread',
+    'define graph coloring and chromatic number',
+]
+
+
+def make_chunks(count, words_per_chunk, vocab_size, seed=42):
+    """Synthetic chunks with a Zipf-like word distribution, like real text."""
+    rng   = random.Random(seed)
+    vocab = [f'w{i}' for i in range(vocab_size)]
+    # Query words get mid-range frequencies so postings are realistic
+    for n, word in enumerate(sorted({w for q in QUERIES for w in q.split()})):
+        vocab.insert(20 + n * 37, word)
+    weights = [1.0 / (rank + 1) for rank in range(len(vocab))]
+    return [' '.join(rng.choices(vocab, weights=weights, k=words_per_chunk)) for _ in range(count)]
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks BM25Index against simple_tfidf_search on synthetic chunks.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+        parser.add_argument('--words', type=int, default=400, help='Words per chunk')
+        parser.add_argument('--vocab', type=int, default=20000)
+        parser.add_argument('--top-k', type=int, default=4)
+        parser.add_argument('--legacy-max', type=int, default=1000,
+                            help='Skip simple_tfidf_search above this many chunks (it is quadratic)')
+
+    def handle(self, *args, **opts):
+        self.stdout.write(f"{'chunks':>8} | {'build s':>8} | {'bm25 ms/q':>10} | {'tfidf ms/q':>11} | speedup")
+        self.stdout.write('-' * 60)
+
+        for size in opts['sizes']:
+            chunks = make_chunks(size, opts['words'], opts['vocab'])
+
+            t0    = time.perf_counter()
+            index = BM25Index.build(chunks)
+            build = time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            for q in QUERIES:
+                index.search(q, chunks, top_k=opts['top_k'])
+            bm25_ms = (time.perf_counter() - t0) * 1000 / len(QUERIES)
+
+            legacy = '—'
+            speedup = ''
+            if size <= opts['legacy_max']:
+                t0 = time.perf_counter()
+                for q in QUERIES:
+                    simple_tfidf_search(q, chunks, top_k=opts['top_k'])
+                legacy_ms = (time.perf_counter() - t0) * 1000 / len(QUERIES)
+                legacy  = f'{legacy_ms:.1f}'
+                speedup = f'{legacy_ms / bm25_ms:.0f}x' if bm25_ms else ''
+
+            self.stdout.write(f'{size:>8} | {build:>8.2f} | {bm25_ms:>10.2f} | {legacy:>11} | {speedup}')
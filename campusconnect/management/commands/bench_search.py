@@ -0,0 +1,71 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from campusconnect.management.commands.bench_retrieval import QUERIES, make_chunks
+from campusconnect.models import Announcement
+from campusconnect.search import backend, search_announcements
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks announcement full-text search against icontains (rolled back afterwards).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=100000, help='Announcements to generate')
+        parser.add_argument('--words', type=int, default=60, help='Words per body')
+        parser.add_argument('--page', type=int, default=20)
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **opts):
+        if backend() is None:
+            self.stderr.write('No full-text index on this database; nothing to compare.')
+            return
+        try:
+            with transaction.atomic():
+                self.run(opts)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def timed(self, build, term, opts):
+        t0 = time.perf_counter()
+        for _ in range(opts['repeat']):
+            qs = build(term)
+            hits = qs.count()
+            list(qs[:opts['page']])
+        return hits, (time.perf_counter() - t0) * 1000 / opts['repeat']
+
+    def run(self, opts):
+        author = User.objects.create_user(username='bench-search')
+        bodies = make_chunks(opts['count'], opts['words'], vocab_size=20000)
+
+        t0 = time.perf_counter()
+        Announcement.objects.bulk_create([
+            Announcement(title=' '.join(body.split()[:6]), body=body, author=author)
+            for body in bodies
+        ], batch_size=5000)
+        self.stdout.write(f"Inserted and indexed {opts['count']} announcements in {time.perf_counter() - t0:.1f}s")
+
+        def like(term):
+            return Announcement.objects.filter(Q(title__icontains=term) | Q(body__icontains=term))
+
+        def fts(term):
+            return search_announcements(Announcement.objects.all(), term).order_by('-search_rank', '-created_at')
+
+        terms = sorted({word for q in QUERIES for word in q.split() if len(word) > 3})[:6] + ['binary search']
+        self.stdout.write(f"{'term':>16} | {'like hits':>9} | {'like ms':>8} | {'fts hits':>8} | {'fts ms':>7} | speedup")
+        self.stdout.write('-' * 72)
+        for term in terms:
+            like_hits, like_ms = self.timed(like, term, opts)
+            fts_hits, fts_ms   = self.timed(fts, term, opts)
+            self.stdout.write(
+                f'{term:>16} | {like_hits:>9} | {like_ms:>8.1f} | {fts_hits:>8} | {fts_ms:>7.1f} | {like_ms / fts_ms:.1f}x'
+            )
+        self.stdout.write('LIKE matches substrings ("tree" in "subtree") and phrases; FTS matches stemmed words.')
@@ -0,0 +1,80 @@
+import json
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.management.base import BaseCommand
+
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    """Minimal OpenAI/Groq-compatible /chat/completions endpoint."""
+    protocol_version = 'HTTP/1.1'
+    latency = 0.5
+    tokens  = 20
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self.send_error(404)
+            return
+        body  = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        words = ['Fake'] + [f' word{i}' for i in range(self.tokens - 1)]
+        base  = {'id': 'fake', 'created': int(time.time()), 'model': body.get('model', 'fake')}
+
+        if not body.get('stream'):
+            time.sleep(self.latency)
+            self._send_json(dict(base, object='chat.completion', choices=[{
+                'index': 0, 'finish_reason': 'stop',
+                'message': {'role': 'assistant', 'content': ''.join(words)},
+            }], usage={'prompt_tokens': 0, 'completion_tokens': len(words), 'total_tokens': len(words)}))
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        for word in words:
+            time.sleep(self.latency / len(words))
+            chunk = dict(base, object='chat.completion.chunk',
+                         choices=[{'index': 0, 'delta': {'content': word}, 'finish_reason': None}])
+            self._write_chunk(f'data: {json.dumps(chunk)}\n\n')
+        self._write_chunk('data: [DONE]\n\n')
+        self.wfile.write(b'0\r\n\r\n')
+
+    def _send_json(self, data):
+        payload = json.dumps(data).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _write_chunk(self, text):
+        data = text.encode()
+        self.wfile.write(f'{len(data):x}\r\n'.encode() + data + b'\r\n')
+        self.wfile.flush()
+
+
+class Command(BaseCommand):
+    help = ('Runs a local fake LLM server. Point the app at it with '
+            'LLM_BASE_URL=http://127.0.0.1:<port> to benchmark without Groq.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--port', type=int, default=8089)
+        parser.add_argument('--latency', type=float, default=0.5, help='Seconds per completion')
+        parser.add_argument('--tokens', type=int, default=20, help='Tokens per completion')
+
+    def handle(self, *args, **opts):
+        FakeLLMHandler.latency = opts['latency']
+        FakeLLMHandler.tokens  = opts['tokens']
+        server = ThreadingHTTPServer(('127.0.0.1', opts['port']), FakeLLMHandler)
+        server.daemon_threads = True
+        self.stdout.write(f"Fake LLM listening on http://127.0.0.1:{opts['port']} "
+                          f"({opts['latency']}s, {opts['tokens']} tokens)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from resources.models import Resource
+from campusconnect.ingest import ingest_resource
+from campusconnect.rag import is_pdf
+
+
+class Command(BaseCommand):
+    help = 'Extracts, chunks and indexes resources synchronously (backfill / re-index).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('ids', type=int, nargs='*', help='Resource ids (default: all not yet ready)')
+        parser.add_argument('--all', action='store_true', help='Re-index every PDF resource')
+
+    def handle(self, *args, **opts):
+        qs = Resource.objects.all()
+        if opts['ids']:
+            qs = qs.filter(pk__in=opts['ids'])
+        elif not opts['all']:
+            qs = qs.exclude(text_store__status='ready')
+
+        for resource in qs:
+            if not is_pdf(resource):
+                continue
+            store = ingest_resource(resource.pk)
+            if store is None:
+                self.stdout.write(self.style.ERROR(f'#{resource.pk} {resource.title}: failed'))
+            else:
+                self.stdout.write(f'#{resource.pk} {resource.title}: {len(store.chunks)} chunks, {store.timings}')
@@ -0,0 +1,115 @@
+import asyncio
+import json
+import statistics
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncRequestFactory, RequestFactory, override_settings
+
+from campusconnect import admission, llm, views
+from campusconnect.models import ChatSession
+
+USERNAME = 'loadtest-chat'
+
+
+def _body(session_id):
+    return json.dumps({'message': 'What is polymorphism?', 'session_id': str(session_id)})
+
+
+def _summary(latencies, wall):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0
+    return len(latencies) / wall, statistics.median(latencies), p95
+
+
+class Command(BaseCommand):
+    help = ('Load-tests chatbot_api (sync, on a fixed thread pool like a WSGI worker) against '
+            'async_chatbot_api (one event loop, like one uvicorn process) with a fake slow LLM.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sessions', type=int, nargs='+', default=[10, 100, 1000])
+        parser.add_argument('--latency', type=float, default=1.0, help='Seconds per fake LLM call')
+        parser.add_argument('--sync-threads', type=int, default=8, help='Threads of the sync worker')
+        parser.add_argument('--max-concurrency', type=int, default=None,
+                            help='LLM calls admitted at once (default: as many as --sessions, i.e. no cap)')
+        parser.add_argument('--base-url', help='Use the real Groq client against this server '
+                                               '(e.g. manage.py fake_llm_server) instead of FakeBackend')
+
+    def handle(self, *args, **opts):
+        if opts['base_url']:
+            self.stdout.write(f"LLM server {opts['base_url']}, sync worker threads {opts['sync_threads']}\n")
+            override_settings(LLM_BASE_URL=opts['base_url']).enable()
+            backend = llm.GroqBackend()
+        else:
+            self.stdout.write(f"fake LLM latency {opts['latency']}s, sync worker threads {opts['sync_threads']}\n")
+            backend = llm.FakeBackend(latency=opts['latency'])
+        self.stdout.write(f"{'sessions':>8} | {'path':>5} | {'wall s':>7} | {'req/s':>7} | {'p50 s':>6} | {'p95 s':>6}")
+        self.stdout.write('-' * 56)
+
+        # Every request comes from one signed-in user, each simulated client on
+        # its own server-side chat session, so the per-user token bucket is
+        # lifted for the run; the concurrency cap is --max-concurrency.
+        self.user = User.objects.get_or_create(username=USERNAME)[0]
+        cap = opts['max_concurrency'] or max(opts['sessions'])
+        controller = admission.AdmissionController(
+            max_concurrency=cap, queue_size=max(opts['sessions']), queue_timeout=3600,
+            rate_per_min=float('inf'), burst=float('inf'),
+        )
+        try:
+            with llm.use_backend(backend), admission.use_controller(controller):
+                for n in opts['sessions']:
+                    wall, results = self.run_sync(n, opts['sync_threads'])
+                    self.report(n, 'sync', wall, results)
+                    wall, results = asyncio.run(self.run_async(n))
+                    self.report(n, 'async', wall, results)
+        finally:
+            self.user.delete()   # and its chat sessions
+
+    def report(self, n, path, wall, results):
+        failed = Counter(status for _, status in results if status != 200)
+        if failed:
+            # A failing view answers at once: its "throughput" would mean nothing
+            raise CommandError(f'{path} run with {n} sessions: non-200 responses {dict(failed)}')
+        rps, p50, p95 = _summary([latency for latency, _ in results], wall)
+        self.stdout.write(f'{n:>8} | {path:>5} | {wall:>7.2f} | {rps:>7.1f} | {p50:>6.2f} | {p95:>6.2f}')
+
+    def sessions(self, n):
+        return [s.pk for s in ChatSession.objects.bulk_create(
+            ChatSession(user=self.user, kind='general') for _ in range(n))]
+
+    def run_sync(self, n, threads):
+        factory  = RequestFactory()
+        sessions = self.sessions(n)
+        started  = time.perf_counter()
+
+        def one(session_id):
+            request = factory.post('/study/chatbot/api/', _body(session_id), content_type='application/json')
+            request.user = self.user
+            response = views.chatbot_api(request)
+            # Latency as the client sees it, including time queued for a thread
+            return time.perf_counter() - started, response.status_code
+
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            results = list(pool.map(one, sessions))
+        return time.perf_counter() - started, results
+
+    async def run_async(self, n):
+        factory  = AsyncRequestFactory()
+        sessions = await sync_to_async(self.sessions)(n)
+        started  = time.perf_counter()
+
+        async def auser():
+            return self.user
+
+        async def one(session_id):
+            request = factory.post('/study/chatbot/api/', _body(session_id), content_type='application/json')
+            request.user, request.auser = self.user, auser
+            response = await views.async_chatbot_api(request)
+            return time.perf_counter() - started, response.status_code
+
+        results = await asyncio.gather(*(one(session_id) for session_id in sessions))
+        return time.perf_counter() - started, list(results)
@@ -0,0 +1,100 @@
+import asyncio
+import json
+import random
+import statistics
+import threading
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from campusconnect import push
+from campusconnect.management.commands.bench_announcements import VIEWERS, random_target
+from campusconnect.models import Announcement
+
+
+class Command(BaseCommand):
+    help = ('Load-tests the announcement SSE push: thousands of idle connections on one event loop '
+            '(like one uvicorn process), then events published from another thread like a view would.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--connections', type=int, nargs='+', default=[1000, 5000])
+        parser.add_argument('--events', type=int, default=50, help='Announcements published per run')
+        parser.add_argument('--idle', type=float, default=3.0, help='Seconds of idle time measured per run')
+        parser.add_argument('--heartbeat', type=float, default=1.0, help='PUSH_HEARTBEAT during the test')
+
+    def handle(self, *args, **opts):
+        self.stdout.write(f"heartbeat {opts['heartbeat']}s, {opts['events']} events per run\n")
+        self.stdout.write(f"{'conns':>6} | {'KB/conn':>7} | {'idle CPU %':>10} | {'delivered':>9} | "
+                          f"{'p50 ms':>7} | {'p95 ms':>7} | {'max ms':>7}")
+        self.stdout.write('-' * 72)
+        with override_settings(PUSH_HEARTBEAT=opts['heartbeat'], PUSH_MAX_CONNECTIONS=10 ** 9, PUSH_REDIS_URL=None):
+            for n in opts['connections']:
+                asyncio.run(self.run(n, opts))
+
+    async def run(self, n, opts):
+        rng = random.Random(n)
+        # Mostly students of the benchmark viewers, some faculty seeing everything
+        viewers = [
+            push.viewer_keys(None) if i % 20 == 0 else Announcement.audience_keys(*VIEWERS[i % len(VIEWERS)])
+            for i in range(n)
+        ]
+        received = [[] for _ in range(n)]
+
+        async def client(i, ready):
+            events = push.stream(viewers[i])
+            await events.__anext__()            # 'retry:' line: subscribed
+            ready.set_result(None)
+            async for chunk in events:
+                if chunk.startswith('id:'):
+                    event = json.loads(chunk.split('data: ', 1)[1])
+                    received[i].append((event['pk'], time.perf_counter() - event['sent']))
+
+        tracemalloc.start()
+        base  = tracemalloc.get_traced_memory()[0]
+        loop  = asyncio.get_running_loop()
+        ready = [loop.create_future() for _ in range(n)]
+        tasks = [asyncio.create_task(client(i, ready[i])) for i in range(n)]
+        await asyncio.gather(*ready)
+        per_conn = (tracemalloc.get_traced_memory()[0] - base) / n / 1024
+        tracemalloc.stop()
+
+        cpu0, wall0 = time.process_time(), time.perf_counter()
+        await asyncio.sleep(opts['idle'])
+        idle_cpu = (time.process_time() - cpu0) / (time.perf_counter() - wall0) * 100
+
+        events = []
+        for pk in range(opts['events']):
+            year, stream, branch = random_target(rng)
+            events.append({'id': str(pk), 'pk': pk, 'audience': Announcement.audience_key(year, stream, branch)})
+
+        def publisher():
+            for event in events:
+                push.broker.dispatch(dict(event, sent=time.perf_counter()))
+                time.sleep(0.01)
+
+        thread = threading.Thread(target=publisher)
+        thread.start()
+        await asyncio.to_thread(thread.join)
+        await asyncio.sleep(0.5)                # let the last deliveries drain
+
+        expected = sum(
+            1 for i in range(n) for event in events
+            if viewers[i] == [push.EVERYONE] or event['audience'] in viewers[i]
+        )
+        # No client may receive an announcement outside its audience
+        for i in range(n):
+            if viewers[i] != [push.EVERYONE]:
+                assert all(events[pk]['audience'] in viewers[i] for pk, _ in received[i])
+        latencies = sorted(latency * 1000 for got in received for _, latency in got)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        assert push.broker.count() == 0, 'connections leaked'
+
+        p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0
+        self.stdout.write(
+            f'{n:>6} | {per_conn:>7.1f} | {idle_cpu:>10.1f} | {len(latencies):>4}/{expected:<4} | '
+            f'{statistics.median(latencies) if latencies else 0:>7.2f} | {p95:>7.2f} | {max(latencies, default=0):>7.2f}'
+        )
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from campusconnect import search
+
+
+class Command(BaseCommand):
+    help = 'Recreates the announcement full-text index (FTS5 table + triggers on SQLite) and reindexes.'
+
+    def handle(self, *args, **opts):
+        if connection.vendor == 'postgresql':
+            self.stdout.write('PostgreSQL keeps announcement_search_idx up to date itself; nothing to do.')
+        elif connection.vendor != 'sqlite':
+            self.stdout.write(f'No full-text index for {connection.vendor}; search uses LIKE.')
+        elif search.install_sqlite(connection):
+            self.stdout.write(self.style.SUCCESS(f'Rebuilt {search.FTS_TABLE}.'))
+        else:
+            self.stdout.write(self.style.WARNING('This SQLite build has no FTS5; search uses LIKE.'))
@@ -0,0 +1,45 @@
+import logging
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from campusconnect import sweeper
+
+logger = logging.getLogger('campusconnect.sweeper')
+
+
+class Command(BaseCommand):
+    help = ('Moves overdue goals, library records and stale permission letters to their new status '
+            'in bulk. Run it from cron, or keep it running with --loop.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Keep running, sweeping every --interval seconds')
+        parser.add_argument('--interval', type=int, default=None, help='Seconds between sweeps (default: SWEEP_INTERVAL)')
+
+    def handle(self, *args, **opts):
+        if not opts['loop']:
+            self.run_once()
+            return
+
+        interval = opts['interval'] or settings.SWEEP_INTERVAL
+        self.stdout.write(f'Sweeping every {interval}s (Ctrl+C to stop)')
+        try:
+            while True:
+                started = time.monotonic()
+                try:
+                    self.run_once()
+                except Exception:
+                    # A locked or unreachable database: try again next tick
+                    logger.exception('Overdue sweep failed')
+                finally:
+                    close_old_connections()
+                time.sleep(max(0, interval - (time.monotonic() - started)))
+        except KeyboardInterrupt:
+            pass
+
+    def run_once(self):
+        touched, duration = sweeper.sweep()
+        rows = ', '.join(f'{name} {count}' for name, count in touched.items())
+        self.stdout.write(f'{sum(touched.values())} rows in {duration * 1000:.0f}ms ({rows})')
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:57
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Value
+from django.db.models.functions import Concat
+
+
+def fill_audience(apps, schema_editor):
+    Announcement = apps.get_model('campusconnect', 'Announcement')
+    Announcement.objects.update(audience=Concat(
+        'target_year', Value('|'), 'target_stream', Value('|'), 'target_branch',
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campusconnect', '0010_chatsession_chatturn'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='announcement',
+            name='audience',
+            field=models.CharField(default='all|all|all', editable=False, max_length=40),
+        ),
+        migrations.RunPython(fill_audience, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='announcement',
+            index=models.Index(fields=['audience', '-is_pinned', '-created_at'], name='announcement_audience_idx'),
+        ),
+    ]
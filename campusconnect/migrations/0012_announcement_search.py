@@ -0,0 +1,83 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.utils import OperationalError
+
+import campusconnect.models
+
+# The DDL is spelled out here rather than imported from campusconnect.search,
+# so later edits to that module can't change what this migration does.
+SQLITE_SCHEMA = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS campusconnect_announcement_fts USING fts5(
+        title, body,
+        content='campusconnect_announcement', content_rowid='id',
+        tokenize='porter unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS campusconnect_announcement_fts_ai AFTER INSERT ON campusconnect_announcement BEGIN
+        INSERT INTO campusconnect_announcement_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS campusconnect_announcement_fts_ad AFTER DELETE ON campusconnect_announcement BEGIN
+        INSERT INTO campusconnect_announcement_fts(campusconnect_announcement_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS campusconnect_announcement_fts_au AFTER UPDATE OF title, body ON campusconnect_announcement BEGIN
+        INSERT INTO campusconnect_announcement_fts(campusconnect_announcement_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+        INSERT INTO campusconnect_announcement_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END""",
+    "INSERT INTO campusconnect_announcement_fts(campusconnect_announcement_fts) VALUES ('rebuild')",
+]
+
+# Same expression as search.document_vector() compiles to, so queries use the index
+POSTGRES_INDEX = """CREATE INDEX announcement_search_idx ON campusconnect_announcement USING gin ((
+    setweight(to_tsvector('english'::regconfig, COALESCE(title, '')), 'A')
+    || setweight(to_tsvector('english'::regconfig, COALESCE(body, '')), 'B')
+))"""
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            try:
+                for statement in SQLITE_SCHEMA:
+                    cursor.execute(statement)
+            except OperationalError:
+                pass   # SQLite built without FTS5: search falls back to LIKE
+    elif connection.vendor == 'postgresql':
+        schema_editor.execute(POSTGRES_INDEX)
+
+
+def drop_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'sqlite':
+        for suffix in ('_ai', '_ad', '_au'):
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS campusconnect_announcement_fts{suffix}')
+        schema_editor.execute('DROP TABLE IF EXISTS campusconnect_announcement_fts')
+    elif connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS announcement_search_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campusconnect', '0011_announcement_audience'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+        migrations.CreateModel(
+            name='AnnouncementSearch',
+            fields=[
+                ('announcement', models.OneToOneField(db_column='rowid', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_doc', serialize=False, to='campusconnect.announcement')),
+                ('title', models.TextField()),
+                ('body', models.TextField()),
+                ('document', campusconnect.models.FullTextField(db_column='campusconnect_announcement_fts')),
+            ],
+            options={
+                'db_table': 'campusconnect_announcement_fts',
+                'managed': False,
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:07
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campusconnect', '0012_announcement_search'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='announcement',
+            index=models.Index(fields=['-is_pinned', '-created_at', '-id'], name='announcement_feed_idx'),
+        ),
+    ]
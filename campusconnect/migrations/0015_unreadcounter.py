@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:30
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('campusconnect', '0014_image_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UnreadCounter',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='unread', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('announcements', models.PositiveIntegerField(default=0)),
+                ('goals', models.PositiveIntegerField(default=0)),
+                ('complaints', models.PositiveIntegerField(default=0)),
+                ('permissions', models.PositiveIntegerField(default=0)),
+                ('announcements_read_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('goals_read_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('complaints_read_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('permissions_read_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:33
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_assigned_count(apps, schema_editor):
+    Goal       = apps.get_model('campusconnect', 'Goal')
+    Assignment = Goal.assigned_to.through
+    counts = (Assignment.objects.filter(goal_id=OuterRef('pk'))
+              .order_by().values('goal_id').annotate(n=Count('pk')).values('n'))
+    Goal.objects.update(assigned_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campusconnect', '0015_unreadcounter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='goal',
+            name='assigned_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_assigned_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:36
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_counters(apps, schema_editor):
+    Goal           = apps.get_model('campusconnect', 'Goal')
+    GoalSubmission = apps.get_model('campusconnect', 'GoalSubmission')
+
+    def count(**filters):
+        rows = GoalSubmission.objects.filter(goal_id=OuterRef('pk'), **filters)
+        return Coalesce(Subquery(rows.order_by().values('goal_id').annotate(n=Count('pk')).values('n')), 0)
+
+    Goal.objects.update(
+        submission_count=count(),
+        reviewed_count=count(status__in=['reviewed', 'approved', 'rejected']),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campusconnect', '0016_goal_assigned_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='goal',
+            name='reviewed_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='goal',
+            name='submission_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
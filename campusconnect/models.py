@@ -1,7 +1,9 @@
 from django.db import models
+import uuid
 from django.contrib.auth.models import User
 from decimal import Decimal
 from django.utils import timezone
+from . import images
 BRANCH_CHOICES = [
     # Computing
     ('aiml', 'AI & ML'),
@@ -51,6 +53,10 @@ class UserProfile(models.Model):
     role       = models.CharField(max_length=10, choices=ROLE_CHOICES, default='student')
     phone      = models.CharField(max_length=15, blank=True, null=True)
     avatar     = models.ImageField(upload_to='avatars/', blank=True, null=True)
+    # Resized variants of the avatar and its size, kept by images.refresh_variants()
+    avatar_width    = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    avatar_height   = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    avatar_variants = models.JSONField(null=True, blank=True, editable=False)
     linkedin   = models.URLField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -91,10 +97,27 @@ class UserProfile(models.Model):
             return [s.strip() for s in self.subjects_teaching.split(',') if s.strip()]
         return []
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        images.refresh_variants(self, 'avatar')
+
     def __str__(self):
         return f"{self.user.username} ({self.role})"
 
 
+class AnnouncementQuerySet(models.QuerySet):
+
+    def for_audience(self, year='', stream='', branch=''):
+        """Announcements that reach this year/stream/branch; a blank value means any.
+
+        Resolved with an IN over the precomputed `audience` keys, which is
+        indexed, instead of three OR-chains over unindexed columns.
+        """
+        if not (year or stream or branch):
+            return self
+        return self.filter(audience__in=Announcement.audience_keys(year, stream, branch))
+
+
 class Announcement(models.Model):
     PRIORITY_CHOICES = [
         ('normal',    'Normal'),
@@ -118,21 +141,88 @@ class Announcement(models.Model):
     title         = models.CharField(max_length=200)
     body          = models.TextField()
     image         = models.ImageField(upload_to='announcements/', blank=True, null=True)
+    # Resized variants of the image and its size, kept by images.refresh_variants()
+    image_width    = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_height   = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_variants = models.JSONField(null=True, blank=True, editable=False)
     author        = models.ForeignKey(User, on_delete=models.CASCADE, related_name='announcements')
     priority      = models.CharField(max_length=10, choices=PRIORITY_CHOICES, default='normal')
     is_pinned     = models.BooleanField(default=False)
     target_year   = models.CharField(max_length=5,  choices=TARGET_YEAR_CHOICES,   default='all')
     target_stream = models.CharField(max_length=15, choices=TARGET_STREAM_CHOICES, default='all')
     target_branch = models.CharField(max_length=10, choices=TARGET_BRANCH_CHOICES, default='all')
+    # "year|stream|branch" of the three targets above, kept in sync by save()
+    audience      = models.CharField(max_length=40, default='all|all|all', editable=False)
     created_at    = models.DateTimeField(auto_now_add=True)
     updated_at    = models.DateTimeField(auto_now=True)
 
+    objects = AnnouncementQuerySet.as_manager()
+
     class Meta:
         ordering = ['-is_pinned', '-created_at']
+        indexes  = [
+            models.Index(fields=['audience', '-is_pinned', '-created_at'], name='announcement_audience_idx'),
+            # keyset pagination of the unfiltered feed (announcements view)
+            models.Index(fields=['-is_pinned', '-created_at', '-id'], name='announcement_feed_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
+    @staticmethod
+    def audience_key(year, stream, branch):
+        return f"{year}|{stream}|{branch}"
+
+    @classmethod
+    def audience_keys(cls, year='', stream='', branch=''):
+        """Every stored audience key a viewer with these attributes matches."""
+        def values(value, choices):
+            return ['all', value] if value else [code for code, _ in choices]
+
+        return [
+            cls.audience_key(y, s, b)
+            for y in values(year,   cls.TARGET_YEAR_CHOICES)
+            for s in values(stream, cls.TARGET_STREAM_CHOICES)
+            for b in values(branch, cls.TARGET_BRANCH_CHOICES)
+        ]
+
+    def save(self, *args, **kwargs):
+        self.audience = self.audience_key(self.target_year, self.target_stream, self.target_branch)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | {'audience'}
+        super().save(*args, **kwargs)
+        images.refresh_variants(self, 'image')
+
+
+# ── Announcement full-text index ──
+class FullTextField(models.TextField):
+    """The hidden FTS5 column named after its table; `__match` runs an FTS5 query."""
+
+
+@FullTextField.register_lookup
+class FullTextMatch(models.Lookup):
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} MATCH {rhs}", lhs_params + rhs_params
+
+
+class AnnouncementSearch(models.Model):
+    """Read-only view of the SQLite FTS5 index (created and kept in sync by
+    triggers, see campusconnect/search.py)."""
+    announcement = models.OneToOneField(Announcement, on_delete=models.DO_NOTHING, primary_key=True,
+                                        db_column='rowid', related_name='search_doc')
+    title        = models.TextField()
+    body         = models.TextField()
+    document     = FullTextField(db_column='campusconnect_announcement_fts')
+
+    class Meta:
+        managed  = False
+        db_table = 'campusconnect_announcement_fts'
+
 
 class Goal(models.Model):
     GOAL_TYPE = [
@@ -150,6 +240,10 @@ class Goal(models.Model):
     goal_type       = models.CharField(max_length=10, choices=GOAL_TYPE, default='task')
     assigned_by     = models.ForeignKey(User, on_delete=models.CASCADE, related_name='goals_created')
     assigned_to     = models.ManyToManyField(User, related_name='goals_assigned', blank=True)
+    # Counters kept by assignments.assign() and goal_stats (no COUNTs per listing)
+    assigned_count   = models.PositiveIntegerField(default=0, editable=False)
+    submission_count = models.PositiveIntegerField(default=0, editable=False)
+    reviewed_count   = models.PositiveIntegerField(default=0, editable=False)
     start_date      = models.DateField()
     due_date        = models.DateField()
     resource_link   = models.URLField(blank=True, null=True)
@@ -163,6 +257,13 @@ class Goal(models.Model):
     def __str__(self):
         return self.title
 
+    @property
+    def current_status(self):
+        # Overdue follows from the date; the sweeper persists it in bulk
+        if self.status == 'active' and timezone.now().date() > self.due_date:
+            return 'overdue'
+        return self.status
+
 
 class QuizQuestion(models.Model):
     QTYPE = [
@@ -242,6 +343,8 @@ class LibraryRecord(models.Model):
     # Teacher marks as returned/done
     is_returned = models.BooleanField(default=False)
     returned_date = models.DateField(null=True, blank=True)
+    # Set by the overdue sweeper (campusconnect/sweeper.py) for filtering
+    is_overdue = models.BooleanField(default=False, editable=False)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -346,6 +449,7 @@ class Permission(models.Model):
         ('pending',  'Pending'),
         ('accepted', 'Accepted'),
         ('rejected', 'Rejected'),
+        ('expired',  'Expired'),    # still pending when its dates passed (sweeper)
     ]
 
     URGENCY_CHOICES = [
@@ -374,4 +478,99 @@ class Permission(models.Model):
 
     @property
     def is_editable(self):
-        return self.status == 'pending'
\ No newline at end of file
+        return self.status == 'pending'
+
+# ── Chat sessions ──
+# Conversations with the chat assistants live server-side; the browser only
+# keeps the session id. Turns older than the recent window are folded into
+# `summary` (see campusconnect/chat_sessions.py).
+class ChatSession(models.Model):
+    KIND_CHOICES = [
+        ('general', 'Campus Assistant'),
+        ('rag',     'Document Chat'),
+    ]
+
+    id                 = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user               = models.ForeignKey(User, on_delete=models.CASCADE, related_name='chat_sessions')
+    kind               = models.CharField(max_length=10, choices=KIND_CHOICES, default='general')
+    resource           = models.ForeignKey('resources.Resource', on_delete=models.CASCADE, null=True, blank=True, related_name='chat_sessions')
+    summary            = models.TextField(blank=True)
+    summarized_through = models.PositiveIntegerField(default=0, help_text='Turns up to this seq are in the summary')
+    turn_count         = models.PositiveIntegerField(default=0)
+    created_at         = models.DateTimeField(auto_now_add=True)
+    updated_at         = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-updated_at']
+
+    def __str__(self):
+        return f"{self.user.username} — {self.kind} ({self.turn_count} turns)"
+
+
+class ChatTurn(models.Model):
+    ROLE_CHOICES = [
+        ('user',      'User'),
+        ('assistant', 'Assistant'),
+    ]
+
+    session    = models.ForeignKey(ChatSession, on_delete=models.CASCADE, related_name='turns')
+    seq        = models.PositiveIntegerField()
+    role       = models.CharField(max_length=10, choices=ROLE_CHOICES)
+    content    = models.TextField()
+    tokens     = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering        = ['seq']
+        unique_together = ('session', 'seq')
+
+    def __str__(self):
+        return f"#{self.seq} {self.role}: {self.content[:50]}"
+
+
+# ── Unread badges ──
+# One row per user: a read cursor per section and a denormalized count of
+# what arrived after it, kept by campusconnect/unread.py in the same
+# transaction as the change that caused it. Nav badges read this row by
+# primary key instead of counting four tables on every page.
+class UnreadCounter(models.Model):
+    SECTIONS = ['announcements', 'goals', 'complaints', 'permissions']
+
+    user                  = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='unread')
+    announcements         = models.PositiveIntegerField(default=0)
+    goals                 = models.PositiveIntegerField(default=0)
+    complaints            = models.PositiveIntegerField(default=0)
+    permissions           = models.PositiveIntegerField(default=0)
+    announcements_read_at = models.DateTimeField(default=timezone.now)
+    goals_read_at         = models.DateTimeField(default=timezone.now)
+    complaints_read_at    = models.DateTimeField(default=timezone.now)
+    permissions_read_at   = models.DateTimeField(default=timezone.now)
+
+    @property
+    def study(self):
+        """Badge of the Study hub, which links to goals, complaints and permissions."""
+        return self.goals + self.complaints + self.permissions
+
+    def __str__(self):
+        return f"{self.user.username}: " + ', '.join(f"{s}={getattr(self, s)}" for s in self.SECTIONS)
+
+
+# ── Goal analytics ──
+# Per-goal statistics, updated by campusconnect/analytics.py in the same
+# transaction as each submission, so the submissions page reads one row
+# instead of aggregating every QuizAnswer on each request.
+class GoalAnalytics(models.Model):
+    goal       = models.OneToOneField(Goal, on_delete=models.CASCADE, primary_key=True, related_name='analytics')
+    submitted  = models.PositiveIntegerField(default=0)
+    late       = models.PositiveIntegerField(default=0)
+    scored     = models.PositiveIntegerField(default=0)   # submissions with a quiz score
+    score_sum  = models.FloatField(default=0)             # sum of their percentages
+    histogram  = models.JSONField(default=list)           # submissions per 10%-wide score bucket
+    questions  = models.JSONField(default=dict)           # question id -> [answered, correct] (MCQs)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = 'Goal analytics'
+
+    def __str__(self):
+        return f"Analytics: {self.goal.title}"
@@ -0,0 +1,85 @@
+"""
+Page-parallel OCR for scanned PDFs.
+
+Each page is rasterized and recognized in its own task on a bounded
+process pool (tesseract is CPU-bound, so threads would serialize on the
+GIL). Finished pages are cached in ``resources.OcrPage`` by
+(file hash, page, DPI) and yielded in page order as soon as they are
+available, so the chunker can start before the last page is done.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.conf import settings
+
+_pool = None
+_lock = threading.Lock()
+
+
+def _get_pool():
+    global _pool
+    with _lock:
+        if _pool is None:
+            # Spawn, not fork: the pool is first needed from ingestion or web
+            # threads, and forking a multithreaded process can copy a held lock.
+            # Spawned workers import this module without Django set up, so it
+            # keeps its model import inside iter_ocr_pages.
+            _pool = ProcessPoolExecutor(
+                max_workers=getattr(settings, 'OCR_WORKERS', None) or os.cpu_count(),
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return _pool
+
+
+def ocr_page(file_path, page_no, dpi):
+    """Runs in a pool worker: rasterize one page and OCR it."""
+    from pdf2image import convert_from_path
+    import pytesseract
+    images = convert_from_path(file_path, dpi=dpi, first_page=page_no, last_page=page_no)
+    return '\n'.join(pytesseract.image_to_string(img) for img in images)
+
+
+def iter_ocr_pages(file_path, content_hash, page_count, dpi=None, stats=None):
+    """Yields the OCR text of pages 1..page_count, in order.
+
+    Cached pages are served from the database; the rest are fanned out to
+    the process pool and stored as they finish. ``stats`` (a dict) is
+    filled with page / cache-hit counts when given.
+    """
+    from resources.models import OcrPage
+
+    dpi    = dpi or getattr(settings, 'OCR_DPI', 200)
+    cached = dict(
+        OcrPage.objects.filter(content_hash=content_hash, dpi=dpi, page__lte=page_count)
+        .values_list('page', 'text')
+    )
+    if stats is not None:
+        stats.update(ocr_pages=page_count, ocr_cached=len(cached))
+
+    missing = [p for p in range(1, page_count + 1) if p not in cached]
+    futures = {}
+    if missing:
+        pool    = _get_pool()
+        futures = {pool.submit(ocr_page, file_path, p, dpi): p for p in missing}
+
+    done      = dict(cached)
+    next_page = 1
+    pending   = as_completed(futures)
+    try:
+        while next_page <= page_count:
+            # Drain finished pages until the next one in order is available
+            while next_page not in done:
+                future = next(pending)
+                page   = futures[future]
+                text   = future.result()
+                done[page] = text
+                OcrPage.objects.update_or_create(
+                    content_hash=content_hash, page=page, dpi=dpi, defaults={'text': text},
+                )
+            yield done.pop(next_page)
+            next_page += 1
+    finally:
+        for future in futures:
+            future.cancel()
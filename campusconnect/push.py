@@ -0,0 +1,266 @@
+"""
+Live announcement updates over Server-Sent Events.
+
+The announcement views call ``publish_announcement`` after a post, edit or
+delete. Every open ``announcements/stream/`` connection whose viewer is in
+the announcement's audience then gets an event carrying the rendered card,
+so students no longer reload the feed to find new posts.
+
+Connections are indexed by audience key (the "year|stream|branch" keys of
+Announcement.audience), so a publish only touches the connections it is
+meant for. Each connection is an asyncio queue drained by one async
+generator, so an idle client costs a few KB and no thread. That needs
+ASGI; under WSGI the endpoint answers 204, which tells EventSource to stop
+reconnecting, and the page works as it did before.
+
+With one process, events are dispatched in memory. With several workers,
+set PUSH_REDIS_URL (defaults to REDIS_URL): events then go out on a Redis
+channel and a listener thread in each process dispatches them to its own
+connections. A reconnecting client sends Last-Event-ID and is replayed
+what was posted or edited in between (deletes are not replayed).
+"""
+import asyncio
+import datetime
+import json
+import logging
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.template.loader import render_to_string
+
+from .models import Announcement
+
+logger = logging.getLogger(__name__)
+
+CHANNEL    = 'campusconnect:announcements'
+EVERYONE   = '*'          # key of connections that see every announcement (faculty)
+RETRY_MS   = 5000         # EventSource reconnect delay
+REPLAY_MAX = 50
+PING       = None         # queued by the heartbeat; sent as an SSE comment
+
+
+# ── In-process pub/sub ──
+class Subscription:
+    def __init__(self, keys, loop):
+        self.keys       = keys
+        self.loop       = loop
+        self.queue      = asyncio.Queue(settings.PUSH_QUEUE_SIZE)
+        self.overflowed = False
+
+    def deliver(self, message):
+        """Runs on the subscriber's event loop."""
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            if message is not PING:
+                # Too far behind: end the stream; the client reconnects and replays
+                self.overflowed = True
+
+
+class Broker:
+    def __init__(self):
+        self._lock        = threading.Lock()
+        self._subscribers = {}    # audience key -> set of Subscription
+        self._all         = set()
+        self._heartbeats  = {}    # event loop -> its heartbeat task
+
+    def subscribe(self, keys):
+        loop = asyncio.get_running_loop()
+        subscription = Subscription(keys, loop)
+        with self._lock:
+            for key in keys:
+                self._subscribers.setdefault(key, set()).add(subscription)
+            self._all.add(subscription)
+        if loop not in self._heartbeats:
+            self._heartbeats[loop] = loop.create_task(self._heartbeat(loop))
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for key in subscription.keys:
+                subscribers = self._subscribers.get(key)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscribers[key]
+            self._all.discard(subscription)
+
+    def count(self):
+        return len(self._all)
+
+    async def _heartbeat(self, loop):
+        """One timer per event loop pings all of its connections.
+
+        Cheaper than a timeout per connection, and keeps proxies from closing
+        idle streams and the server from holding on to dead clients.
+        """
+        try:
+            while True:
+                await asyncio.sleep(settings.PUSH_HEARTBEAT)
+                with self._lock:
+                    subscriptions = [s for s in self._all if s.loop is loop]
+                if not subscriptions:
+                    return
+                for subscription in subscriptions:
+                    subscription.deliver(PING)
+        finally:
+            self._heartbeats.pop(loop, None)
+
+    def dispatch(self, event):
+        """Queues `event` for matching subscribers; safe to call from any thread."""
+        with self._lock:
+            targets = self._subscribers.get(event['audience'], set()) | self._subscribers.get(EVERYONE, set())
+        message = format_event(event)    # serialized once, not per connection
+        # One thread-safe wakeup per event loop, not one per connection
+        by_loop = {}
+        for subscription in targets:
+            by_loop.setdefault(subscription.loop, []).append(subscription)
+        for loop, subscriptions in by_loop.items():
+            try:
+                loop.call_soon_threadsafe(_deliver_all, subscriptions, message)
+            except RuntimeError:   # that loop has shut down
+                pass
+        return len(targets)
+
+
+def _deliver_all(subscriptions, message):
+    for subscription in subscriptions:
+        subscription.deliver(message)
+
+
+broker = Broker()
+
+
+# ── Cross-process fan-out (optional Redis) ──
+_redis         = None
+_listener      = None
+_listener_lock = threading.Lock()
+
+
+def _redis_client():
+    global _redis
+    if _redis is None:
+        import redis
+        _redis = redis.Redis.from_url(settings.PUSH_REDIS_URL)
+    return _redis
+
+
+def _listen():
+    while True:
+        try:
+            pubsub = _redis_client().pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(CHANNEL)
+            for message in pubsub.listen():
+                broker.dispatch(json.loads(message['data']))
+        except Exception:
+            logger.warning('Announcement push listener lost Redis; retrying', exc_info=True)
+            time.sleep(1)
+
+
+def _ensure_listener():
+    global _listener
+    if not settings.PUSH_REDIS_URL:
+        return
+    with _listener_lock:
+        if _listener is None:
+            _listener = threading.Thread(target=_listen, name='announcement-push', daemon=True)
+            _listener.start()
+
+
+def publish(event):
+    if settings.PUSH_REDIS_URL:
+        try:
+            _redis_client().publish(CHANNEL, json.dumps(event))
+            return
+        except Exception:
+            logger.warning('Redis publish failed; pushing to this process only', exc_info=True)
+    broker.dispatch(event)
+
+
+# ── Events ──
+def event_id(ann=None):
+    """Milliseconds since the epoch; a reconnect replays rows updated after it."""
+    moment = ann.updated_at.timestamp() if ann is not None else time.time()
+    return str(int(moment * 1000))
+
+
+def announcement_event(ann, action, audience=None, pk=None):
+    """`action` is 'created', 'updated' or 'deleted'.
+
+    Cards are rendered as students see them, for every connection; a faculty
+    page adds its own edit / delete controls (and CSRF token) to pushed cards.
+    """
+    html = ''
+    if action != 'deleted':
+        html = render_to_string('announcement_cards.html', {'announcements': [ann], 'is_faculty': False}).strip()
+    return {
+        'id':       event_id(ann if action != 'deleted' else None),
+        'action':   action,
+        'pk':       pk or ann.pk,
+        'audience': audience or ann.audience,
+        'pinned':   ann.is_pinned,
+        'priority': ann.priority,
+        'target':   [ann.target_year, ann.target_stream, ann.target_branch],
+        'html':     html,
+    }
+
+
+def publish_announcement(ann, action, old_audience=None, pk=None):
+    """Pushes a post / edit / delete once the transaction commits.
+
+    For a delete, call it after ann.delete() inside the same atomic block and
+    pass the saved `pk` (delete() clears it), so nothing is sent unless the
+    delete commits. An edit that moves an announcement to another audience
+    also sends a delete to the old one.
+    """
+    events = []
+    if old_audience and old_audience != ann.audience:
+        events.append(announcement_event(ann, 'deleted', audience=old_audience))
+    events.append(announcement_event(ann, action, pk=pk))
+    transaction.on_commit(lambda: [publish(event) for event in events])
+
+
+def viewer_keys(profile):
+    """Audience keys a viewer's connection is registered under."""
+    if profile is None or profile.role == 'faculty' or not (profile.year or profile.branch):
+        return [EVERYONE]
+    stream = profile.stream if profile.branch else ''
+    return Announcement.audience_keys(profile.year or '', stream, profile.branch or '')
+
+
+def replay_events(keys, last_event_id):
+    """Events for announcements posted or edited after `last_event_id`."""
+    try:
+        since = int(last_event_id) / 1000
+    except (TypeError, ValueError):
+        return []
+    qs = Announcement.objects.select_related('author').filter(
+        updated_at__gt=datetime.datetime.fromtimestamp(since, tz=datetime.timezone.utc),
+    )
+    if keys != [EVERYONE]:
+        qs = qs.filter(audience__in=keys)
+    rows = list(qs.order_by('-updated_at')[:REPLAY_MAX])
+    return [announcement_event(ann, 'updated') for ann in reversed(rows)]
+
+
+def format_event(event):
+    return f"id: {event['id']}\nevent: announcement\ndata: {json.dumps(event)}\n\n"
+
+
+async def stream(keys, last_event_id=None):
+    """SSE body for one connection: replay, then live events, with heartbeats."""
+    _ensure_listener()
+    subscription = broker.subscribe(keys)
+    try:
+        yield f'retry: {RETRY_MS}\n\n'
+        if last_event_id:
+            for event in await sync_to_async(replay_events)(keys, last_event_id):
+                yield format_event(event)
+        while not subscription.overflowed:
+            message = await subscription.queue.get()
+            yield ': ping\n\n' if message is PING else message
+    finally:
+        broker.unsubscribe(subscription)
@@ -0,0 +1,66 @@
+"""
+Per-goal cache of quiz questions.
+
+Every student opening a quiz, and every submission being graded, needs the
+same question rows. They are read once per goal, serialized to plain dicts
+and kept in the ``quizzes`` cache under a per-goal version. Saving or
+deleting a QuizQuestion (create_goal, the admin, cascades from a deleted
+goal) bumps that goal's version through the signals in signals.py, which
+orphans the old entry. goal_detail renders from ``questions`` and
+grading.py scores against ``answer_key``, so both share one entry.
+
+Bulk writes (QuerySet.update / bulk_create) send no signals; call ``bump``
+after them. With several worker processes, point ``quizzes`` at a shared
+cache (REDIS_URL) so a bump reaches all of them.
+"""
+import time
+
+from django.core.cache import caches
+
+from .models import QuizQuestion
+
+CACHE_ALIAS = 'quizzes'
+FIELDS      = ['id', 'qtype', 'question', 'option_a', 'option_b', 'option_c', 'option_d', 'correct', 'order']
+
+
+def _cache():
+    return caches[CACHE_ALIAS]
+
+
+def _version_key(goal_id):
+    return f'quiz:{goal_id}:version'
+
+
+def version(goal_id):
+    cache = _cache()
+    current = cache.get(_version_key(goal_id))
+    if current is None:
+        # Clock-based seed: an evicted version never restarts below an old one
+        cache.add(_version_key(goal_id), int(time.time() * 1000), timeout=None)
+        current = cache.get(_version_key(goal_id))
+    return current
+
+
+def bump(goal_id):
+    """Invalidates the cached questions of one goal."""
+    cache = _cache()
+    try:
+        cache.incr(_version_key(goal_id))
+    except ValueError:   # not set yet, or evicted
+        cache.set(_version_key(goal_id), int(time.time() * 1000), timeout=None)
+
+
+def questions(goal_id):
+    """The goal's questions in order, as dicts with the QuizQuestion field names."""
+    cache = _cache()
+    key   = f'quiz:{goal_id}:{version(goal_id)}'
+    rows  = cache.get(key)
+    if rows is None:
+        rows = list(QuizQuestion.objects.filter(goal_id=goal_id).order_by('order', 'id').values(*FIELDS))
+        cache.set(key, rows)
+    return rows
+
+
+def answer_key(goal_id):
+    """[(question id, qtype, correct letter), ...] in question order."""
+    return [(q['id'], q['qtype'], q['correct']) for q in questions(goal_id)]
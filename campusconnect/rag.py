@@ -0,0 +1,328 @@
+"""
+Document helpers for the self-study RAG chatbot.
+
+Text extraction and chunking are expensive (PyPDF2, and OCR for scanned
+PDFs), so the chunks of every Resource are persisted in
+``resources.ResourceText`` by the ingestion pipeline (``ingest.py``) and
+reused until the file itself changes.
+"""
+import hashlib
+import logging
+import math
+import os
+import re
+import threading
+import time
+
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.utils import timezone
+
+from resources.models import ResourceText
+from .bm25 import BM25Index
+
+logger = logging.getLogger(__name__)
+
+STALE_JOB_AFTER    = timedelta(minutes=10)
+FAILED_RETRY_AFTER = timedelta(minutes=30)
+INDEX_CACHE_SIZE   = 64   # resources whose parsed index stays in memory
+
+
+# ── Helper 1: extract text from PDF ───────────────────────────────
+def iter_pdf_pages(file_path, content_hash=None, stats=None):
+    """Yields the text of every page of a PDF, in order.
+
+    Uses the embedded text layer when there is one; scanned PDFs fall
+    back to page-parallel, cached OCR (see ocr.py). Errors propagate so
+    the ingestion pipeline can record them.
+    """
+    import PyPDF2
+    with open(file_path, 'rb') as f:
+        reader = PyPDF2.PdfReader(f)
+        parts  = [page.extract_text() or '' for page in reader.pages]
+    if len(''.join(parts).strip()) > 100:
+        yield from parts   # normal PDF — text extracted fine
+        return
+
+    # Fallback: scanned PDF — use OCR
+    from .ocr import iter_ocr_pages
+    if content_hash is None:
+        content_hash = file_sha256(file_path)
+    yield from iter_ocr_pages(file_path, content_hash, len(parts), stats=stats)
+
+
+def extract_text_from_pdf(file_path):
+    try:
+        return '\n'.join(iter_pdf_pages(file_path))
+    except Exception:
+        logger.exception('Text extraction failed for %s', file_path)
+        return ""
+
+
+# ── Helper 2: split text into overlapping chunks ──────────────────
+def chunk_text(text, chunk_size=400, overlap=60):
+    words = text.split()
+    chunks = []
+    step = max(1, chunk_size - overlap)
+    for i in range(0, len(words), step):
+        chunk = ' '.join(words[i:i + chunk_size])
+        if chunk.strip():
+            chunks.append(chunk)
+    return chunks
+
+
+def iter_chunks(pages, chunk_size=400, overlap=60):
+    """Streaming chunk_text: same chunks, produced while pages still arrive."""
+    step   = max(1, chunk_size - overlap)
+    buffer = []
+    for page in pages:
+        buffer.extend(page.split())
+        while len(buffer) >= chunk_size:
+            yield ' '.join(buffer[:chunk_size])
+            del buffer[:step]
+    while buffer:
+        yield ' '.join(buffer[:chunk_size])
+        del buffer[:step]
+
+
+# ── Helper 3: simple TF-IDF search ───────────────────────────────
+def simple_tfidf_search(query, chunks, top_k=4):
+    if not chunks:
+        return []
+
+    def tokenize(text):
+        return re.findall(r'\b\w+\b', text.lower())
+
+    query_tokens = set(tokenize(query))
+    num_docs     = len(chunks)
+    scores       = []
+
+    for chunk in chunks:
+        chunk_tokens = tokenize(chunk)
+        if not chunk_tokens:
+            scores.append(0)
+            continue
+        counts = {}
+        for t in chunk_tokens:
+            counts[t] = counts.get(t, 0) + 1
+        score = 0
+        for token in query_tokens:
+            if token in counts:
+                tf  = counts[token] / len(chunk_tokens)
+                df  = sum(1 for c in chunks if token in tokenize(c))
+                idf = math.log((num_docs + 1) / (df + 1)) + 1
+                score += tf * idf
+        scores.append(score)
+
+    ranked = sorted(range(len(chunks)), key=lambda i: scores[i], reverse=True)
+    top    = [chunks[i] for i in ranked[:top_k] if scores[i] > 0]
+    return top if top else chunks[:top_k]
+
+
+# ── Helper 4: persistent per-resource chunk store ─────────────────
+def file_sha256(file_path, block_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _file_stat(file_path):
+    st = os.stat(file_path)
+    return st.st_size, st.st_mtime
+
+
+def is_pdf(resource):
+    return bool(resource.file) and os.path.splitext(resource.file.name)[1].lower() == '.pdf'
+
+
+def get_resource_store(resource):
+    """Returns the ready, up-to-date ResourceText for a PDF resource, or None.
+
+    Never parses the PDF itself: a missing or stale store (file changed
+    since it was indexed — checked by name/size/mtime first, then by
+    content hash so a touched-but-identical file is not re-parsed) is
+    queued for ingestion and None is returned until it is ready.
+    """
+    if not is_pdf(resource):
+        return None
+
+    file_path = resource.file.path
+    try:
+        size, mtime = _file_stat(file_path)
+    except OSError:
+        return None
+
+    # chunks/index are large — only loaded when actually needed
+    store = ResourceText.objects.filter(resource=resource).defer('chunks', 'index').first()
+    if store is None:
+        from .ingest import enqueue_resource
+        enqueue_resource(resource)
+        return None
+    if store.status in ('pending', 'indexing'):
+        # A job orphaned by a restarted worker process gets picked up again
+        if timezone.now() - store.updated_at > STALE_JOB_AFTER:
+            from .ingest import enqueue_resource
+            enqueue_resource(resource)
+        return None
+    if store.status == 'failed':
+        # OCR / LLM failures are often transient: try again after a back-off
+        if timezone.now() - store.updated_at > FAILED_RETRY_AFTER:
+            from .ingest import enqueue_resource
+            enqueue_resource(resource)
+        return None
+
+    fresh = (store.file_name == resource.file.name
+             and store.file_size == size and store.file_mtime == mtime)
+    if not fresh and store.content_hash == file_sha256(file_path):
+        store.file_name, store.file_size, store.file_mtime = resource.file.name, size, mtime
+        store.save(update_fields=['file_name', 'file_size', 'file_mtime', 'updated_at'])
+        fresh = True
+
+    if not fresh:
+        from .ingest import enqueue_resource
+        enqueue_resource(resource)
+        return None
+    return store if store.status == 'ready' else None
+
+
+def build_resource_store(resource):
+    """Extracts, chunks and indexes the resource file and saves the result.
+
+    Runs inside the ingestion worker; records per-stage timings.
+    """
+    timings   = {}
+    started   = time.perf_counter()
+    file_path = resource.file.path
+    size, mtime = _file_stat(file_path)
+
+    t0 = time.perf_counter()
+    content_hash = file_sha256(file_path)
+    timings['hash_ms'] = round((time.perf_counter() - t0) * 1000)
+
+    # Pages are chunked as they come out of the extractor / OCR pool
+    t0 = time.perf_counter()
+    char_count = 0
+
+    def counted(pages):
+        nonlocal char_count
+        for page in pages:
+            char_count += len(page)
+            yield page
+
+    chunks = list(iter_chunks(counted(iter_pdf_pages(file_path, content_hash, stats=timings))))
+    if char_count < 100:
+        chunks = []
+    timings['extract_ms'] = round((time.perf_counter() - t0) * 1000)
+
+    t0 = time.perf_counter()
+    index = BM25Index.build(chunks)
+    timings['index_ms'] = round((time.perf_counter() - t0) * 1000)
+    timings['total_ms'] = round((time.perf_counter() - started) * 1000)
+
+    store, _ = ResourceText.objects.update_or_create(
+        resource=resource,
+        defaults={
+            'status':       'ready',
+            'error':        '',
+            'timings':      timings,
+            'indexed_at':   timezone.now(),
+            'content_hash': content_hash,
+            'file_name':    resource.file.name,
+            'file_size':    size,
+            'file_mtime':   mtime,
+            'chunks':       chunks,
+            'index':        index.to_dict(),
+            'char_count':   char_count,
+        },
+    )
+    _cache_index(resource.pk, content_hash, chunks, index)
+    return store
+
+
+def get_index_status(resource):
+    """Status shown in the workspace: 'ready', 'indexing', 'failed' or 'unsupported'."""
+    if not is_pdf(resource):
+        return 'unsupported'
+    status = ResourceText.objects.filter(resource=resource).values_list('status', flat=True).first()
+    if status in ('ready', 'failed'):
+        return status
+    return 'indexing'
+
+
+def get_resource_chunks(resource):
+    store = get_resource_store(resource)
+    return store.chunks if store else []
+
+
+# Deserialized (chunks, index) pairs, keyed by (resource id, content hash)
+# so a new file version never hits a stale entry. Least recently used
+# first; shared by request threads, hence the lock.
+_index_cache      = OrderedDict()
+_index_cache_lock = threading.Lock()
+
+
+def _cached_index(resource_id, content_hash):
+    with _index_cache_lock:
+        cached = _index_cache.get((resource_id, content_hash))
+        if cached is not None:
+            _index_cache.move_to_end((resource_id, content_hash))
+        return cached
+
+
+def _cache_index(resource_id, content_hash, chunks, index):
+    with _index_cache_lock:
+        for stale in [k for k in _index_cache if k[0] == resource_id]:
+            del _index_cache[stale]
+        _index_cache[(resource_id, content_hash)] = (chunks, index)
+        while len(_index_cache) > INDEX_CACHE_SIZE:
+            _index_cache.popitem(last=False)
+
+
+def _load_index(resource):
+    """Returns (content_hash, chunks, BM25Index) or None if there is no text."""
+    store = get_resource_store(resource)
+    if not store:
+        return None
+
+    cached = _cached_index(resource.pk, store.content_hash)
+    if cached is None:
+        chunks = store.chunks
+        if store.index:
+            index = BM25Index.from_dict(store.index)
+        else:
+            # Row stored before the index existed — build it once now
+            index = BM25Index.build(chunks)
+            store.index = index.to_dict()
+            store.save(update_fields=['index', 'updated_at'])
+        _cache_index(resource.pk, store.content_hash, chunks, index)
+        cached = (chunks, index)
+
+    chunks, index = cached
+    if not chunks:
+        return None
+    return store.content_hash, chunks, index
+
+
+def get_resource_index(resource):
+    """Returns (chunks, BM25Index) for a resource; ([], None) if it has no text."""
+    loaded = _load_index(resource)
+    if loaded is None:
+        return [], None
+    return loaded[1], loaded[2]
+
+
+def retrieve(resource, question, top_k=4):
+    """Returns (content_hash, chunk ids, chunk texts) of the best chunks.
+
+    The hash + ids identify exactly what the LLM will be shown, which is
+    what the answer cache keys on.
+    """
+    loaded = _load_index(resource)
+    if loaded is None:
+        return '', [], []
+    content_hash, chunks, index = loaded
+    ids = index.search_ids(question, top_k)
+    return content_hash, ids, [chunks[i] for i in ids]
@@ -0,0 +1,163 @@
+"""
+Full-text search over announcements.
+
+SQLite uses the ``campusconnect_announcement_fts`` FTS5 table, kept in sync
+with ``campusconnect_announcement`` by triggers (migration 0012), so
+bulk_create / update() are indexed too. PostgreSQL uses a GIN index on the
+same tsvector expression the queries build. Other databases, or an SQLite
+build without FTS5, fall back to the old icontains filter.
+
+``search_announcements`` filters a queryset and annotates ``search_rank``
+(higher is better), ``search_title`` and ``search_snippet``, in which matches
+are wrapped in the HL_START / HL_STOP sentinels; ``highlight`` turns those
+into escaped HTML with ``<mark>`` tags.
+"""
+import re
+
+from django.db import connection
+from django.db.models import F, FloatField, Func, Q, TextField, Value
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+FTS_TABLE = 'campusconnect_announcement_fts'
+HL_START  = '\x02'
+HL_STOP   = '\x03'
+SNIPPET_TOKENS = 24
+TITLE_WEIGHT   = 5.0          # a hit in the title outranks one in the body
+
+_word = re.compile(r'\w+', re.UNICODE)
+_fts5_ready = None
+
+
+def backend():
+    """'sqlite', 'postgresql' or None (LIKE fallback)."""
+    global _fts5_ready
+    if connection.vendor == 'postgresql':
+        return 'postgresql'
+    if connection.vendor != 'sqlite':
+        return None
+    if _fts5_ready is None:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+            _fts5_ready = cursor.fetchone() is not None
+    return 'sqlite' if _fts5_ready else None
+
+
+# ── Index DDL (`manage.py rebuild_search_index`; migration 0012 keeps its own copy) ──
+SQLITE_SCHEMA = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, body,
+        content='campusconnect_announcement', content_rowid='id',
+        tokenize='porter unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON campusconnect_announcement BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON campusconnect_announcement BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, body) VALUES ('delete', old.id, old.title, old.body);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF title, body ON campusconnect_announcement BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, body) VALUES ('delete', old.id, old.title, old.body);
+        INSERT INTO {FTS_TABLE}(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END""",
+]
+
+
+def install_sqlite(conn):
+    """Creates the FTS5 table and sync triggers if missing, then rebuilds the index.
+
+    Returns False when this SQLite build has no FTS5 (search falls back to LIKE).
+    Re-run it after a migration that makes SQLite rebuild the announcement
+    table, since that drops the triggers.
+    """
+    global _fts5_ready
+    from django.db.utils import OperationalError
+    with conn.cursor() as cursor:
+        try:
+            for statement in SQLITE_SCHEMA:
+                cursor.execute(statement)
+        except OperationalError:
+            return False
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    _fts5_ready = True
+    return True
+
+
+def fts5_query(text):
+    """User input -> FTS5 MATCH string: every word must match, the last as a prefix.
+
+    Words are quoted so FTS5 operators and punctuation in the search box
+    can't produce a syntax error.
+    """
+    words = _word.findall(text.lower())
+    if not words:
+        return ''
+    terms = [f'"{w}"' for w in words]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def search_announcements(qs, text):
+    """Announcements in `qs` matching `text`, annotated with rank and snippet."""
+    engine = backend()
+
+    if engine == 'sqlite':
+        match = fts5_query(text)
+        if not match:
+            return qs.none()
+        # Joined to the FTS table (AnnouncementSearch), so the MATCH runs once
+        # and bm25 / highlight / snippet read that same match per row
+        document = F('search_doc__document')
+        return qs.filter(search_doc__document__match=match).annotate(
+            search_rank=Func(document, Value(TITLE_WEIGHT), Value(1.0),
+                             function='bm25', output_field=FloatField()) * -1,
+            search_title=Func(document, Value(0), Value(HL_START), Value(HL_STOP),
+                              function='highlight', output_field=TextField()),
+            search_snippet=Func(document, Value(1), Value(HL_START), Value(HL_STOP), Value('…'),
+                                Value(SNIPPET_TOKENS), function='snippet', output_field=TextField()),
+        )
+
+    if engine == 'postgresql':
+        from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+
+        query = SearchQuery(text, config='english', search_type='websearch')
+        return qs.annotate(
+            search_vector=document_vector(),
+        ).filter(search_vector=query).annotate(
+            search_rank=SearchRank(F('search_vector'), query),
+            search_title=SearchHeadline(
+                'title', query, config='english',
+                start_sel=HL_START, stop_sel=HL_STOP, highlight_all=True,
+            ),
+            search_snippet=SearchHeadline(
+                'body', query, config='english',
+                start_sel=HL_START, stop_sel=HL_STOP, max_words=SNIPPET_TOKENS,
+            ),
+        )
+
+    return qs.filter(Q(title__icontains=text) | Q(body__icontains=text)).annotate(
+        search_rank=Value(0.0, output_field=FloatField()),
+        search_title=F('title'),
+        search_snippet=F('body'),
+    )
+
+
+def document_vector():
+    """The tsvector indexed on PostgreSQL; must match POSTGRES_INDEX in migration 0012."""
+    from django.contrib.postgres.search import SearchVector
+    return SearchVector('title', weight='A', config='english') + SearchVector('body', weight='B', config='english')
+
+
+def highlight(snippet):
+    """Escapes a snippet and turns the match sentinels into <mark> tags."""
+    html = escape(snippet).replace(HL_START, '<mark>').replace(HL_STOP, '</mark>')
+    return mark_safe(html)
+
+
+def with_highlights(announcements):
+    """Evaluates search results, adding title_html / snippet_html for the template."""
+    results = list(announcements)
+    for ann in results:
+        ann.title_html   = highlight(ann.search_title or ann.title)
+        ann.snippet_html = highlight(ann.search_snippet or ann.body)
+    return results
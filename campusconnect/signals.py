@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import quiz_cache
+from .models import QuizQuestion
+
+
+@receiver([post_save, post_delete], sender=QuizQuestion)
+def invalidate_quiz(sender, instance, **kwargs):
+    """A question added, edited or removed anywhere (views, admin, cascades)."""
+    quiz_cache.bump(instance.goal_id)
@@ -0,0 +1,53 @@
+"""
+Date-driven status transitions, applied in bulk.
+
+Goals past their due date become 'overdue' (and return to 'active' if the
+date is moved back), library records not returned by their due date get
+is_overdue, and permission letters still pending once their dates have
+passed (or PERMISSION_STALE_DAYS after they were sent, if undated) become
+'expired'. Each is one set-based UPDATE, so page views only read;
+``manage.py sweep_overdue`` runs this from cron or its own --loop.
+
+Pages still derive "overdue" from the date between sweeps
+(Goal.current_status, LibraryRecord.status), so a late sweep never shows
+stale data.
+"""
+import datetime
+import logging
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Goal, LibraryRecord, Permission
+
+logger = logging.getLogger(__name__)
+
+
+def sweep(today=None):
+    """Applies every transition due by `today`; returns ({name: rows updated}, seconds)."""
+    today   = today or timezone.localdate()
+    now     = timezone.now()
+    stale   = now - datetime.timedelta(days=settings.PERMISSION_STALE_DAYS)
+    started = time.perf_counter()
+    with transaction.atomic():
+        touched = {
+            'goals_overdue':    Goal.objects.filter(status='active', due_date__lt=today).update(status='overdue'),
+            'goals_reopened':   Goal.objects.filter(status='overdue', due_date__gte=today).update(status='active'),
+            'library_overdue':  LibraryRecord.objects.filter(
+                is_overdue=False, is_returned=False, due_date__lt=today,
+            ).update(is_overdue=True),
+            'library_cleared':  LibraryRecord.objects.filter(is_overdue=True).filter(
+                Q(is_returned=True) | Q(due_date__gte=today),
+            ).update(is_overdue=False),
+            'permissions_expired': Permission.objects.filter(status='pending').filter(
+                Q(end_date__lt=today)
+                | Q(end_date__isnull=True, start_date__lt=today)
+                | Q(end_date__isnull=True, start_date__isnull=True, created_at__lt=stale),
+            ).update(status='expired', updated_at=now),
+        }
+    duration = time.perf_counter() - started
+    logger.info('Overdue sweep: %s in %.3fs', ', '.join(f'{k}={v}' for k, v in touched.items()), duration)
+    return touched, duration
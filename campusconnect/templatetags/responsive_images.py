@@ -0,0 +1,56 @@
+"""
+Responsive markup for images processed by campusconnect/images.py.
+
+    {% load responsive_images %}
+    {% picture ann.image ann.image_variants alt=ann.title sizes="(max-width: 700px) 100vw, 780px" css_class="ann-img" %}
+    {% picture profile.avatar profile.avatar_variants sizes="28px" size="thumb" %}
+    <img srcset="{{ profile.avatar_variants|srcset:'jpeg' }}" ...>
+"""
+from django import template
+from django.core.files.storage import default_storage
+from django.utils.html import format_html
+
+register = template.Library()
+
+def _sizes(variants):
+    return (variants or {}).get('sizes') or []
+
+
+@register.filter
+def srcset(variants, fmt='webp'):
+    """"url 192w, url 800w, ..." for one format ('webp' or 'jpeg')."""
+    return ', '.join(
+        f"{default_storage.url(size[fmt])} {size['width']}w"
+        for size in sorted(_sizes(variants), key=lambda size: size['width'])
+    )
+
+
+@register.simple_tag
+def picture(image, variants, alt='', sizes='100vw', css_class='', size='card', eager=False):
+    """<picture> with WebP and JPEG srcsets, lazy-loaded unless `eager`.
+
+    The `size` variant is the plain src and sets the width/height attributes.
+
+    Falls back to a plain <img> of the original when there are no variants
+    yet (not backfilled, or not a readable image).
+    """
+    loading = 'eager' if eager else 'lazy'
+    available = _sizes(variants)
+    if not available:
+        if not image:
+            return ''
+        return format_html(
+            '<img src="{}" alt="{}" class="{}" loading="{}" decoding="async">',
+            image.url, alt, css_class, loading,
+        )
+
+    # A small original has no variant above its own width: use the largest there is
+    default = next((variant for variant in available if variant['name'] == size), available[0])
+    # display:contents keeps the <img> styled and sized as a direct child of its container
+    return format_html(
+        '<picture style="display:contents"><source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" width="{}" height="{}" '
+        'alt="{}" class="{}" loading="{}" decoding="async"></picture>',
+        srcset(variants, 'webp'), sizes, default_storage.url(default['jpeg']), srcset(variants, 'jpeg'), sizes,
+        default['width'], default['height'], alt, css_class, loading,
+    )
@@ -1,3 +1,647 @@
-from django.test import TestCase
+import asyncio
+import csv
+import datetime
+import io
+import json
+import zipfile
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.admin.sites import site
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, RequestFactory, SimpleTestCase, TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from . import admission, analytics, answer_cache, assignments, goal_stats, grading, llm, push, quiz_cache, sweeper, unread
+from .models import (Announcement, ChatSession, ChatTurn, Goal, GoalAnalytics, GoalSubmission, LibraryRecord,
+                     Permission, QuizAnswer, QuizQuestion, UnreadCounter, UserProfile)
+from .pagination import keyset_page
+from .search import search_announcements, with_highlights
+
+
+class TeacherGoalDashboardTests(TestCase):
+
+    def setUp(self):
+        self.teacher = User.objects.create_user('teacher', password='pw')
+        UserProfile.objects.create(user=self.teacher, role='faculty')
+        self.students = []
+        for i in range(3):
+            student = User.objects.create_user(f'student{i}', password='pw')
+            UserProfile.objects.create(user=student, role='student', year='1', branch='cse')
+            self.students.append(student)
+        self.client.login(username='teacher', password='pw')
+
+    def add_goals(self, n):
+        for i in range(n):
+            goal = Goal.objects.create(
+                title=f'Goal {i}', goal_type='quiz', assigned_by=self.teacher,
+                start_date='2026-01-01', due_date='2026-12-31',
+            )
+            assignments.assign(goal, User.objects.filter(profile__role='student'))
+            for student in self.students[:2]:
+                GoalSubmission.objects.create(goal=goal, student=student, quiz_score=3, quiz_total=4)
+
+    def dashboard_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('goals'))
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_query_count_does_not_grow_with_goals(self):
+        self.dashboard_queries()   # first visit creates the unread-badge row
+        self.add_goals(1)
+        few = self.dashboard_queries()
+        self.add_goals(40)
+        self.assertEqual(self.dashboard_queries(), few)
+
+    def test_counters_follow_submissions_and_reviews(self):
+        goal = Goal.objects.create(
+            title='Essay', assigned_by=self.teacher, start_date='2026-01-01', due_date='2026-12-31',
+        )
+        assignments.assign(goal, User.objects.filter(profile__role='student'))
+
+        self.client.login(username='student0', password='pw')
+        self.client.post(reverse('goal_detail', args=[goal.id]), {'note': 'done'})
+        self.client.post(reverse('goal_detail', args=[goal.id]), {'note': 'again'})   # ignored: already submitted
+        self.client.login(username='teacher', password='pw')
+        sub = GoalSubmission.objects.get(goal=goal)
+        self.client.post(reverse('review_submission', args=[sub.id]), {'status': 'approved', 'feedback': 'ok'})
+        self.client.post(reverse('review_submission', args=[sub.id]), {'status': 'reviewed', 'feedback': 'ok'})
+
+        goal.refresh_from_db()
+        self.assertEqual((goal.assigned_count, goal.submission_count, goal.reviewed_count), (3, 1, 1))
+
+
+class SubmissionExportTests(TestCase):
+
+    def setUp(self):
+        self.teacher = User.objects.create_user('teacher', password='pw')
+        UserProfile.objects.create(user=self.teacher, role='faculty')
+        self.goal = Goal.objects.create(
+            title='Quiz', goal_type='quiz', assigned_by=self.teacher,
+            start_date=datetime.date(2026, 1, 1), due_date=datetime.date(2099, 12, 31),
+        )
+        q1 = QuizQuestion.objects.create(goal=self.goal, question='2+2?', option_a='3', option_b='4', correct='B', order=1)
+        q2 = QuizQuestion.objects.create(goal=self.goal, qtype='short', question='Why?', order=2)
+        for i, (mcq, short) in enumerate([('B', 'because'), ('A', '=cmd()')]):
+            student = User.objects.create_user(f'student{i}', password='pw')
+            UserProfile.objects.create(user=student, role='student', roll_no=f'R{i}')
+            grading.submit(self.goal, student, form={f'answer_{q1.id}': mcq, f'answer_{q2.id}': short})
+        self.client.login(username='teacher', password='pw')
+
+    def test_csv_has_one_row_per_submission_with_answers(self):
+        response = self.client.get(reverse('export_submissions', args=[self.goal.id]))
+        self.assertTrue(response.streaming)
+        rows = list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode('utf-8-sig'))))
+        self.assertEqual(rows[0][-2:], ['Q1 [B]', 'Q2'])
+        self.assertEqual([row[0] for row in rows[1:]], ['R0', 'R1'])
+        self.assertEqual(rows[1][-2:], ['B', 'because'])
+        self.assertEqual(rows[2][-2:], ['A', "'=cmd()"])   # not run as a formula
+        self.assertEqual(rows[1][6:9], ['1.0', '2', '50.0'])   # score, total, percent
+
+    def test_xlsx_is_a_readable_workbook(self):
+        response = self.client.get(reverse('export_submissions', args=[self.goal.id]), {'format': 'xlsx'})
+        book = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertIsNone(book.testzip())
+        sheet = book.read('xl/worksheets/sheet1.xml').decode()
+        self.assertEqual(sheet.count('<row>'), 3)
+        self.assertIn('=cmd()', sheet)
+
+    def test_only_the_owner_can_export(self):
+        User.objects.create_user('other', password='pw')
+        self.client.login(username='other', password='pw')
+        self.assertEqual(self.client.get(reverse('export_submissions', args=[self.goal.id])).status_code, 404)
+
+
+class ChatLoadTestCommandTests(TransactionTestCase):
+    # Transaction-less: the command's worker threads use their own connections.
+    # One sync thread: the in-memory test database is shared-cache, where
+    # concurrent writers fail at once instead of waiting for the lock.
+
+    def test_every_request_is_answered(self):
+        out = io.StringIO()
+        # Raises CommandError on any non-200 response
+        call_command('loadtest_chat', sessions=[5], latency=0, sync_threads=1, stdout=out)
+        report = out.getvalue()
+        self.assertIn('sync', report)
+        self.assertIn('async', report)
+        self.assertFalse(User.objects.filter(username='loadtest-chat').exists())
+        self.assertEqual(ChatTurn.objects.count(), 0)   # cleaned up with the user
+
+
+class AnnouncementFeedCacheTests(TestCase):
+
+    def setUp(self):
+        caches['fragments'].clear()
+        self.teacher = User.objects.create_user('teacher', password='pw')
+        UserProfile.objects.create(user=self.teacher, role='faculty')
+        student = User.objects.create_user('student', password='pw')
+        UserProfile.objects.create(user=student, role='student', year='1', branch='cse')
+        self.ann = Announcement.objects.create(title='Old title', body='Body', author=self.teacher)
+        self.client.login(username='student', password='pw')
+        self.faculty = Client()
+        self.faculty.login(username='teacher', password='pw')
+
+    def feed(self):
+        return self.client.get(reverse('announcements')).content.decode()
+
+    def test_edit_replaces_the_cached_page(self):
+        self.assertIn('Old title', self.feed())
+        self.faculty.post(reverse('edit_announcement', args=[self.ann.pk]), {
+            'title': 'New title', 'body': 'Body', 'priority': 'normal',
+            'target_year': 'all', 'target_stream': 'all', 'target_branch': 'all',
+        })
+        feed = self.feed()
+        self.assertIn('New title', feed)
+        self.assertNotIn('Old title', feed)
+
+    def test_delete_drops_the_cached_card(self):
+        self.assertIn('Old title', self.feed())
+        self.faculty.post(reverse('delete_announcement', args=[self.ann.pk]))
+        self.assertNotIn('Old title', self.feed())
+
+    def test_admin_edit_and_delete_replace_the_cached_page(self):
+        model_admin = site._registry[Announcement]
+        request     = RequestFactory().post('/')
+        request.user = self.teacher
+        self.assertIn('Old title', self.feed())
+
+        self.ann.title = 'Admin title'
+        with self.captureOnCommitCallbacks(execute=True):
+            model_admin.save_model(request, self.ann, None, True)
+        self.assertIn('Admin title', self.feed())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            model_admin.delete_model(request, self.ann)
+        self.assertNotIn('Admin title', self.feed())
+
+
+class AnswerCacheKeyTests(SimpleTestCase):
+
+    def key(self, question):
+        return answer_cache.make_key(1, 'hash', question, [3, 4])
+
+    def test_rewording_shares_a_key(self):
+        self.assertEqual(self.key('What is the TCP handshake?'), self.key('what is TCP handshake please'))
+
+    def test_different_questions_get_different_keys(self):
+        self.assertNotEqual(self.key('Define recursion'), self.key('Explain recursion'))
+        self.assertNotEqual(self.key('What does mutex mean?'), self.key('Mutex'))
+
+
+class ChatSessionCreationTests(TestCase):
+
+    def setUp(self):
+        User.objects.create_user('student', password='pw')
+        self.client.login(username='student', password='pw')
+
+    def ask(self):
+        return self.client.post(reverse('chatbot_api'), {'message': 'What is a mutex?'},
+                                content_type='application/json')
+
+    def test_rejected_request_leaves_no_session(self):
+        closed = admission.AdmissionController(1, 0, 0, rate_per_min=1, burst=0)
+        with admission.use_controller(closed):
+            self.assertEqual(self.ask().status_code, 429)
+        self.assertFalse(ChatSession.objects.exists())
+
+    def test_answered_request_saves_its_session(self):
+        with llm.use_backend(llm.FakeBackend(latency=0)):
+            response = self.ask()
+        self.assertEqual(response.status_code, 200)
+        session = ChatSession.objects.get()
+        self.assertEqual(str(session.pk), response['X-Chat-Session'])
+        self.assertEqual(session.turns.count(), 2)
+
+
+class AnnouncementSearchTests(TestCase):
+
+    def setUp(self):
+        author = User.objects.create_user('teacher')
+        self.in_body  = Announcement.objects.create(title='Notice', body='The exam starts next week.', author=author)
+        self.in_title = Announcement.objects.create(title='Exam schedule', body='Rooms are listed below.', author=author)
+        self.script   = Announcement.objects.create(
+            title='Lab rules', body='<script>alert(1)</script> bring your exam kit', author=author,
+        )
+
+    def search(self, text):
+        return search_announcements(Announcement.objects.all(), text).order_by('-search_rank', 'pk')
+
+    def test_title_hit_outranks_body_hit(self):
+        results = list(self.search('exam'))
+        self.assertEqual(results[0], self.in_title)
+        self.assertCountEqual(results, [self.in_title, self.in_body, self.script])
+
+    def test_last_word_matches_as_prefix(self):
+        self.assertIn(self.in_title, self.search('exam sched'))
+
+    def test_query_syntax_in_the_search_box_is_ignored(self):
+        self.assertCountEqual(self.search('"exam" OR (NEAR'), [])
+        self.assertIn(self.in_title, self.search('exam*'))
+
+    def test_snippets_are_escaped_and_marked(self):
+        [ann] = with_highlights(self.search('kit'))
+        self.assertIn('&lt;script&gt;', ann.snippet_html)
+        self.assertNotIn('<script>', ann.snippet_html)
+        self.assertIn('<mark>kit</mark>', ann.snippet_html)
+
+
+class KeysetPaginationTests(TestCase):
+    FIELDS = ['is_pinned', 'created_at', 'id']
+
+    def setUp(self):
+        self.author = User.objects.create_user('teacher')
+        noon = datetime.datetime(2026, 3, 1, 12, 0, tzinfo=datetime.timezone.utc)
+        for i in range(7):
+            ann = Announcement.objects.create(title=f'A{i}', body='-', is_pinned=i % 3 == 0, author=self.author)
+            # Pairs share a timestamp, so only the id breaks the tie
+            Announcement.objects.filter(pk=ann.pk).update(created_at=noon + datetime.timedelta(minutes=i // 2))
+
+    def walk(self, size, between_pages=None):
+        seen, cursor = [], None
+        while True:
+            rows, cursor = keyset_page(Announcement.objects.all(), self.FIELDS, cursor, size)
+            seen += [ann.pk for ann in rows]
+            if cursor is None:
+                return seen
+            if between_pages:
+                between_pages()
+
+    def expected(self):
+        return list(Announcement.objects.order_by('-is_pinned', '-created_at', '-id').values_list('pk', flat=True))
+
+    def test_pages_cover_pinned_then_unpinned_rows_once(self):
+        expected = self.expected()
+        for size in (1, 2, 3, 7):
+            self.assertEqual(self.walk(size), expected)
+
+    def test_new_posts_do_not_shift_later_pages(self):
+        expected = self.expected()
+        post = lambda: Announcement.objects.create(title='New', body='-', is_pinned=True, author=self.author)
+        self.assertEqual(self.walk(2, between_pages=post), expected)
+
+    def test_tampered_cursor_starts_from_the_top(self):
+        first, _ = keyset_page(Announcement.objects.all(), self.FIELDS, None, 2)
+        for cursor in ('garbage', 'WyJ4Il0', 'WyJ4IiwieCIsIngiXQ'):
+            rows, _ = keyset_page(Announcement.objects.all(), self.FIELDS, cursor, 2)
+            self.assertEqual(rows, first)
+
+
+class AnnouncementPushRoutingTests(TestCase):
+    VIEWERS = {
+        'cse1':    UserProfile(role='student', year='1', branch='cse'),
+        'ece1':    UserProfile(role='student', year='1', branch='ece'),
+        'cse2':    UserProfile(role='student', year='2', branch='cse'),
+        'faculty': UserProfile(role='faculty'),
+    }
+
+    def setUp(self):
+        self.author = User.objects.create_user('teacher')
+
+    def post(self, year='all', stream='all', branch='all'):
+        return Announcement.objects.create(title='Notice', body='-', author=self.author,
+                                           target_year=year, target_stream=stream, target_branch=branch)
+
+    def received(self, broker, send):
+        """{viewer: [(action, pk), ...]} for what each viewer's connection gets from `send()`."""
+        async def run():
+            subscriptions = {name: broker.subscribe(push.viewer_keys(profile))
+                             for name, profile in self.VIEWERS.items()}
+            send()
+            await asyncio.sleep(0)   # dispatch hands delivery to the loop
+            got = {}
+            for name, subscription in subscriptions.items():
+                got[name] = []
+                while not subscription.queue.empty():
+                    data = subscription.queue.get_nowait().split('data: ', 1)[1]
+                    event = json.loads(data)
+                    got[name].append((event['action'], event['pk']))
+                broker.unsubscribe(subscription)
+            return got
+        return asyncio.run(run())
+
+    def test_events_reach_only_their_audience(self):
+        first_year_cs = self.post(year='1', stream='computing')
+        ece           = self.post(branch='ece')
+        everyone      = self.post()
+        broker = push.Broker()
+        got = self.received(broker, lambda: [
+            broker.dispatch(push.announcement_event(ann, 'created')) for ann in (first_year_cs, ece, everyone)
+        ])
+        self.assertEqual(got['cse1'],    [('created', first_year_cs.pk), ('created', everyone.pk)])
+        self.assertEqual(got['ece1'],    [('created', ece.pk), ('created', everyone.pk)])
+        self.assertEqual(got['cse2'],    [('created', everyone.pk)])
+        self.assertEqual(got['faculty'], [('created', first_year_cs.pk), ('created', ece.pk), ('created', everyone.pk)])
+
+    def test_audience_move_deletes_from_the_old_audience(self):
+        ann = self.post(branch='cse')
+        old_audience = ann.audience
+        ann.target_branch = 'ece'
+        ann.save()
+        with self.captureOnCommitCallbacks() as callbacks:
+            push.publish_announcement(ann, 'updated', old_audience=old_audience)
+        got = self.received(push.broker, lambda: [callback() for callback in callbacks])
+        self.assertEqual(got['cse1'], [('deleted', ann.pk)])
+        self.assertEqual(got['ece1'], [('updated', ann.pk)])
+        self.assertEqual(got['faculty'], [('deleted', ann.pk), ('updated', ann.pk)])
+
+    def test_delete_is_sent_only_on_commit(self):
+        ann = self.post()
+        pk  = ann.pk
+        with self.captureOnCommitCallbacks() as callbacks:
+            ann.delete()
+            push.publish_announcement(ann, 'deleted', pk=pk)
+            self.assertEqual(self.received(push.broker, lambda: None)['cse1'], [])
+        got = self.received(push.broker, lambda: [callback() for callback in callbacks])
+        self.assertEqual(got['cse1'], [('deleted', pk)])
+
+
+class UnreadCounterTests(TestCase):
+
+    def setUp(self):
+        self.teacher = User.objects.create_user('teacher', password='pw')
+        UserProfile.objects.create(user=self.teacher, role='faculty')
+        self.first_year = User.objects.create_user('first', password='pw')
+        UserProfile.objects.create(user=self.first_year, role='student', year='1', branch='cse')
+        self.second_year = User.objects.create_user('second', password='pw')
+        UserProfile.objects.create(user=self.second_year, role='student', year='2', branch='cse')
+
+    def count(self, user, section):
+        return getattr(unread.counts(user), section)
+
+    def test_bump_and_mark_read_touch_one_section(self):
+        unread.bump('goals', self.first_year)
+        unread.bump('goals', [self.first_year.pk, self.second_year.pk], by=2)
+        unread.bump('complaints', self.first_year)
+        self.assertEqual(self.count(self.first_year, 'goals'), 3)
+        self.assertEqual(self.count(self.second_year, 'goals'), 2)
+        self.assertEqual(self.count(self.first_year, 'announcements'), 0)
+
+        unread.mark_read(self.first_year, 'goals')
+        self.assertEqual(self.count(self.first_year, 'goals'), 0)
+        self.assertEqual(self.count(self.first_year, 'complaints'), 1)
+        self.assertEqual(self.count(self.second_year, 'goals'), 2)
+
+    def test_negative_bump_stops_at_zero(self):
+        unread.bump('goals', self.first_year)
+        unread.bump('goals', self.first_year, by=-5)
+        unread.bump('goals', self.second_year, by=-1)   # no row yet: nothing to take back
+        self.assertEqual(self.count(self.first_year, 'goals'), 0)
+        self.assertFalse(UnreadCounter.objects.filter(user=self.second_year).exists())
+
+    def test_forget_skips_readers_who_already_saw_it(self):
+        ann = Announcement.objects.create(title='Notice', body='-', author=self.teacher)
+        unread.bump('announcements', [self.first_year, self.second_year])
+        unread.mark_read(self.second_year, 'announcements')
+        unread.bump('announcements', [self.first_year, self.second_year])   # a newer one
+        unread.forget('announcements', [self.first_year, self.second_year], ann.created_at)
+        self.assertEqual(self.count(self.first_year, 'announcements'), 1)
+        self.assertEqual(self.count(self.second_year, 'announcements'), 1)
+
+    def test_posting_reaches_the_audience_and_opening_the_feed_clears_it(self):
+        self.client.login(username='teacher', password='pw')
+        self.client.post(reverse('post_announcement'), {
+            'title': 'First years', 'body': '-', 'target_year': '1',
+            'target_stream': 'all', 'target_branch': 'all',
+        })
+        self.assertEqual(self.count(self.first_year, 'announcements'), 1)
+        self.assertEqual(self.count(self.second_year, 'announcements'), 0)
+        self.assertEqual(self.count(self.teacher, 'announcements'), 0)
+
+        self.client.login(username='first', password='pw')
+        self.client.get(reverse('announcements'))
+        self.assertEqual(self.count(self.first_year, 'announcements'), 0)
+
+    def test_page_views_with_nothing_unread_do_not_write(self):
+        with self.assertNumQueries(1):
+            unread.mark_read(self.first_year, 'permissions')
+
+    def test_first_complaint_reaches_the_teacher(self):
+        self.client.login(username='first', password='pw')
+        self.client.post(reverse('complaint_student'), {
+            'teacher': self.teacher.pk, 'heading': 'Projector', 'description': 'Broken',
+            'complaint_type': 'academic', 'urgency': 'normal',
+        })
+        self.assertEqual(self.count(self.teacher, 'complaints'), 1)
+
+
+class BulkAssignmentTests(TestCase):
+
+    def setUp(self):
+        self.teacher = User.objects.create_user('teacher')
+        UserProfile.objects.create(user=self.teacher, role='faculty')
+        for i, (year, branch) in enumerate([('1', 'cse'), ('1', 'cse'), ('1', 'ece'), ('2', 'it'), ('2', 'me')]):
+            student = User.objects.create_user(f'student{i}')
+            UserProfile.objects.create(user=student, role='student', year=year, branch=branch)
+        self.goal = Goal.objects.create(
+            title='Reading', goal_type='task', assigned_by=self.teacher,
+            start_date=datetime.date(2026, 1, 1), due_date=datetime.date(2026, 12, 31),
+        )
+
+    def stored_count(self):
+        return Goal.objects.values_list('assigned_count', flat=True).get(pk=self.goal.pk)
+
+    def test_audience_filters(self):
+        def names(**audience):
+            return sorted(assignments.audience_students(**audience).values_list('username', flat=True))
+        self.assertEqual(len(names()), 5)
+        self.assertEqual(names(year='1', stream='computing'), ['student0', 'student1'])
+        self.assertEqual(names(stream='non-computing'), ['student2', 'student4'])
+        self.assertEqual(names(year='2', branch='it'), ['student3'])
+
+    def test_batches_add_every_student_once(self):
+        added = assignments.assign(self.goal, assignments.audience_students(year='1'), batch_size=2)
+        self.assertEqual(added, 3)
+        self.assertEqual(self.goal.assigned_count, 3)
+        self.assertEqual(self.stored_count(), 3)
+        self.assertEqual(self.goal.assigned_to.count(), 3)
+
+    def test_reassigning_adds_and_notifies_only_new_students(self):
+        assignments.assign(self.goal, assignments.audience_students(year='1'), batch_size=2)
+        added = assignments.assign(self.goal, assignments.audience_students(), batch_size=2)
+        self.assertEqual(added, 2)
+        self.assertEqual(self.stored_count(), 5)
+        self.assertEqual(self.goal.assigned_to.count(), 5)
+        badges = dict(UnreadCounter.objects.values_list('user__username', 'goals'))
+        self.assertEqual(badges, {f'student{i}': 1 for i in range(5)})
+
+    def test_counts_match_a_recount(self):
+        assignments.assign(self.goal, assignments.audience_students(stream='computing'), batch_size=1)
+        kept = self.stored_count()
+        goal_stats.recount(self.goal)
+        self.assertEqual(kept, self.stored_count())
+
+
+class QuizCacheTests(TestCase):
+
+    def setUp(self):
+        caches['quizzes'].clear()
+        teacher = User.objects.create_user('teacher')
+        self.goal = Goal.objects.create(
+            title='Quiz', goal_type='quiz', assigned_by=teacher,
+            start_date=datetime.date(2026, 1, 1), due_date=datetime.date(2026, 12, 31),
+        )
+        self.question = QuizQuestion.objects.create(
+            goal=self.goal, order=1, qtype='mcq', question='2 + 2?',
+            option_a='3', option_b='4', option_c='5', option_d='22', correct='b',
+        )
+
+    def test_questions_are_read_once(self):
+        quiz_cache.questions(self.goal.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual([q['question'] for q in quiz_cache.questions(self.goal.pk)], ['2 + 2?'])
+
+    def test_editing_a_question_bumps_the_version(self):
+        before = quiz_cache.version(self.goal.pk)
+        quiz_cache.questions(self.goal.pk)
+        self.question.correct = 'a'
+        self.question.save()
+        self.assertGreater(quiz_cache.version(self.goal.pk), before)
+        self.assertEqual(quiz_cache.answer_key(self.goal.pk), [(self.question.pk, 'mcq', 'a')])
+
+    def test_adding_and_removing_questions_show_up(self):
+        quiz_cache.questions(self.goal.pk)
+        extra = QuizQuestion.objects.create(goal=self.goal, order=2, qtype='short', question='Why?')
+        self.assertEqual(len(quiz_cache.questions(self.goal.pk)), 2)
+        extra.delete()
+        self.assertEqual(len(quiz_cache.questions(self.goal.pk)), 1)
+
+    def test_bulk_update_needs_an_explicit_bump(self):
+        quiz_cache.questions(self.goal.pk)
+        QuizQuestion.objects.filter(goal=self.goal).update(question='3 + 3?')
+        self.assertEqual(quiz_cache.questions(self.goal.pk)[0]['question'], '2 + 2?')
+        quiz_cache.bump(self.goal.pk)
+        self.assertEqual(quiz_cache.questions(self.goal.pk)[0]['question'], '3 + 3?')
+
+    def test_other_goals_keep_their_entries(self):
+        other = Goal.objects.create(
+            title='Other', goal_type='quiz', assigned_by=self.goal.assigned_by,
+            start_date=datetime.date(2026, 1, 1), due_date=datetime.date(2026, 12, 31),
+        )
+        other_version = quiz_cache.version(other.pk)
+        self.question.save()
+        self.assertEqual(quiz_cache.version(other.pk), other_version)
+
+
+class OverdueSweepTests(TestCase):
+    TODAY = datetime.date(2026, 6, 15)
+
+    def setUp(self):
+        self.teacher = User.objects.create_user('teacher')
+        self.student = User.objects.create_user('student')
+
+    def day(self, offset):
+        return None if offset is None else self.TODAY + datetime.timedelta(days=offset)
+
+    def goal(self, status, due):
+        return Goal.objects.create(title='Goal', assigned_by=self.teacher, status=status,
+                                   start_date=self.day(-30), due_date=self.day(due))
+
+    def book(self, due, returned=False, flagged=False):
+        record = LibraryRecord.objects.create(issued_by=self.teacher, student=self.student, book_name='Book',
+                                              book_no='1', start_date=self.day(-30), due_date=self.day(due),
+                                              is_returned=returned)
+        LibraryRecord.objects.filter(pk=record.pk).update(is_overdue=flagged)
+        return record
+
+    def letter(self, status='pending', start=None, end=None, sent_days_ago=0):
+        letter = Permission.objects.create(student=self.student, teacher=self.teacher, heading='Leave',
+                                           description='-', permission_type='leave', status=status,
+                                           start_date=self.day(start), end_date=self.day(end))
+        Permission.objects.filter(pk=letter.pk).update(
+            created_at=timezone.now() - datetime.timedelta(days=sent_days_ago))
+        return letter
+
+    def status(self, obj, field='status'):
+        return getattr(type(obj).objects.get(pk=obj.pk), field)
+
+    def test_goals(self):
+        late, due_today  = self.goal('active', -1), self.goal('active', 0)
+        moved, completed = self.goal('overdue', 3), self.goal('completed', -5)
+        sweeper.sweep(self.TODAY)
+        self.assertEqual([self.status(g) for g in (late, due_today, moved, completed)],
+                         ['overdue', 'active', 'active', 'completed'])
+
+    def test_library_records(self):
+        late, on_time = self.book(-1), self.book(0)
+        returned, cleared = self.book(-1, returned=True), self.book(-1, returned=True, flagged=True)
+        extended = self.book(5, flagged=True)
+        sweeper.sweep(self.TODAY)
+        self.assertEqual([self.status(r, 'is_overdue') for r in (late, on_time, returned, cleared, extended)],
+                         [True, False, False, False, False])
+
+    def test_permission_letters(self):
+        ended, ends_today = self.letter(start=-3, end=-1), self.letter(start=-3, end=0)
+        started, answered = self.letter(start=-1), self.letter(status='accepted', end=-1)
+        undated_old = self.letter(sent_days_ago=settings.PERMISSION_STALE_DAYS + 1)
+        undated_new = self.letter(sent_days_ago=1)
+        sweeper.sweep(self.TODAY)
+        self.assertEqual([self.status(p) for p in (ended, ends_today, started, answered, undated_old, undated_new)],
+                         ['expired', 'pending', 'expired', 'accepted', 'expired', 'pending'])
+
+    def test_second_sweep_changes_nothing(self):
+        self.goal('active', -1)
+        self.book(-1)
+        self.letter(end=-1)
+        first, _ = sweeper.sweep(self.TODAY)
+        again, _ = sweeper.sweep(self.TODAY)
+        self.assertEqual(sum(first.values()), 3)
+        self.assertEqual(sum(again.values()), 0)
+
+
+class GoalAnalyticsTests(TestCase):
+    FIELDS = ['submitted', 'late', 'scored', 'score_sum', 'histogram', 'questions']
+
+    def setUp(self):
+        caches['quizzes'].clear()
+        self.teacher = User.objects.create_user('teacher')
+        yesterday = timezone.localdate() - datetime.timedelta(days=1)
+        self.goal = Goal.objects.create(
+            title='Quiz', goal_type='quiz', assigned_by=self.teacher,
+            start_date=yesterday - datetime.timedelta(days=7), due_date=yesterday,
+        )
+        self.mcqs = [
+            QuizQuestion.objects.create(goal=self.goal, order=i, qtype='mcq', question=f'Q{i}',
+                                        option_a='x', option_b='y', correct='a')
+            for i in range(1, 4)
+        ]
+        QuizQuestion.objects.create(goal=self.goal, order=4, qtype='short', question='Why?')
+        self.students = [User.objects.create_user(f'student{i}') for i in range(5)]
+
+    def answers(self, right):
+        return {f'answer_{q.pk}': 'a' if i < right else 'b' for i, q in enumerate(self.mcqs)}
+
+    def stored(self):
+        stats = GoalAnalytics.objects.get(goal=self.goal)
+        return {field: getattr(stats, field) for field in self.FIELDS}
+
+    def test_incremental_totals_match_a_rebuild(self):
+        # A submission from before analytics existed: the first record() must count it
+        legacy = GoalSubmission.objects.create(goal=self.goal, student=self.students[0], quiz_score=1, quiz_total=4)
+        QuizAnswer.objects.create(submission=legacy, question=self.mcqs[0], answer='a', is_correct=True)
+        for student, right in zip(self.students[1:], [3, 2, 0, 3]):
+            grading.submit(self.goal, student, form=self.answers(right))
+
+        incremental = self.stored()
+        analytics.rebuild(self.goal)
+        rebuilt = self.stored()
+        self.assertAlmostEqual(incremental.pop('score_sum'), rebuilt.pop('score_sum'))
+        self.assertEqual(incremental, rebuilt)
+        self.assertEqual(rebuilt['submitted'], 5)
+        self.assertEqual(rebuilt['late'], 5)
+        self.assertEqual(rebuilt['questions'][str(self.mcqs[0].pk)], [5, 4])
+
+    def test_summary_without_a_row_matches_and_writes_nothing(self):
+        for student, right in zip(self.students, [3, 1]):
+            grading.submit(self.goal, student, form=self.answers(right))
+        self.goal.refresh_from_db()
+        from_row = analytics.summary(self.goal)
+
+        GoalAnalytics.objects.filter(goal=self.goal).delete()
+        self.assertEqual(analytics.summary(self.goal), from_row)
+        self.assertFalse(GoalAnalytics.objects.filter(goal=self.goal).exists())
+        self.assertEqual(from_row['average'], 50.0)
@@ -0,0 +1,104 @@
+"""
+Unread badges for announcements, goals, complaints and permissions.
+
+Each user has one UnreadCounter row: per section, a read cursor (last time
+they opened that page) and the number of items that reached them since.
+Writers call ``bump`` inside the transaction that creates an item or
+changes its status, so a badge never counts something that was rolled back.
+Writers call ``forget`` when an item that may still be unread is deleted or
+moves to another recipient. Opening a section calls ``mark_read``.
+
+What counts as "reaching" a user, per section:
+
+    announcements   students in the audience, and every faculty member but the author
+    goals           students: new assignments and reviewed submissions;
+                    faculty: new submissions to their goals
+    complaints      faculty: new complaints; students: status changes
+    permissions     faculty: new letters;    students: accepted / rejected
+
+Page views only read: a user without a row has nothing unread, and
+``mark_read`` writes only when it clears a nonzero count. Rows are created
+by the first ``bump`` that reaches a user, with that section's cursor at
+the date they joined (nothing read yet) and the others at "now".
+edit_announcement moves an announcement's count from the readers it no
+longer reaches to the ones it now does.
+"""
+from django.contrib.auth.models import User
+from django.db.models import F, Q, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import COMPUTING_BRANCHES, NON_COMPUTING_BRANCHES, UnreadCounter
+
+
+def counts(user):
+    """The user's UnreadCounter from one primary-key lookup; unsaved (all zeros) if they have none yet."""
+    return UnreadCounter.objects.filter(pk=user.pk).first() or UnreadCounter(user=user)
+
+
+def mark_read(user, section):
+    """Clears a section's badge; returns the previous read cursor (for "new" markers)."""
+    counter  = counts(user)
+    previous = getattr(counter, f'{section}_read_at')
+    if not getattr(counter, section):
+        # Nothing new since the cursor (or no row yet), so moving it changes nothing: no write
+        return previous
+    now      = timezone.now()
+    UnreadCounter.objects.filter(pk=user.pk).update(**{section: 0, f'{section}_read_at': now})
+    setattr(counter, section, 0)
+    setattr(counter, f'{section}_read_at', now)
+    return previous
+
+
+def _users(users, field='user'):
+    """A User, a pk, or a queryset / list of either, as a filter on `field`."""
+    if isinstance(users, (User, int)):
+        return Q(**{field: getattr(users, 'pk', users)})
+    if isinstance(users, (list, tuple, set)):
+        users = [getattr(user, 'pk', user) for user in users]   # `pk` lookups take ids only
+    return Q(**{f'{field}__in': users})
+
+
+def _create_missing(section, users):
+    """Gives `users` without a row one, with `section` unread since they joined."""
+    missing = User.objects.filter(_users(users, 'pk'), unread__isnull=True).values_list('pk', 'date_joined')
+    UnreadCounter.objects.bulk_create(
+        [UnreadCounter(user_id=pk, **{f'{section}_read_at': joined}) for pk, joined in missing],
+        ignore_conflicts=True,
+    )
+
+
+def bump(section, users, by=1):
+    """Adds `by` (may be negative, floored at 0) to a section's count for `users` in one UPDATE."""
+    if by > 0:
+        _create_missing(section, users)
+        UnreadCounter.objects.filter(_users(users)).update(**{section: F(section) + by})
+    elif by < 0:
+        # Users without a row have nothing to take back
+        UnreadCounter.objects.filter(_users(users)).update(**{section: Greatest(F(section) + by, Value(0))})
+
+
+def forget(section, users, since):
+    """Takes back one unread item dated `since` from the users who haven't read it yet."""
+    UnreadCounter.objects.filter(
+        _users(users), **{f'{section}_read_at__lt': since, f'{section}__gt': 0},
+    ).update(**{section: F(section) - 1})
+
+
+def announcement_readers(ann):
+    """Users an announcement counts as new for (the feed's audience rules, seen from the other side).
+
+    A student with no year or branch on their profile sees the unfiltered
+    feed, so blanks match any target.
+    """
+    def matches(field, values):
+        return Q(**{f'profile__{field}__in': values}) | Q(**{f'profile__{field}__isnull': True}) | Q(**{f'profile__{field}': ''})
+
+    students = Q(profile__role='student')
+    if ann.target_year != 'all':
+        students &= matches('year', [ann.target_year])
+    if ann.target_branch != 'all':
+        students &= matches('branch', [ann.target_branch])
+    if ann.target_stream != 'all':
+        students &= matches('branch', COMPUTING_BRANCHES if ann.target_stream == 'computing' else NON_COMPUTING_BRANCHES)
+    return User.objects.filter(students | Q(profile__role='faculty')).exclude(pk=ann.author_id)
@@ -2,12 +2,20 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import authenticate, login as auth_login, logout as auth_logout
 from django.contrib.auth.models import User
 from django.contrib import messages
-from django.db.models import Q
-from .models import UserProfile, Announcement, BRANCH_CHOICES, YEAR_CHOICES,Goal, QuizQuestion, GoalSubmission, QuizAnswer
+from django.db import transaction
+from django.db.models import Count, Prefetch, Q
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+from urllib.parse import urlencode
+from .models import UserProfile, Announcement, BRANCH_CHOICES, YEAR_CHOICES,Goal, QuizQuestion, GoalSubmission
 from django.utils import timezone
 import json
-from groq import Groq
-from django.http import JsonResponse
+from asgiref.sync import sync_to_async
+from . import llm, admission, analytics, answer_cache, assignments, chat_sessions, exports, feed_cache, goal_stats, grading, push, quiz_cache, unread
+from .search import search_announcements, with_highlights
+from .pagination import keyset_page
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.core.handlers.asgi import ASGIRequest
 from django.views.decorators.http import require_POST
 from django.contrib.auth.decorators import login_required
 from django.conf import settings
@@ -96,6 +104,76 @@ def study(request):
 
 # ── ANNOUNCEMENTS ──
 
+ANNOUNCEMENTS_PAGE_SIZE = 20
+
+
+def announcement_feed(request, profile):
+    """Returns (filtered feed queryset, the filter values in effect)."""
+    search   = request.GET.get('search', '').strip()
+    f_year   = request.GET.get('year', '')
+    f_stream = request.GET.get('stream', '')
+    f_branch = request.GET.get('branch', '')
+    f_prio   = request.GET.get('priority', '')
+
+    # First visit: a student's feed defaults to their own year/stream/branch.
+    # The filter form always submits the selects, so "All" stays selectable.
+    if profile and profile.role == 'student' and not any(k in request.GET for k in ('year', 'stream', 'branch')):
+        f_year   = profile.year or ''
+        f_stream = profile.stream if profile.branch else ''
+        f_branch = profile.branch or ''
+
+    qs = Announcement.objects.select_related('author').for_audience(f_year, f_stream, f_branch)
+    if f_prio:
+        qs = qs.filter(priority=f_prio)
+    if search:
+        # Full-text index (FTS5 / tsvector); pages are ordered by rank
+        qs = search_announcements(qs, search)
+
+    filters = {'search': search, 'year': f_year, 'stream': f_stream, 'branch': f_branch, 'priority': f_prio}
+    return qs, filters
+
+
+def announcement_page(request, qs, filters, is_faculty, cursor=None):
+    """One keyset page of rendered cards: {'pinned_html', 'html', 'next'}, plus
+    'total' / 'pinned_count' for the first page.
+
+    Ordered pinned first, then best match (when searching), newest, id.
+    Student pages without a search come from the per-segment fragment cache.
+    """
+    cacheable = not is_faculty and not filters['search']
+    if cacheable:
+        key  = feed_cache.make_key(filters, cursor)   # before querying, so a concurrent bump wins
+        page = feed_cache.get(key)
+        if page is not None:
+            return page
+
+    searching = bool(filters['search'])
+    if searching:
+        fields = ['is_pinned', 'search_rank', 'created_at', 'id']
+    else:
+        fields = ['is_pinned', 'created_at', 'id']
+    rows, next_cursor = keyset_page(qs, fields, cursor, ANNOUNCEMENTS_PAGE_SIZE)
+    if searching:
+        rows = with_highlights(rows)
+
+    def cards(announcements):
+        context = {'announcements': announcements, 'is_faculty': is_faculty}
+        return render_to_string('announcement_cards.html', context, request).strip()
+
+    page = {
+        'pinned_html': cards([ann for ann in rows if ann.is_pinned]),
+        'html':        cards([ann for ann in rows if not ann.is_pinned]),
+        'next':        next_cursor,
+    }
+    if cursor is None:
+        # FIX: total now reflects filtered count, not all announcements
+        page.update(qs.aggregate(total=Count('id'), pinned_count=Count('id', filter=Q(is_pinned=True))))
+
+    if cacheable:
+        feed_cache.set(key, page)
+    return page
+
+
 def announcements(request):
     if not request.user.is_authenticated:
         return redirect('login')
@@ -108,42 +186,63 @@ def announcements(request):
         profile    = None
         is_faculty = False
 
-    qs = Announcement.objects.all()
+    qs, filters = announcement_feed(request, profile)
+    page = announcement_page(request, qs, filters, is_faculty)
+    read_at = unread.mark_read(request.user, 'announcements')
 
-    search   = request.GET.get('search', '').strip()
-    f_year   = request.GET.get('year', '')
-    f_stream = request.GET.get('stream', '')
-    f_branch = request.GET.get('branch', '')
-    f_prio   = request.GET.get('priority', '')
+    return render(request, 'announcements.html', {
+        'pinned_html':  mark_safe(page['pinned_html']),
+        'regular_html': mark_safe(page['html']),
+        'total':        page['total'],
+        'pinned_count': page['pinned_count'],
+        'next_cursor':  page['next'],
+        'read_cursor':  int(read_at.timestamp()),   # cards newer than this are marked new
+        'feed_query':   urlencode(filters),
+        'is_faculty':   is_faculty,
+        'user':         request.user,
+        'profile':      profile,
+        'search':       filters['search'],
+        'f_year':       filters['year'],
+        'f_stream':     filters['stream'],
+        'f_branch':     filters['branch'],
+        'f_prio':       filters['priority'],
+    })
 
-    if search:
-        qs = qs.filter(Q(title__icontains=search) | Q(body__icontains=search))
-    if f_year:
-        qs = qs.filter(Q(target_year='all') | Q(target_year=f_year))
-    if f_stream:
-        qs = qs.filter(Q(target_stream='all') | Q(target_stream=f_stream))
-    if f_branch:
-        qs = qs.filter(Q(target_branch='all') | Q(target_branch=f_branch))
-    if f_prio:
-        qs = qs.filter(priority=f_prio)
 
-    pinned  = qs.filter(is_pinned=True)
-    regular = qs.filter(is_pinned=False)
+def announcements_feed(request):
+    """Next page of the feed as rendered cards, for infinite scroll."""
+    if not request.user.is_authenticated:
+        return JsonResponse({'error': 'Login required'}, status=401)
 
-    return render(request, 'announcements.html', {
-        'pinned':     pinned,
-        'regular':    regular,
-        # FIX: total now reflects filtered count, not all announcements
-        'total':      pinned.count() + regular.count(),
-        'is_faculty': is_faculty,
-        'user':       request.user,
-        'profile':    profile,
-        'search':     search,
-        'f_year':     f_year,
-        'f_stream':   f_stream,
-        'f_branch':   f_branch,
-        'f_prio':     f_prio,
-    })
+    profile    = getattr(request.user, 'profile', None)
+    is_faculty = profile is not None and profile.role == 'faculty'
+    qs, filters = announcement_feed(request, profile)
+    page = announcement_page(request, qs, filters, is_faculty, request.GET.get('cursor') or None)
+    return JsonResponse({'pinned_html': page['pinned_html'], 'html': page['html'], 'next': page['next']})
+
+
+@login_required
+def feed_cache_stats(request):
+    """Announcement fragment-cache version and hit rate (staff only)."""
+    if not request.user.is_staff:
+        return JsonResponse({'error': 'Forbidden'}, status=403)
+    return JsonResponse(feed_cache.stats())
+
+
+async def announcements_stream(request):
+    """SSE stream of new / edited / deleted announcements for this viewer's audience."""
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)   # WSGI can't hold idle streams; tells EventSource to stop
+    user = await request.auser()
+    if not user.is_authenticated:
+        return JsonResponse({'error': 'Login required'}, status=401)
+    if push.broker.count() >= settings.PUSH_MAX_CONNECTIONS:
+        response = JsonResponse({'error': 'Too many live connections'}, status=503)
+        response['Retry-After'] = '30'
+        return response
+
+    profile = await sync_to_async(lambda: getattr(user, 'profile', None))()
+    return sse_response(push.stream(push.viewer_keys(profile), request.headers.get('Last-Event-ID')))
 
 
 def post_announcement(request):
@@ -175,11 +274,15 @@ def post_announcement(request):
             messages.error(request, 'Title and body are required.')
             return render(request, 'post_announcement.html')
 
-        Announcement.objects.create(
-            title=title, body=body, priority=priority, is_pinned=is_pinned,
-            image=image, target_year=target_year, target_stream=target_stream,
-            target_branch=target_branch, author=request.user,
-        )
+        with transaction.atomic():
+            ann = Announcement.objects.create(
+                title=title, body=body, priority=priority, is_pinned=is_pinned,
+                image=image, target_year=target_year, target_stream=target_stream,
+                target_branch=target_branch, author=request.user,
+            )
+            unread.bump('announcements', unread.announcement_readers(ann))
+        feed_cache.bump()
+        push.publish_announcement(ann, 'created')
         messages.success(request, 'Announcement posted!')
         return redirect('announcements')
 
@@ -205,6 +308,8 @@ def edit_announcement(request, pk):
     ann = get_object_or_404(Announcement, pk=pk)
 
     if request.method == 'POST':
+        old_audience      = ann.audience
+        old_readers       = unread.announcement_readers(ann)   # lazy; built from the old targets
         ann.title         = request.POST.get('title', '').strip()
         ann.body          = request.POST.get('body', '').strip()
         ann.priority      = request.POST.get('priority')
@@ -216,7 +321,15 @@ def edit_announcement(request, pk):
         if request.FILES.get('image'):
             ann.image = request.FILES['image']
 
-        ann.save()
+        with transaction.atomic():
+            ann.save()
+            if ann.audience != old_audience:
+                # Move the unread count from readers it no longer reaches to new ones
+                new_readers = unread.announcement_readers(ann)
+                unread.forget('announcements', old_readers.exclude(pk__in=new_readers), ann.created_at)
+                unread.bump('announcements', new_readers.exclude(pk__in=old_readers))
+        feed_cache.bump()
+        push.publish_announcement(ann, 'updated', old_audience=old_audience)
         messages.success(request, 'Announcement updated successfully!')
         return redirect('announcements')
 
@@ -240,7 +353,13 @@ def delete_announcement(request, pk):
             is_faculty = False
 
         if is_faculty:
-            ann.delete()
+            pk = ann.pk
+            with transaction.atomic():
+                unread.forget('announcements', unread.announcement_readers(ann), ann.created_at)
+                ann.delete()
+                # Sent on commit only: clients never hear of a delete that didn't happen
+                push.publish_announcement(ann, 'deleted', pk=pk)
+            feed_cache.bump()
             messages.success(request, 'Announcement deleted.')
         else:
             messages.error(request, 'Only faculty can delete announcements.')
@@ -341,28 +460,34 @@ def goals(request):
         profile = None
 
     is_faculty = profile and profile.role == 'faculty'
+    unread.mark_read(request.user, 'goals')
 
     if is_faculty:
-        # Teacher sees all goals they created
-        goals_list = Goal.objects.filter(assigned_by=request.user)
+        # Teacher sees all goals they created, counters and average score in one query
+        goals_list = list(goal_stats.dashboard(request.user))
         return render(request, 'goals/teacher_goals.html', {
             'goals': goals_list,
+            'active_count': sum(1 for g in goals_list if g.current_status == 'active'),
+            'quiz_count': sum(1 for g in goals_list if g.goal_type == 'quiz'),
             'user': request.user,
             'profile': profile,
         })
     else:
-        # Student sees goals assigned to them
-        today = timezone.now().date()
-        goals_list = Goal.objects.filter(assigned_to=request.user)
-
-        # Auto-mark overdue
-        goals_list.filter(due_date__lt=today, status='active').update(status='overdue')
-
-        # Annotate with submission status
-        annotated = []
-        for g in goals_list:
-            sub = GoalSubmission.objects.filter(goal=g, student=request.user).first()
-            annotated.append({'goal': g, 'submission': sub})
+        # Student sees goals assigned to them, each with their own submission
+        # fetched in the same pass (one prefetch, not one query per goal)
+        goals_list = (
+            Goal.objects.filter(assigned_to=request.user)
+            .select_related('assigned_by')
+            .prefetch_related(Prefetch(
+                'submissions',
+                queryset=GoalSubmission.objects.filter(student=request.user),
+                to_attr='my_submissions',
+            ))
+        )
+        annotated = [
+            {'goal': g, 'submission': g.my_submissions[0] if g.my_submissions else None}
+            for g in goals_list
+        ]
 
         return render(request, 'goals/student_goals.html', {
             'annotated': annotated,
@@ -408,26 +533,29 @@ def create_goal(request):
                 'profile': profile,
             })
 
-        # Create Goal
-        goal = Goal.objects.create(
-            title=title,
-            description=description,
-            goal_type=goal_type,
-            assigned_by=request.user,
-            start_date=start_date,
-            due_date=due_date,
-            resource_link=res_link,
-            resource_file=res_file if res_file else None,
-        )
-
-        # Assign students
-        if student_ids:
-            # Filter to valid IDs only
-            valid_students = User.objects.filter(id__in=student_ids, profile__role='student')
-            goal.assigned_to.set(valid_students)
-        else:
-            # Assign to ALL students if none selected
-            goal.assigned_to.set(students)
+        # Create Goal and assign it in one transaction
+        with transaction.atomic():
+            goal = Goal.objects.create(
+                title=title,
+                description=description,
+                goal_type=goal_type,
+                assigned_by=request.user,
+                start_date=start_date,
+                due_date=due_date,
+                resource_link=res_link,
+                resource_file=res_file if res_file else None,
+            )
+            if student_ids:
+                # Filter to valid IDs only
+                assignees = User.objects.filter(id__in=student_ids, profile__role='student')
+            else:
+                # No one picked: everyone in the chosen audience (all students by default)
+                assignees = assignments.audience_students(
+                    request.POST.get('target_year', 'all'),
+                    request.POST.get('target_stream', 'all'),
+                    request.POST.get('target_branch', 'all'),
+                )
+            assignments.assign(goal, assignees)
 
         # If quiz: handle questions
         if goal_type == 'quiz':
@@ -455,7 +583,7 @@ def create_goal(request):
                 )
                 i += 1
 
-        messages.success(request, f'Goal "{title}" created and assigned to {goal.assigned_to.count()} student(s)!')
+        messages.success(request, f'Goal "{title}" created and assigned to {goal.assigned_count} student(s)!')
         return redirect('goals')
 
     return render(request, 'goals/create_goal.html', {
@@ -476,13 +604,12 @@ def goal_submissions(request, goal_id):
     # Teacher must own this goal
     goal = get_object_or_404(Goal, id=goal_id, assigned_by=request.user)
 
-    # Get ALL submissions for this goal with related data
+    # Get ALL submissions for this goal with related data (answers are summarized in `analytics`)
     submissions = GoalSubmission.objects.filter(
         goal=goal
-    ).select_related('student', 'student__profile').prefetch_related('answers')
+    ).select_related('student', 'student__profile')
 
     assigned_students = goal.assigned_to.all().select_related('profile')
-    assigned_count = assigned_students.count()
 
     # Build a "not submitted yet" list too
     submitted_student_ids = submissions.values_list('student_id', flat=True)
@@ -492,12 +619,32 @@ def goal_submissions(request, goal_id):
         'goal': goal,
         'submissions': submissions,
         'not_submitted': not_submitted,
-        'assigned_count': assigned_count,
-        'submitted_count': submissions.count(),
+        'assigned_count': goal.assigned_count,
+        'submitted_count': goal.submission_count,
+        'analytics': analytics.summary(goal),
         'user': request.user,
     })
 
 
+def export_submissions(request, goal_id):
+    if not request.user.is_authenticated:
+        return redirect('login')
+    goal = get_object_or_404(Goal, id=goal_id, assigned_by=request.user)
+
+    # Streamed row by row from chunked cursors: memory does not grow with the class
+    if request.GET.get('format') == 'xlsx':
+        response = StreamingHttpResponse(
+            exports.xlsx_stream(exports.rows(goal)),
+            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        )
+        extension = 'xlsx'
+    else:
+        response  = StreamingHttpResponse(exports.csv_stream(exports.rows(goal)), content_type='text/csv; charset=utf-8')
+        extension = 'csv'
+    response['Content-Disposition'] = f'attachment; filename="goal-{goal.pk}-submissions.{extension}"'
+    return response
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # TEACHER: GIVE FEEDBACK ON SUBMISSION
 # ─────────────────────────────────────────────────────────────────────────────
@@ -508,9 +655,13 @@ def review_submission(request, sub_id):
     sub = get_object_or_404(GoalSubmission, id=sub_id, goal__assigned_by=request.user)
 
     if request.method == 'POST':
+        old_status   = sub.status
         sub.feedback = request.POST.get('feedback', '').strip()
         sub.status   = request.POST.get('status', 'reviewed')
-        sub.save()
+        with transaction.atomic():
+            sub.save()
+            goal_stats.status_changed(sub.goal_id, old_status, sub.status)
+            unread.bump('goals', sub.student_id)
         messages.success(request, 'Feedback saved!')
         return redirect('goal_submissions', goal_id=sub.goal.id)
 
@@ -534,40 +685,18 @@ def goal_detail(request, goal_id):
     if request.method == 'POST' and not existing_sub:
         note = request.POST.get('note', '').strip()
         file = request.FILES.get('submission_file')
-
-        sub = GoalSubmission.objects.create(
-            goal=goal,
-            student=request.user,
-            note=note,
-            file=file if file else None,
-        )
-
-        # If quiz: process answers
-        if goal.goal_type == 'quiz':
-            questions = goal.questions.all()
-            score = 0
-            for q in questions:
-                ans = request.POST.get(f'answer_{q.id}', '').strip()
-                is_correct = None
-                if q.qtype == 'mcq':
-                    is_correct = ans.upper() == q.correct.upper()
-                    if is_correct:
-                        score += 1
-                QuizAnswer.objects.create(
-                    submission=sub, question=q,
-                    answer=ans, is_correct=is_correct
-                )
-            sub.quiz_score = score
-            sub.quiz_total = questions.count()
-            sub.save()
-
-        messages.success(request, 'Submitted successfully!')
+        # Scored against the cached answer key and written in one transaction
+        if grading.submit(goal, request.user, note=note, file=file or None, form=request.POST):
+            messages.success(request, 'Submitted successfully!')
+        else:
+            messages.warning(request, 'You have already submitted this goal; your first submission was kept.')
         return redirect('goal_detail', goal_id=goal_id)
 
     return render(request, 'goals/goal_detail.html', {
         'goal': goal,
         'submission': existing_sub,
-        'questions': goal.questions.all() if goal.goal_type == 'quiz' else [],
+        # From the per-goal question cache: no question queries once it is warm
+        'questions': quiz_cache.questions(goal.pk) if goal.goal_type == 'quiz' and not existing_sub else [],
         'user': request.user,
     })
 
@@ -581,56 +710,222 @@ def delete_goal(request, goal_id):
         return redirect('login')
     if request.method == 'POST':
         goal = get_object_or_404(Goal, id=goal_id, assigned_by=request.user)
-        goal.delete()
+        with transaction.atomic():
+            unread.forget('goals', goal.assigned_to.all(), goal.created_at)
+            # The owner's unseen submissions to this goal go with it
+            read_at = unread.counts(request.user).goals_read_at
+            unseen  = goal.submissions.filter(submitted_at__gt=read_at).count()
+            unread.bump('goals', request.user, by=-unseen)
+            goal.delete()
         messages.success(request, 'Goal deleted.')
     return redirect('goals')
 
 
 
+# ── Streaming helpers (Server-Sent Events) ──────────────────────────────────
+# Clients opt in with {"stream": true} or "Accept: text/event-stream" and get
+# one `data: {"delta": "..."}` event per token, then `data: {"done": true}`.
+
+def wants_stream(request, body):
+    return bool(body.get("stream")) or "text/event-stream" in request.headers.get("Accept", "")
+
+
+def sse_event(data, event=None):
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+
+def stream_completion(on_complete=None, **kwargs):
+    """Yields SSE events for a chat completion as tokens arrive.
+
+    on_complete(text) is called with the full reply once it finished cleanly.
+    """
+    yield ": stream open\n\n"   # flush headers right away
+    parts = []
+    try:
+        for delta in llm.stream_chat(**kwargs):
+            parts.append(delta)
+            yield sse_event({"delta": delta})
+        if on_complete:
+            on_complete("".join(parts))
+        yield sse_event({"done": True})
+    except Exception as e:
+        yield sse_event({"error": str(e)}, event="error")
+
+
+async def astream_completion(on_complete=None, **kwargs):
+    """Async twin of stream_completion; on_complete is awaited."""
+    yield ": stream open\n\n"
+    parts = []
+    try:
+        async for delta in llm.astream_chat(**kwargs):
+            parts.append(delta)
+            yield sse_event({"delta": delta})
+        if on_complete:
+            await on_complete("".join(parts))
+        yield sse_event({"done": True})
+    except Exception as e:
+        yield sse_event({"error": str(e)}, event="error")
+
+
+def stream_cached(text):
+    """SSE events replaying an already known reply."""
+    yield sse_event({"delta": text, "cached": True})
+    yield sse_event({"done": True})
+
+
+def sse_response(events):
+    response = StreamingHttpResponse(events, content_type="text/event-stream")
+    response["Cache-Control"]     = "no-cache"
+    response["X-Accel-Buffering"] = "no"   # don't let nginx buffer the stream
+    return response
+
+
+def overloaded_response(error, key="error"):
+    """429 for requests shed by admission control; `key` matches the view's payload."""
+    messages = {
+        "rate_limited": "You're sending messages too quickly. Please wait a moment.",
+        "queue_full":   "The assistant is busy right now. Please try again shortly.",
+        "timeout":      "The assistant is busy right now. Please try again shortly.",
+    }
+    response = JsonResponse({key: messages[error.reason], "reason": error.reason}, status=429)
+    response["Retry-After"] = str(error.retry_after)
+    return response
+
+
+CHAT_MODEL = "llama-3.1-8b-instant"  # free, fast model
+
+CHAT_SYSTEM_PROMPT = """You are Campus AI Assistant, a helpful academic bot for Campus Connect — a student platform.
+You help students with academic concepts, exam prep, assignments, and study strategies.
+Be concise, friendly, and encouraging. Use **bold** for key terms and numbered lists for steps."""
+
+CHAT_COMPLETION = {"model": CHAT_MODEL, "max_tokens": 1024}
+
+
+def build_chat_messages(history):
+    messages = [{"role": "system", "content": CHAT_SYSTEM_PROMPT}]
+
+    # Add chat history (last 10 messages for context)
+    for item in history[-10:]:
+        role = item.get("role")
+        content = item.get("content", "")
+        if role in ("user", "assistant") and content:
+            messages.append({"role": role, "content": content})
+    return messages
+
+
+def prepare_chat(user, body, user_message):
+    """Returns (session or None, messages for the LLM).
+
+    Signed-in users get a server-side session (history, summary and token
+    budget handled in chat_sessions); anonymous callers still send `history`.
+    """
+    if not user.is_authenticated:
+        return None, build_chat_messages(body.get("history", []))
+
+    session  = chat_sessions.get_session(user, body.get("session_id"), "general")
+    messages = [{"role": "system", "content": CHAT_SYSTEM_PROMPT}]
+    messages += chat_sessions.context_messages(session)
+    messages.append({"role": "user", "content": user_message})
+    return session, messages
+
+
+def with_session(response, session):
+    """Tells the client which session to send back on its next turn."""
+    if session is not None:
+        response["X-Chat-Session"] = str(session.pk)
+    return response
+
+
 def chatbot_api(request):
     try:
         body = json.loads(request.body)
         user_message = body.get("message", "").strip()
-        history = body.get("history", [])
 
         if not user_message:
             return JsonResponse({"reply": "Please send a message."}, status=400)
 
-        client = Groq(api_key=settings.GROQ_API_KEY)
+        session, messages = prepare_chat(request.user, body, user_message)
 
-        messages = [
-            {
-                "role": "system",
-                "content": """You are Campus AI Assistant, a helpful academic bot for Campus Connect — a student platform.
-You help students with academic concepts, exam prep, assignments, and study strategies.
-Be concise, friendly, and encouraging. Use **bold** for key terms and numbered lists for steps."""
-            }
-        ]
+        def remember(reply):
+            if session is not None:
+                chat_sessions.record_exchange(session, user_message, reply)
 
-        # Add chat history (last 10 messages for context)
-        for item in history[-10:]:
-            role = item.get("role")
-            content = item.get("content", "")
-            if role in ("user", "assistant") and content:
-                messages.append({"role": role, "content": content})
-
-        response = client.chat.completions.create(
-            model="llama-3.1-8b-instant",  # free, fast model
-            messages=messages,
-            max_tokens=1024,
-        )
+        try:
+            slot = admission.admit(admission.client_key(request.user, request))
+        except admission.Overloaded as e:
+            return overloaded_response(e, key="reply")
+
+        if wants_stream(request, body):
+            return with_session(sse_response(admission.ReleasingStream(
+                stream_completion(on_complete=remember, messages=messages, **CHAT_COMPLETION), slot)), session)
+
+        try:
+            reply = llm.chat_completion(messages=messages, **CHAT_COMPLETION)
+        finally:
+            slot.release()
+        remember(reply)
+        return with_session(JsonResponse({"reply": reply}), session)
+
+    except Exception as e:
+        return JsonResponse({"reply": f"⚠️ Error: {str(e)}"}, status=500)
+
+
+async def async_chatbot_api(request):
+    """ASGI version of chatbot_api — awaits the LLM instead of holding a thread."""
+    try:
+        body = json.loads(request.body)
+        user_message = body.get("message", "").strip()
+
+        if not user_message:
+            return JsonResponse({"reply": "Please send a message."}, status=400)
+
+        user = await request.auser()
+        session, messages = await sync_to_async(prepare_chat)(user, body, user_message)
 
-        reply = response.choices[0].message.content
-        return JsonResponse({"reply": reply})
+        async def remember(reply):
+            if session is not None:
+                await sync_to_async(chat_sessions.record_exchange)(session, user_message, reply)
+
+        try:
+            slot = await admission.aadmit(admission.client_key(user, request))
+        except admission.Overloaded as e:
+            return overloaded_response(e, key="reply")
+
+        if wants_stream(request, body):
+            return with_session(sse_response(admission.AsyncReleasingStream(
+                astream_completion(on_complete=remember, messages=messages, **CHAT_COMPLETION), slot)), session)
+
+        try:
+            reply = await llm.achat_completion(messages=messages, **CHAT_COMPLETION)
+        finally:
+            slot.release()
+        await remember(reply)
+        return with_session(JsonResponse({"reply": reply}), session)
 
     except Exception as e:
         return JsonResponse({"reply": f"⚠️ Error: {str(e)}"}, status=500)
+
+
 @login_required
 def chatbot(request):
     profile = getattr(request.user, 'profile', None)
     return render(request, 'chatbot.html', {'profile': profile})
 
 
+@login_required
+def llm_metrics(request):
+    """Per-process LLM latency / error counters, answer-cache hit rate and
+    admission queue depth / wait times (staff only)."""
+    if not request.user.is_staff:
+        return JsonResponse({'error': 'Forbidden'}, status=403)
+    return JsonResponse(dict(
+        llm.metrics.snapshot(),
+        answer_cache=answer_cache.stats(),
+        admission=admission.get_controller().snapshot(),
+    ))
+
+
 
 
 
@@ -696,17 +991,23 @@ def teacher_library(request, profile):
     is_active=True
       ).order_by('first_name', 'username')
 
-    # Stats for teacher dashboard
-    total      = records.count()
-    overdue    = sum(1 for r in records if r.days_overdue > 0 and not r.is_returned)
-    returned   = records.filter(is_returned=True).count()
+    # Stats for teacher dashboard: one aggregate, overdue decided by date in SQL
+    today  = timezone.now().date()
+    counts = records.aggregate(
+        total=Count('id'),
+        returned=Count('id', filter=Q(is_returned=True)),
+        overdue=Count('id', filter=Q(is_returned=False, due_date__lt=today)),
+    )
+    total      = counts['total']
+    overdue    = counts['overdue']
+    returned   = counts['returned']
     active     = total - returned
 
     return render(request, 'library_teacher.html', {
         'profile':  profile,
         'records':  records,
         'students': students,
-        'today':    timezone.now().date(),
+        'today':    today,
         'stats': {
             'total':    total,
             'active':   active,
@@ -771,6 +1072,7 @@ def mark_returned(request, record_id):
 
     record.is_returned    = True
     record.returned_date  = timezone.now().date()
+    record.is_overdue     = False
     record.save()
 
     return JsonResponse({
@@ -815,7 +1117,8 @@ def penalty_api(request, record_id):
 import os
 from django.shortcuts import render, get_object_or_404
 from django.contrib.auth.decorators import login_required
-from resources.models import Resource   # ← your resources app
+from resources.models import Resource, ResourceText   # ← your resources app
+from .rag import get_index_status
 
 
 @login_required
@@ -858,8 +1161,21 @@ def self_study_workspace(request, resource_id):
     resource.subject_display = dict(Resource.SUBJECT_CHOICES).get(resource.subject, resource.subject)
 
     return render(request, 'self_study_workspace.html', {
-        'profile':  profile,
-        'resource': resource,
+        'profile':      profile,
+        'resource':     resource,
+        'index_status': get_index_status(resource),
+    })
+
+
+@login_required
+def resource_index_status(request, resource_id):
+    """Polled by the workspace while a resource is being indexed."""
+    resource = get_object_or_404(Resource, id=resource_id)
+    store    = ResourceText.objects.filter(resource=resource).only('timings', 'indexed_at').first()
+    return JsonResponse({
+        'status':     get_index_status(resource),
+        'timings':    store.timings if store else {},
+        'indexed_at': store.indexed_at.isoformat() if store and store.indexed_at else None,
     })
 
 
@@ -911,15 +1227,13 @@ def get_file_size(file_field):
 
 
 import json
-import re
 import os
-import math
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.contrib.auth.decorators import login_required
 from django.conf import settings          # ← WAS MISSING
-from groq import Groq                     # ← WAS MISSING
 from resources.models import Resource     # ← WAS MISSING (at top level)
+from .rag import retrieve
 
 
 # ── Helper 1: file type detector ──────────────────────────────────
@@ -934,114 +1248,36 @@ def get_file_type(filename):
     return 'other'
 
 
-# ── Helper 2: extract text from PDF ───────────────────────────────
-def extract_text_from_pdf(file_path):
-    try:
-        import PyPDF2
-        parts = []
-        with open(file_path, 'rb') as f:
-            reader = PyPDF2.PdfReader(f)
-            for page in reader.pages[:20]:
-                t = page.extract_text()
-                if t:
-                    parts.append(t)
-        text = '\n'.join(parts)
-        if len(text.strip()) > 100:
-            return text   # normal PDF — text extracted fine
-
-        # Fallback: scanned PDF — use OCR
-        print("[PDF] Text too short, trying OCR...")
-        from pdf2image import convert_from_path
-        import pytesseract
-        images = convert_from_path(file_path, first_page=1, last_page=10)
-        ocr_parts = [pytesseract.image_to_string(img) for img in images]
-        return '\n'.join(ocr_parts)
-
-    except Exception as e:
-        print(f"[PDF] ERROR: {e}")
-        return ""
-
-
-# ── Helper 3: split text into overlapping chunks ──────────────────
-def chunk_text(text, chunk_size=400, overlap=60):
-    words = text.split()
-    chunks = []
-    step = max(1, chunk_size - overlap)
-    for i in range(0, len(words), step):
-        chunk = ' '.join(words[i:i + chunk_size])
-        if chunk.strip():
-            chunks.append(chunk)
-    return chunks
-
-
-# ── Helper 4: simple TF-IDF search ───────────────────────────────
-def simple_tfidf_search(query, chunks, top_k=4):
-    if not chunks:
-        return []
-
-    def tokenize(text):
-        return re.findall(r'\b\w+\b', text.lower())
-
-    query_tokens = set(tokenize(query))
-    num_docs     = len(chunks)
-    scores       = []
-
-    for chunk in chunks:
-        chunk_tokens = tokenize(chunk)
-        if not chunk_tokens:
-            scores.append(0)
-            continue
-        counts = {}
-        for t in chunk_tokens:
-            counts[t] = counts.get(t, 0) + 1
-        score = 0
-        for token in query_tokens:
-            if token in counts:
-                tf  = counts[token] / len(chunk_tokens)
-                df  = sum(1 for c in chunks if token in tokenize(c))
-                idf = math.log((num_docs + 1) / (df + 1)) + 1
-                score += tf * idf
-        scores.append(score)
-
-    ranked = sorted(range(len(chunks)), key=lambda i: scores[i], reverse=True)
-    top    = [chunks[i] for i in ranked[:top_k] if scores[i] > 0]
-    return top if top else chunks[:top_k]
-
-
-# ── Main RAG view ─────────────────────────────────────────────────
-@login_required
-@csrf_exempt
-def rag_chatbot_api(request, resource_id):
+# ── RAG prompt building (shared by the sync and async views) ──────
+def parse_rag_request(request):
+    """Returns (body, question, error_response)."""
     if request.method != "POST":
-        return JsonResponse({"error": "POST only"}, status=405)
-
-    # Parse body
+        return None, "", JsonResponse({"error": "POST only"}, status=405)
     try:
         body     = json.loads(request.body)
         question = body.get("question", "").strip()
-        history  = body.get("history", [])
     except Exception:
-        return JsonResponse({"error": "Invalid JSON"}, status=400)
-
+        return None, "", JsonResponse({"error": "Invalid JSON"}, status=400)
     if not question:
-        return JsonResponse({"error": "No question"}, status=400)
+        return body, question, JsonResponse({"error": "No question"}, status=400)
+    return body, question, None
 
-    # Get resource
-    try:
-        resource = Resource.objects.get(pk=resource_id)
-    except Resource.DoesNotExist:
-        return JsonResponse({"error": "Resource not found"}, status=404)
 
-    # Extract context from file
-    context_text = ""
-    file_type    = get_file_type(resource.file.name)
+def build_rag_messages(resource, question, history):
+    """Returns (answer cache key or None, messages for the LLM).
+
+    `history` is the session context from chat_sessions.context_messages.
+    """
+    # Context comes from the stored chunks — the PDF is only parsed once
+    content_hash, chunk_ids, relevant = retrieve(resource, question, top_k=4)
+    context_text = "\n\n---\n\n".join(relevant)
+    indexing = not relevant and get_index_status(resource) == 'indexing'
 
-    if resource.file and file_type == "pdf":
-        raw_text = extract_text_from_pdf(resource.file.path)
-        if raw_text and len(raw_text.strip()) > 100:
-            chunks       = chunk_text(raw_text, chunk_size=400, overlap=60)
-            relevant     = simple_tfidf_search(question, chunks, top_k=4)
-            context_text = "\n\n---\n\n".join(relevant)
+    # Standalone questions on an indexed document are shared between
+    # students; follow-ups depend on the conversation so are not cached.
+    cache_key = None
+    if relevant and not history:
+        cache_key = answer_cache.make_key(resource.pk, content_hash, question, chunk_ids)
 
     # Build system prompt
     if context_text:
@@ -1052,6 +1288,14 @@ def rag_chatbot_api(request, resource_id):
             "Be concise, clear, and educational. Use bullet points or code blocks where helpful.\n\n"
             f"=== DOCUMENT CONTEXT ===\n{context_text}\n=== END CONTEXT ==="
         )
+    elif indexing:
+        system_prompt = (
+            f"You are a helpful AI study assistant for subject: {resource.subject}. "
+            f"The student is studying '{resource.title}'. "
+            "The document is still being indexed, so its text is not available yet. "
+            "Answer using your general knowledge about this subject and mention that "
+            "document-specific answers will be available in a moment."
+        )
     else:
         system_prompt = (
             f"You are a helpful AI study assistant for subject: {resource.subject}. "
@@ -1062,30 +1306,117 @@ def rag_chatbot_api(request, resource_id):
 
     # Build messages
     messages_list = [{"role": "system", "content": system_prompt}]
-    for turn in history[-6:]:
-        role    = turn.get("role")
-        content = turn.get("content", "")
-        if role in ("user", "assistant") and content:
-            messages_list.append({"role": role, "content": content})
+    messages_list += history
     messages_list.append({"role": "user", "content": question})
+    return cache_key, messages_list
 
-    # Call Groq
+
+def prepare_rag_chat(user, body, resource, question):
+    """Returns (session, answer cache key or None, messages for the LLM)."""
+    session = chat_sessions.get_session(user, body.get("session_id"), "rag", resource)
+    cache_key, messages_list = build_rag_messages(
+        resource, question, chat_sessions.context_messages(session),
+    )
+    return session, cache_key, messages_list
+
+
+RAG_COMPLETION = {"model": CHAT_MODEL, "max_tokens": 1024, "temperature": 0.7}
+
+
+# ── Main RAG view ─────────────────────────────────────────────────
+@login_required
+@csrf_exempt
+def rag_chatbot_api(request, resource_id):
+    body, question, error = parse_rag_request(request)
+    if error:
+        return error
+
+    # Get resource
     try:
-        api_key = settings.GROQ_API_KEY
-        if not api_key:
-            return JsonResponse({"error": "GROQ_API_KEY not set in .env / settings.py"}, status=500)
-
-        client   = Groq(api_key=api_key)
-        response = client.chat.completions.create(
-            model="llama-3.1-8b-instant",
-            messages=messages_list,
-            max_tokens=1024,
-            temperature=0.7,
-        )
-        answer = response.choices[0].message.content
-        return JsonResponse({"answer": answer})
+        resource = Resource.objects.get(pk=resource_id)
+    except Resource.DoesNotExist:
+        return JsonResponse({"error": "Resource not found"}, status=404)
+
+    session, cache_key, messages_list = prepare_rag_chat(request.user, body, resource, question)
+
+    def remember(answer):
+        answer_cache.set(cache_key, answer)
+        chat_sessions.record_exchange(session, question, answer)
+
+    cached = answer_cache.get(cache_key)
+    if cached is not None:
+        chat_sessions.record_exchange(session, question, cached)
+        if wants_stream(request, body):
+            return with_session(sse_response(stream_cached(cached)), session)
+        return with_session(JsonResponse({"answer": cached, "cached": True}), session)
+
+    # Cache misses are the only requests that cost an LLM call
+    try:
+        slot = admission.admit(admission.client_key(request.user, request))
+    except admission.Overloaded as e:
+        return overloaded_response(e)
+
+    # Call the LLM
+    try:
+        if wants_stream(request, body):
+            return with_session(sse_response(admission.ReleasingStream(stream_completion(
+                on_complete=remember, messages=messages_list, **RAG_COMPLETION,
+            ), slot)), session)
+
+        answer = llm.chat_completion(messages=messages_list, **RAG_COMPLETION)
+        slot.release()
+        remember(answer)
+        return with_session(JsonResponse({"answer": answer}), session)
 
     except Exception as e:
+        slot.release()
+        return JsonResponse({"error": f"LLM error: {str(e)}"}, status=500)
+
+
+@login_required
+@csrf_exempt
+async def async_rag_chatbot_api(request, resource_id):
+    """ASGI version of rag_chatbot_api — awaits the LLM instead of holding a thread."""
+    body, question, error = parse_rag_request(request)
+    if error:
+        return error
+
+    resource = await Resource.objects.filter(pk=resource_id).afirst()
+    if resource is None:
+        return JsonResponse({"error": "Resource not found"}, status=404)
+
+    user = await request.auser()
+    session, cache_key, messages_list = await sync_to_async(prepare_rag_chat)(user, body, resource, question)
+    record_exchange = sync_to_async(chat_sessions.record_exchange)
+
+    async def remember(answer):
+        await answer_cache.aset(cache_key, answer)
+        await record_exchange(session, question, answer)
+
+    cached = await answer_cache.aget(cache_key)
+    if cached is not None:
+        await record_exchange(session, question, cached)
+        if wants_stream(request, body):
+            return with_session(sse_response(stream_cached(cached)), session)
+        return with_session(JsonResponse({"answer": cached, "cached": True}), session)
+
+    try:
+        slot = await admission.aadmit(admission.client_key(user, request))
+    except admission.Overloaded as e:
+        return overloaded_response(e)
+
+    try:
+        if wants_stream(request, body):
+            return with_session(sse_response(admission.AsyncReleasingStream(
+                astream_completion(on_complete=remember, messages=messages_list, **RAG_COMPLETION), slot)), session)
+
+        answer = await llm.achat_completion(messages=messages_list, **RAG_COMPLETION)
+        slot.release()
+        await remember(answer)
+        return with_session(JsonResponse({"answer": answer}), session)
+
+    except Exception as e:
+        slot.release()
         return JsonResponse({"error": f"LLM error: {str(e)}"}, status=500)
 
 
@@ -1127,16 +1458,20 @@ def complaint_student(request):
 
         if teacher_id and heading and description and complaint_type:
             teacher = get_object_or_404(User, id=teacher_id)
-            Complaint.objects.create(
-                student=request.user,
-                teacher=teacher,
-                heading=heading,
-                description=description,
-                complaint_type=complaint_type,
-                urgency=urgency,
-            )
+            with transaction.atomic():
+                Complaint.objects.create(
+                    student=request.user,
+                    teacher=teacher,
+                    heading=heading,
+                    description=description,
+                    complaint_type=complaint_type,
+                    urgency=urgency,
+                )
+                unread.bump('complaints', teacher)
         return redirect('complaint_student')
 
+    unread.mark_read(request.user, 'complaints')
+
     return render(request, 'complaint_student.html', {
         'profile':    profile,
         'teachers':   teachers,
@@ -1161,9 +1496,14 @@ def complaint_edit(request, complaint_id):
         complaint.complaint_type = request.POST.get('complaint_type', complaint.complaint_type)
         complaint.urgency        = request.POST.get('urgency', complaint.urgency)
         teacher_id = request.POST.get('teacher')
+        old_teacher_id = complaint.teacher_id
         if teacher_id:
             complaint.teacher = get_object_or_404(User, id=teacher_id)
-        complaint.save()
+        with transaction.atomic():
+            complaint.save()
+            if complaint.teacher_id != old_teacher_id:
+                unread.forget('complaints', old_teacher_id, complaint.created_at)
+                unread.bump('complaints', complaint.teacher_id)
         return redirect('complaint_student')
 
     profile  = getattr(request.user, 'profile', None)
@@ -1183,7 +1523,11 @@ def complaint_delete(request, complaint_id):
     from .models import Complaint
     complaint = get_object_or_404(Complaint, id=complaint_id, student=request.user)
     if request.method == 'POST':
-        complaint.delete()
+        with transaction.atomic():
+            unread.forget('complaints', complaint.teacher_id, complaint.created_at)
+            if complaint.status != 'pending':   # its status change may be unseen too
+                unread.forget('complaints', request.user, complaint.updated_at)
+            complaint.delete()
     return redirect('complaint_student')
 
 
@@ -1196,6 +1540,7 @@ def complaint_faculty(request):
 
     profile    = getattr(request.user, 'profile', None)
     complaints = Complaint.objects.filter(teacher=request.user)
+    unread.mark_read(request.user, 'complaints')
 
     return render(request, 'complaint_faculty.html', {
         'profile':       profile,
@@ -1221,8 +1566,12 @@ def complaint_update_status(request, complaint_id):
     status = data.get('status')
 
     if status in ('viewed', 'solved'):
+        changed          = complaint.status != status
         complaint.status = status
-        complaint.save()
+        with transaction.atomic():
+            complaint.save()
+            if changed:
+                unread.bump('complaints', complaint.student_id)
         return JsonResponse({'ok': True, 'status': status})
 
     return JsonResponse({'error': 'Invalid status'}, status=400)
@@ -1288,18 +1637,22 @@ def permission_student(request):
 
         if teacher_id and heading and description and permission_type:
             teacher = get_object_or_404(User, id=teacher_id)
-            Permission.objects.create(
-                student=request.user,
-                teacher=teacher,
-                heading=heading,
-                description=description,
-                permission_type=permission_type,
-                urgency=urgency,
-                start_date=start_date or None,
-                end_date=end_date or None,
-            )
+            with transaction.atomic():
+                Permission.objects.create(
+                    student=request.user,
+                    teacher=teacher,
+                    heading=heading,
+                    description=description,
+                    permission_type=permission_type,
+                    urgency=urgency,
+                    start_date=start_date or None,
+                    end_date=end_date or None,
+                )
+                unread.bump('permissions', teacher)
         return redirect('permission_student')
 
+    unread.mark_read(request.user, 'permissions')
+
     return render(request, 'permission_student.html', {
         'profile':      profile,
         'teachers':     teachers,
@@ -1324,9 +1677,14 @@ def permission_edit(request, permission_id):
         permission.start_date      = request.POST.get('start_date') or permission.start_date
         permission.end_date        = request.POST.get('end_date') or permission.end_date
         teacher_id = request.POST.get('teacher')
+        old_teacher_id = permission.teacher_id
         if teacher_id:
             permission.teacher = get_object_or_404(User, id=teacher_id)
-        permission.save()
+        with transaction.atomic():
+            permission.save()
+            if permission.teacher_id != old_teacher_id:
+                unread.forget('permissions', old_teacher_id, permission.created_at)
+                unread.bump('permissions', permission.teacher_id)
         return redirect('permission_student')
 
     profile  = getattr(request.user, 'profile', None)
@@ -1346,7 +1704,9 @@ def permission_delete(request, permission_id):
     permission = get_object_or_404(Permission, id=permission_id, student=request.user)
     if request.method == 'POST':
         if permission.status == 'pending':
-            permission.delete()
+            with transaction.atomic():
+                unread.forget('permissions', permission.teacher_id, permission.created_at)
+                permission.delete()
     return redirect('permission_student')
 
 
@@ -1362,6 +1722,7 @@ def permission_faculty(request):
 
     profile     = getattr(request.user, 'profile', None)
     permissions = Permission.objects.filter(teacher=request.user)
+    unread.mark_read(request.user, 'permissions')
 
     return render(request, 'permission_faculty.html', {
         'profile':        profile,
@@ -1387,10 +1748,14 @@ def permission_update_status(request, permission_id):
     remark = data.get('remark', '').strip()
 
     if status in ('accepted', 'rejected'):
+        changed           = permission.status != status
         permission.status = status
         if remark:
             permission.remark = remark
-        permission.save()
+        with transaction.atomic():
+            permission.save()
+            if changed:
+                unread.bump('permissions', permission.student_id)
         return JsonResponse({'ok': True, 'status': status})
 
     return JsonResponse({'error': 'Invalid status'}, status=400)
\ No newline at end of file
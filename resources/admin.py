@@ -1,4 +1,20 @@
 from django.contrib import admin
-from .models import Resource
+from .models import Resource, ResourceText
 # Register your models here.
-admin.site.register(Resource)
\ No newline at end of file
+admin.site.register(Resource)
+
+@admin.register(ResourceText)
+class ResourceTextAdmin(admin.ModelAdmin):
+    list_display    = ('resource', 'status', 'char_count', 'indexed_at', 'updated_at')
+    list_filter     = ('status',)
+    readonly_fields = ('status', 'error', 'timings', 'indexed_at', 'content_hash', 'file_name', 'file_size',
+                       'file_mtime', 'char_count', 'created_at', 'updated_at')
+    exclude         = ('chunks', 'index')
+    actions         = ['retry_indexing']
+
+    @admin.action(description='Retry indexing')
+    def retry_indexing(self, request, queryset):
+        from campusconnect.ingest import enqueue_resource
+        for store in queryset.select_related('resource'):
+            enqueue_resource(store.resource)
+        self.message_user(request, f'{queryset.count()} resource(s) queued for indexing.')
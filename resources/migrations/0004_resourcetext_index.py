@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resources', '0003_resourcetext'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resourcetext',
+            name='index',
+            field=models.JSONField(blank=True, default=dict, help_text='Serialized BM25 index of chunks'),
+        ),
+    ]
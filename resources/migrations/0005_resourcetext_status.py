@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:45
+
+from django.db import migrations, models
+
+
+def mark_existing_ready(apps, schema_editor):
+    # Rows stored before the pipeline existed already hold their chunks
+    ResourceText = apps.get_model('resources', 'ResourceText')
+    ResourceText.objects.exclude(content_hash='').update(status='ready')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resources', '0004_resourcetext_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resourcetext',
+            name='error',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='resourcetext',
+            name='indexed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='resourcetext',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Queued'), ('indexing', 'Indexing'), ('ready', 'Ready'), ('failed', 'Failed')], default='pending', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='resourcetext',
+            name='timings',
+            field=models.JSONField(blank=True, default=dict, help_text='Milliseconds per ingestion stage'),
+        ),
+        migrations.AlterField(
+            model_name='resourcetext',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+        migrations.RunPython(mark_existing_ready, migrations.RunPython.noop),
+    ]
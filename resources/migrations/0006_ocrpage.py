@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resources', '0005_resourcetext_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OcrPage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_hash', models.CharField(max_length=64)),
+                ('page', models.PositiveIntegerField()),
+                ('dpi', models.PositiveIntegerField()),
+                ('text', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['content_hash', 'page'],
+                'unique_together': {('content_hash', 'page', 'dpi')},
+            },
+        ),
+    ]
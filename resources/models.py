@@ -19,4 +19,52 @@ class Resource(models.Model):
     uploaded_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
-        return self.title
\ No newline at end of file
+        return self.title
+
+class ResourceText(models.Model):
+    """Extracted text of a Resource, split into RAG chunks.
+
+    Filled once per file version by the ingestion pipeline; `content_hash`
+    is the SHA-256 of the file so the row invalidates itself when the
+    upload is replaced.
+    """
+    STATUS_CHOICES = [
+        ('pending',  'Queued'),
+        ('indexing', 'Indexing'),
+        ('ready',    'Ready'),
+        ('failed',   'Failed'),
+    ]
+
+    resource     = models.OneToOneField(Resource, on_delete=models.CASCADE, related_name='text_store')
+    status       = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    error        = models.TextField(blank=True)
+    timings      = models.JSONField(default=dict, blank=True, help_text='Milliseconds per ingestion stage')
+    indexed_at   = models.DateTimeField(null=True, blank=True)
+    content_hash = models.CharField(max_length=64, db_index=True, blank=True)
+    file_name    = models.CharField(max_length=255)
+    file_size    = models.BigIntegerField(default=0)
+    file_mtime   = models.FloatField(default=0)
+    chunks       = models.JSONField(default=list, blank=True)
+    index        = models.JSONField(default=dict, blank=True, help_text='Serialized BM25 index of chunks')
+    char_count   = models.PositiveIntegerField(default=0)
+    created_at   = models.DateTimeField(auto_now_add=True)
+    updated_at   = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.resource.title} ({len(self.chunks)} chunks)"
+
+
+class OcrPage(models.Model):
+    """OCR text of one rendered PDF page, shared by every upload of the same file."""
+    content_hash = models.CharField(max_length=64)
+    page         = models.PositiveIntegerField()
+    dpi          = models.PositiveIntegerField()
+    text         = models.TextField(blank=True)
+    created_at   = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('content_hash', 'page', 'dpi')
+        ordering = ['content_hash', 'page']
+
+    def __str__(self):
+        return f"{self.content_hash[:12]} p{self.page} @{self.dpi}dpi"
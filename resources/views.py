@@ -2,6 +2,7 @@ from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
 from .models import Resource
 from .forms import ResourceForm
+from campusconnect.ingest import enqueue_resource
 
 @login_required
 def resource_access(request):
@@ -30,6 +31,8 @@ def resource_upload(request):
             resource = form.save(commit=False)
             resource.uploaded_by = request.user
             resource.save()
+            # Parse + index in the background so the first chat is instant
+            enqueue_resource(resource)
             return redirect('resource_access')
         else:
             print("FORM ERRORS:", form.errors)